@@ -2,11 +2,30 @@
 """
 Production link audit script for Mintlify docs.
 Crawls specified pages, extracts internal links, and checks for broken links.
+
+Page fetches and link checks run concurrently on a bounded worker pool
+(see link_crawler.py). With --crawl, internal links found on fetched pages
+are followed breadth-first, starting from PAGES_TO_AUDIT or, with
+--from-nav, from every page in the docs.json navigation.
+
+Usage:
+  python3 scripts/audit_links_prod.py [--workers 16] [--per-host 8] [--base-url URL]
+  python3 scripts/audit_links_prod.py --crawl [--from-nav] [--max-depth 3] [--max-pages 500]
+
+Results are cached in .cache/link_audit.sqlite (see link_cache.py), so a
+re-run only revalidates entries older than --cache-ttl hours.
+
+With --offline, no network is used: every local .mdx page is parsed and its
+links are resolved against the routes of the file tree and docs.json.
+  python3 scripts/audit_links_prod.py --offline
 """
 
+import argparse
 import re
-import ssl
-import urllib.request
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+import time
 import urllib.parse
 from html.parser import HTMLParser
 from collections import defaultdict
@@ -14,8 +33,21 @@ from typing import List, Dict, Set, Tuple
 import json
 import sys
 
+from link_cache import CacheEntry, LinkStatusCache, DEFAULT_TTL_HOURS
+from link_crawler import CrawlEngine, FetchResult, wait_any
+from offline_links import build_routes, extract_links, is_snippet, nav_pages, resolve_href, snippet_includers
+
 BASE_URL = "https://www.o1eb1.com"
 DOCS_PREFIX = "/docs"
+PROJECT_ROOT = Path(__file__).parent.parent
+DOCS_JSON = PROJECT_ROOT / 'docs.json'
+CACHE_PATH = PROJECT_ROOT / '.cache' / 'link_audit.sqlite'
+
+# Links to these are checked but never fetched as pages in crawl mode
+NON_PAGE_EXTENSIONS = (
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico',
+    '.pdf', '.json', '.txt', '.xml', '.css', '.js', '.zip',
+)
 
 # Pages to audit
 PAGES_TO_AUDIT = [
@@ -54,40 +86,13 @@ class LinkExtractor(HTMLParser):
                     self.links.append(value)
 
 
-def fetch_page(url: str) -> str:
-    """Fetch HTML content from URL."""
-    ctx = ssl.create_default_context()
-    try:
-        req = urllib.request.Request(url, headers={
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) LinkAudit/1.0'
-        })
-        with urllib.request.urlopen(req, context=ctx, timeout=15) as resp:
-            return resp.read().decode('utf-8', errors='ignore')
-    except Exception as e:
-        print(f"Error fetching {url}: {e}", file=sys.stderr)
-        return ""
-
-
-def check_url_status(url: str) -> Tuple[int, str]:
-    """Check HTTP status of URL. Returns (status_code, final_url)."""
-    ctx = ssl.create_default_context()
-    try:
-        req = urllib.request.Request(url, method='HEAD', headers={
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) LinkAudit/1.0'
-        })
-        with urllib.request.urlopen(req, context=ctx, timeout=10) as resp:
-            return resp.status, resp.url
-    except urllib.error.HTTPError as e:
-        return e.code, url
-    except Exception as e:
-        return -1, str(e)
-
-
-def normalize_link(link: str, source_page: str) -> str:
+def normalize_link(link: str, source_page: str, base_url: str = None) -> str:
     """Normalize a link to absolute URL."""
+    base_url = base_url or BASE_URL
+
     # Skip external links, mailto, tel, anchors-only
     if link.startswith(('http://', 'https://', 'mailto:', 'tel:', 'javascript:')):
-        if link.startswith(BASE_URL):
+        if link.startswith(base_url):
             return link
         return None  # External link
 
@@ -96,11 +101,11 @@ def normalize_link(link: str, source_page: str) -> str:
 
     # Handle absolute paths starting with /docs/
     if link.startswith('/docs/'):
-        return BASE_URL + link
+        return base_url + link
 
     # Handle absolute paths starting with /
     if link.startswith('/'):
-        return BASE_URL + link
+        return base_url + link
 
     # Handle relative paths
     # Remove anchor from source page for path calculation
@@ -117,16 +122,16 @@ def normalize_link(link: str, source_page: str) -> str:
 
     # Ensure it starts with BASE_URL
     if not full_path.startswith('http'):
-        full_path = BASE_URL + full_path
+        full_path = base_url + full_path
 
     return full_path
 
 
-def is_internal_link(url: str) -> bool:
+def is_internal_link(url: str, base_url: str = None) -> bool:
     """Check if URL is an internal docs link."""
     if not url:
         return False
-    return url.startswith(BASE_URL + '/docs')
+    return url.startswith((base_url or BASE_URL) + DOCS_PREFIX)
 
 
 def detect_double_path(url: str) -> bool:
@@ -142,73 +147,270 @@ def detect_double_path(url: str) -> bool:
     return False
 
 
-def main():
-    print("=" * 60)
-    print("PRODUCTION LINK AUDIT")
-    print("=" * 60)
-    print()
+def canonical_url(url: str) -> str:
+    """Dedup key for a URL: no fragment, no trailing slash."""
+    url = url.split('#', 1)[0]
+    if url.endswith('/') and url.count('/') > 3:
+        url = url.rstrip('/')
+    return url
 
-    # Collect all links from all pages
-    all_links: Dict[str, Set[str]] = defaultdict(set)  # link -> set of source pages
-    broken_links: List[Dict] = []
-    double_path_links: List[Dict] = []
-    checked_urls: Dict[str, Tuple[int, str]] = {}  # url -> (status, final_url)
 
-    print("Scanning pages for links...")
-    print("-" * 40)
+def is_page_url(url: str) -> bool:
+    """Check if URL looks like a docs page rather than a static asset."""
+    path = urllib.parse.urlsplit(url).path.lower()
+    return not path.endswith(NON_PAGE_EXTENSIONS)
 
-    for page_path in PAGES_TO_AUDIT:
-        page_url = BASE_URL + page_path
-        print(f"Scanning: {page_path}")
 
-        html = fetch_page(page_url)
-        if not html:
-            print(f"  WARNING: Could not fetch page")
-            continue
+def load_nav_seeds(docs_path: Path = DOCS_JSON) -> List[str]:
+    """Seed paths for crawl mode from docs.json navigation."""
+    with open(docs_path, 'r', encoding='utf-8') as f:
+        docs = json.load(f)
+    return [f"{DOCS_PREFIX}/{page}" for page in nav_pages(docs)]
 
-        # Extract links
-        parser = LinkExtractor()
-        parser.feed(html)
 
-        for link in parser.links:
-            normalized = normalize_link(link, page_url)
-            if normalized and is_internal_link(normalized):
-                all_links[normalized].add(page_path)
+def scan_pages(engine: CrawlEngine, pages: List[str], base_url: str = None,
+               max_depth: int = 0, max_pages: int = None, cache: LinkStatusCache = None):
+    """Fetch pages and check every internal link on them, concurrently.
 
-                # Check for double path issues
-                if detect_double_path(normalized):
-                    double_path_links.append({
-                        'source': page_path,
-                        'link': normalized,
-                        'original': link,
-                    })
+    Work is a FIFO queue of page fetches and link checks, fed to the pool
+    with a bounded number of requests in flight. HEAD checks for a level's
+    links are queued as soon as that level has arrived, so they overlap
+    with the next level's page fetches.
 
-    print()
-    print(f"Found {len(all_links)} unique internal links")
-    print()
+    With max_depth > 0, internal links are followed breadth-first up to
+    max_depth hops from the seed pages and max_pages fetched pages in
+    total. A followed link is checked by its page fetch, not a HEAD.
+    Pages are crawled one level at a time: a level's pages are fetched
+    concurrently, but their links are only processed once the whole level
+    has arrived, in frontier order. So each page gets its shortest depth,
+    and max_depth/max_pages cut the same pages on every run, whatever
+    order the fetches complete in.
 
-    # Check all unique links
-    print("Checking link status...")
-    print("-" * 40)
+    With a cache, fresh entries skip the network entirely and stale ones
+    are revalidated with a conditional request; a 304 reuses the cached
+    status (and, for pages, the cached hrefs).
 
-    for url in sorted(all_links.keys()):
-        if url in checked_urls:
+    Returns (all_links, checked_urls, double_path_links, scanned_pages).
+    """
+    base_url = base_url or BASE_URL
+    max_inflight = engine.workers * 4
+
+    all_links: Dict[str, Set[str]] = defaultdict(set)  # link -> set of source pages
+    checked_urls: Dict[str, Tuple[int, str]] = {}  # url -> (status, final_url)
+    page_double_paths: Dict[str, List[Dict]] = defaultdict(list)
+    scanned_pages: List[str] = []
+
+    # Frontier: canonical URLs already scheduled for a page fetch
+    frontier_seen: Set[str] = set()
+    queue = deque()  # ('page', (path, depth)) | ('link', url)
+    level: List[Tuple[str, int]] = []  # pages of the level being fetched, in frontier order
+    arrived: Dict[str, tuple] = {}  # path -> (status, final_url, hrefs) for pages of that level
+
+    def schedule_page(page_path: str, depth: int):
+        level.append((page_path, depth))
+        queue.append(('page', (page_path, depth)))
+
+    for page_path in pages:
+        key = canonical_url(base_url + page_path)
+        if key not in frontier_seen:
+            frontier_seen.add(key)
+            schedule_page(page_path, 0)
+
+    def handle_page(page_path: str, depth: int, status: int, final_url: str, hrefs: List[str]):
+        page_url = base_url + page_path
+        checked_urls[canonical_url(page_url)] = (status, final_url)
+        scanned_pages.append(page_path)
+        print(f"Scanned: {page_path}" + (f" (depth {depth})" if max_depth else ""))
+
+        if status != 200:
+            print(f"  WARNING: Could not fetch page (status {status})")
+            return
+
+        follow = depth < max_depth
+        for link in hrefs:
+            normalized = normalize_link(link, page_url, base_url)
+            if not (normalized and is_internal_link(normalized, base_url)):
+                continue
+
+            # Check for double path issues
+            if detect_double_path(normalized):
+                page_double_paths[page_path].append({
+                    'source': page_path,
+                    'link': normalized,
+                    'original': link,
+                })
+
+            key = canonical_url(normalized)
+            is_new = key not in all_links
+            all_links[key].add(page_path)
+            if not is_new or key in frontier_seen:
+                continue
+
+            if (follow and is_page_url(key)
+                    and (max_pages is None or len(frontier_seen) < max_pages)):
+                frontier_seen.add(key)
+                schedule_page(key[len(base_url):], depth + 1)
+            else:
+                queue.append(('link', key))
+
+    def handle_result(kind: str, payload, result: FetchResult, cached: CacheEntry):
+        url = canonical_url(base_url + payload[0]) if kind == 'page' else payload
+
+        if result.status == 304 and cached is not None:
+            cache.touch(url)
+            cache.revalidated += 1
+            status, final_url, hrefs = cached.status, cached.final_url, cached.links
+        else:
+            status, final_url = result.status, result.final_url
+            hrefs = None
+            if kind == 'page' and status == 200:
+                parser = LinkExtractor()
+                parser.feed(result.text)
+                hrefs = parser.links
+            if cache is not None:
+                cache.misses += 1
+                cache.put(url, status, final_url, result.etag, result.last_modified, hrefs)
+
+        if kind == 'page':
+            arrived[payload[0]] = (status, final_url, hrefs or [])
+        else:
+            checked_urls[url] = (status, final_url)
+
+    def finish_level():
+        """Process the arrived level in frontier order; this schedules the next one."""
+        current = list(level)
+        level.clear()
+        for page_path, depth in current:
+            handle_page(page_path, depth, *arrived.pop(page_path))
+
+    pending = {}  # future -> (kind, payload, cached entry)
+    while queue or pending or level:
+        while queue and len(pending) < max_inflight:
+            kind, payload = queue.popleft()
+            url = canonical_url(base_url + payload[0]) if kind == 'page' else payload
+
+            cached = cache.get(url) if cache is not None else None
+            if cached is not None and kind == 'page' and cached.links is None:
+                cached = None  # HEAD-only row; the page body is needed
+            if cached is not None and cache.is_fresh(cached):
+                cache.hits += 1
+                if kind == 'page':
+                    arrived[payload[0]] = (cached.status, cached.final_url, cached.links)
+                else:
+                    checked_urls[url] = (cached.status, cached.final_url)
+                continue
+
+            method = 'GET' if kind == 'page' else 'HEAD'
+            future = engine.submit(engine.fetch, method, url, LinkStatusCache.validators(cached))
+            pending[future] = (kind, payload, cached)
+
+        if level and len(arrived) == len(level):
+            finish_level()
+            continue
+        if not pending:
             continue
 
-        status, final_url = check_url_status(url)
-        checked_urls[url] = (status, final_url)
+        for future, (kind, payload, cached) in wait_any(pending):
+            handle_result(kind, payload, future.result(), cached)
 
-        status_icon = "OK" if status == 200 else f"FAIL:{status}"
+    # Report double paths in seed/crawl order, independent of completion order
+    seed_set = set(pages)
+    page_order = list(pages) + [p for p in scanned_pages if p not in seed_set]
+    double_path_links = [item for page_path in page_order for item in page_double_paths[page_path]]
+    return all_links, checked_urls, double_path_links, scanned_pages
 
-        if status not in (200, 301, 302, 303, 307, 308):
-            print(f"  [{status_icon}] {url}")
-            for source in all_links[url]:
-                broken_links.append({
-                    'source': source,
-                    'link': url,
-                    'status': status,
-                })
 
+def audit_offline(root: Path = PROJECT_ROOT, docs_path: Path = DOCS_JSON):
+    """Check links in the local MDX tree without touching the network.
+
+    Navigation entries in docs.json without a page file are reported as
+    broken links with source "docs.json". Links in snippets are checked
+    against every page that imports the snippet (reported with "via").
+
+    Returns (broken_links, double_path_links, unique_links, page_count).
+    """
+    routes, pages, nav = build_routes(root, docs_path)
+
+    broken_links: List[Dict] = []
+    double_path_links: List[Dict] = []
+    unique_links: Set[str] = set()
+
+    texts = {route: pages[route].read_text(encoding='utf-8') for route in sorted(pages)}
+    includers = snippet_includers(texts)
+
+    for route, text in texts.items():
+        source = pages[route].relative_to(root).as_posix()
+        # A snippet's links resolve where it is rendered; one nobody imports is not checked
+        bases = ([(page, pages[page].relative_to(root).as_posix()) for page in includers.get(route, [])]
+                 if is_snippet(route) else [(route, None)])
+        for link in extract_links(route, text):
+            for base, via in bases:
+                target = resolve_href(link.href, base)
+                if target is None:
+                    continue
+                resolved = f"{BASE_URL}{DOCS_PREFIX}/{target}"
+                unique_links.add(resolved)
+                where = {'source': source, 'line': link.line}
+                if via:
+                    where['via'] = via
+
+                if detect_double_path(resolved):
+                    double_path_links.append({**where, 'link': resolved, 'original': link.href})
+                elif target not in routes:
+                    broken_links.append({**where, 'link': resolved, 'status': 'no such page'})
+
+    for page in nav:
+        if page not in routes:
+            broken_links.append({
+                'source': docs_path.name,
+                'link': f"{BASE_URL}{DOCS_PREFIX}/{page}",
+                'status': 'no such page',
+            })
+
+    return broken_links, double_path_links, len(unique_links), len(pages)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Audit internal links on the production docs.")
+    parser.add_argument('--workers', type=int, default=16,
+                        help="Concurrent requests in total (default: 16)")
+    parser.add_argument('--per-host', type=int, default=8,
+                        help="Concurrent requests per host (default: 8)")
+    parser.add_argument('--timeout', type=float, default=15.0,
+                        help="Per-request timeout in seconds (default: 15)")
+    parser.add_argument('--base-url', default=BASE_URL,
+                        help=f"Site root to audit (default: {BASE_URL})")
+    parser.add_argument('--crawl', action='store_true',
+                        help="Follow internal links breadth-first from the seed pages")
+    parser.add_argument('--from-nav', action='store_true',
+                        help="Seed from every page in docs.json navigation instead of PAGES_TO_AUDIT")
+    parser.add_argument('--max-depth', type=int, default=3,
+                        help="Crawl mode: maximum link hops from a seed page (default: 3)")
+    parser.add_argument('--max-pages', type=int, default=500,
+                        help="Crawl mode: maximum pages to fetch (default: 500)")
+    parser.add_argument('--cache', type=Path, default=CACHE_PATH,
+                        help=f"Status cache file (default: {CACHE_PATH.relative_to(CACHE_PATH.parent.parent)})")
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL_HOURS,
+                        help=f"Hours before a cached result is revalidated (default: {DEFAULT_TTL_HOURS})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Check every URL from scratch and do not update the cache")
+    parser.add_argument('--offline', action='store_true',
+                        help="Check links in the local .mdx files against the local routes (no network)")
+    return parser.parse_args(argv)
+
+
+def format_source(item: Dict) -> str:
+    """'page', 'file:line' or 'snippet:line (in page)' for offline results."""
+    if 'via' in item:
+        return f"{item['source']}:{item['line']} (in {item['via']})"
+    if 'line' in item:
+        return f"{item['source']}:{item['line']}"
+    return item['source']
+
+
+def print_report(pages_audited: int, unique_links: int, broken_links: List[Dict],
+                 double_path_links: List[Dict], elapsed: float, notes: List[str] = ()) -> int:
+    """Print the audit report and return the process exit code."""
     # Generate report
     print()
     print("=" * 60)
@@ -219,10 +421,13 @@ def main():
     # Summary
     print("SUMMARY")
     print("-" * 40)
-    print(f"Pages audited: {len(PAGES_TO_AUDIT)}")
-    print(f"Unique internal links found: {len(all_links)}")
+    print(f"Pages audited: {pages_audited}")
+    print(f"Unique internal links found: {unique_links}")
     print(f"Broken links (4xx/5xx): {len(broken_links)}")
     print(f"Double-path links: {len(double_path_links)}")
+    for note in notes:
+        print(note)
+    print(f"Elapsed: {elapsed:.2f}s")
     print()
 
     # Broken links detail
@@ -230,7 +435,7 @@ def main():
         print("BROKEN LINKS")
         print("-" * 40)
         for item in broken_links:
-            print(f"Source: {item['source']}")
+            print(f"Source: {format_source(item)}")
             print(f"  Link: {item['link']}")
             print(f"  Status: {item['status']}")
             print()
@@ -243,7 +448,7 @@ def main():
         print("DOUBLE-PATH LINKS (need source fix)")
         print("-" * 40)
         for item in double_path_links:
-            print(f"Source: {item['source']}")
+            print(f"Source: {format_source(item)}")
             print(f"  Original href: {item['original']}")
             print(f"  Resolved to: {item['link']}")
             print()
@@ -272,5 +477,75 @@ def main():
         return 0
 
 
+def main(argv=None):
+    args = parse_args(argv)
+    base_url = args.base_url.rstrip('/')
+
+    if args.offline:
+        return main_offline()
+
+    print("=" * 60)
+    print("PRODUCTION LINK AUDIT")
+    print("=" * 60)
+    print()
+
+    broken_links: List[Dict] = []
+
+    seeds = load_nav_seeds() if args.from_nav else PAGES_TO_AUDIT
+    max_depth = args.max_depth if args.crawl else 0
+    max_pages = args.max_pages if args.crawl else None
+    if args.crawl:
+        print(f"Crawl mode: {len(seeds)} seeds, depth <= {max_depth}, pages <= {max_pages}")
+
+    print(f"Scanning pages for links ({args.workers} workers, {args.per_host} per host)...")
+    print("-" * 40)
+
+    started = time.monotonic()
+    with (nullcontext() if args.no_cache else LinkStatusCache(args.cache, args.cache_ttl)) as cache, \
+            CrawlEngine(workers=args.workers, per_host=args.per_host, timeout=args.timeout) as engine:
+        all_links, checked_urls, double_path_links, scanned_pages = scan_pages(
+            engine, seeds, base_url, max_depth=max_depth, max_pages=max_pages, cache=cache)
+    elapsed = time.monotonic() - started
+
+    print()
+    print(f"Found {len(all_links)} unique internal links")
+    print()
+
+    print("Link status")
+    print("-" * 40)
+
+    for url in sorted(all_links.keys()):
+        status, final_url = checked_urls[url]
+
+        status_icon = "OK" if status == 200 else f"FAIL:{status}"
+
+        if status not in (200, 301, 302, 303, 307, 308):
+            print(f"  [{status_icon}] {url}")
+            for source in all_links[url]:
+                broken_links.append({
+                    'source': source,
+                    'link': url,
+                    'status': status,
+                })
+
+    notes = []
+    if cache is not None:
+        notes.append(f"Cache: {cache.hits} fresh, {cache.revalidated} not modified, {cache.misses} fetched")
+    return print_report(len(scanned_pages), len(all_links), broken_links, double_path_links, elapsed, notes)
+
+
+def main_offline():
+    print("=" * 60)
+    print("OFFLINE LINK AUDIT")
+    print("=" * 60)
+    print()
+
+    started = time.monotonic()
+    broken_links, double_path_links, unique_links, page_count = audit_offline()
+    elapsed = time.monotonic() - started
+
+    return print_report(page_count, unique_links, broken_links, double_path_links, elapsed)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark case filtering: list comprehensions vs CaseIndex vs CaseColumns.
+
+On a synthetic corpus (see synthetic_cases.py) each engine does the
+filtering work of one generate_mdx.py run:
+
+  build     CaseIndex bitsets / CaseColumns arrays (nothing for list scans)
+  pages     members and sections of every generate_mdx page
+  counts    nav counts and the generate_mdx stats
+  crosstab  cases per visa × service_center and per criterion × rfe
+
+"list" runs the filters the generators used before the index, as written
+there: one comprehension per page and preview section (c.get('premium'),
+c.get('prep') == 'self', c.get('visa', '').startswith('O-1'), ...) and the
+single counting loop of update_success_stories_nav_counts.py. Every engine must produce the
+same members and counts; a mismatch exits 1. Times are the best of
+several runs (see bench_pipeline.best_time). Without NumPy the CaseColumns
+column is skipped.
+
+Usage:
+  python3 scripts/bench_case_filters.py [--cases 100000] [--seed 42]
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+import generate_mdx
+from bench_pipeline import best_time
+from case_columns import CaseColumns, np
+from case_index import MULTI_VALUED, CaseIndex
+from page_render import assign_members
+from synthetic_cases import iter_synthetic_cases
+from update_success_stories_nav_counts import count_cases
+
+CROSSTABS = (('visa', 'service_center'), ('criteria', 'rfe'))
+STATS_WHERE = [*generate_mdx.VISA_WHERE.values(), {'rfe': True}, {'premium': True}, {'prep': 'self'}]
+
+
+def list_pages(cases: List[dict]) -> List[Tuple[List[int], list]]:
+    """generate_mdx.py's page filters before CaseIndex, as case positions."""
+    everything = list(range(len(cases)))
+    preview = {
+        'EB-1A': [i for i, c in enumerate(cases) if c.get('visa') == 'EB-1A'],
+        'EB-2 NIW': [i for i, c in enumerate(cases) if c.get('visa') == 'EB-2 NIW'],
+        'O-1': [i for i, c in enumerate(cases) if c.get('visa', '').startswith('O-1')],
+    }
+    members = {
+        'cases-preview.mdx': everything,
+        'with-rfe.mdx': [i for i, c in enumerate(cases) if c.get('rfe')],
+        'premium.mdx': [i for i, c in enumerate(cases) if c.get('premium')],
+        'self-prepared.mdx': [i for i, c in enumerate(cases) if c.get('prep') == 'self'],
+        'by-visa/eb-1a.mdx': [i for i, c in enumerate(cases) if c.get('visa') == 'EB-1A'],
+        'by-visa/eb-2-niw.mdx': [i for i, c in enumerate(cases) if c.get('visa') == 'EB-2 NIW'],
+        'by-visa/o-1.mdx': [i for i, c in enumerate(cases) if c.get('visa', '').startswith('O-1')],
+    }
+    pages = []
+    for spec in generate_mdx.PAGES:
+        page = members[spec.path]
+        sections = []
+        for section in spec.sections:
+            section_members = preview[section.key] if section.where else page
+            sections.append((section.key, section.heading.format(key=section.key, count=len(section_members)),
+                             section_members))
+        pages.append((page, sections))
+    return pages
+
+
+def list_counts(cases: List[dict]) -> Tuple[Dict[str, int], List[int]]:
+    """update_success_stories_nav_counts.py's loop and generate_mdx.py's stats before CaseIndex."""
+    nav = {'premium': 0, 'self': 0, 'rfe': 0, 'vsc': 0, 'nsc': 0}
+    for case in cases:
+        if case.get('premium') is True:
+            nav['premium'] += 1
+        if case.get('prep') == 'self':
+            nav['self'] += 1
+        if case.get('rfe') is True:
+            nav['rfe'] += 1
+        if case.get('service_center') == 'VSC':
+            nav['vsc'] += 1
+        if case.get('service_center') == 'NSC':
+            nav['nsc'] += 1
+    stats = [
+        len([c for c in cases if c.get('visa') == 'EB-1A']),
+        len([c for c in cases if c.get('visa') == 'EB-2 NIW']),
+        len([c for c in cases if c.get('visa', '').startswith('O-1')]),
+        len([c for c in cases if c.get('rfe')]),
+        len([c for c in cases if c.get('premium')]),
+        len([c for c in cases if c.get('prep') == 'self']),
+    ]
+    return nav, stats
+
+
+def list_crosstabs(cases: List[dict]) -> List[Dict[tuple, int]]:
+    tables = []
+    for rows, columns in CROSSTABS:
+        pairs = Counter()
+        for case in cases:
+            row_values = (case.get(rows) or ()) if rows in MULTI_VALUED else (case.get(rows),)
+            for row in row_values:
+                pairs[row, case.get(columns)] += 1
+        tables.append(dict(pairs))
+    return tables
+
+
+def index_pages(index) -> List[Tuple[List[int], list]]:
+    return [(page.members, page.sections) for page in assign_members(index, generate_mdx.PAGES)]
+
+
+def index_counts(index) -> Tuple[Dict[str, int], List[int]]:
+    return count_cases(index), [index.count(index.query(**where)) for where in STATS_WHERE]
+
+
+def bitset_crosstabs(index: CaseIndex) -> List[Dict[tuple, int]]:
+    tables = []
+    for rows, columns in CROSSTABS:
+        column_bits = {value: index.select(columns, value) for value in index.values(columns)}
+        table = {}
+        for row in index.values(rows):
+            row_bits = index.select(rows, row)
+            for column, bits in column_bits.items():
+                n = index.count(row_bits & bits)
+                if n:
+                    table[row, column] = n
+        tables.append(table)
+    return tables
+
+
+def column_crosstabs(columns: CaseColumns) -> List[Dict[tuple, int]]:
+    return [{(row, column): n for row, counts in columns.crosstab(rows, cols).items()
+             for column, n in counts.items() if n}
+            for rows, cols in CROSSTABS]
+
+
+def run_engine(build: Callable[[], object], pages, counts, crosstabs) -> Tuple[Dict[str, float], tuple]:
+    """{step: best seconds} and the engine's results, for comparing engines."""
+    seconds = {'build': best_time(build)}
+    engine = build()
+    seconds['pages'] = best_time(lambda: pages(engine))
+    seconds['counts'] = best_time(lambda: counts(engine))
+    seconds['crosstab'] = best_time(lambda: crosstabs(engine))
+    return seconds, (pages(engine), counts(engine), crosstabs(engine))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list scans, CaseIndex and CaseColumns filtering.")
+    parser.add_argument('--cases', type=int, default=100_000, help="Synthetic corpus size")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"Generating {args.cases:,} synthetic cases (seed {args.seed})...")
+    cases = list(iter_synthetic_cases(args.cases, args.seed))
+
+    engines = {
+        'list': (lambda: cases, list_pages, list_counts, list_crosstabs),
+        'CaseIndex': (lambda: CaseIndex(cases), index_pages, index_counts, bitset_crosstabs),
+    }
+    if np is not None:
+        engines['CaseColumns'] = (lambda: CaseColumns(cases), index_pages, index_counts, column_crosstabs)
+    else:
+        print("NumPy is not installed; skipping CaseColumns")
+
+    results = {}
+    outputs = {}
+    for name, (build, pages, counts, crosstabs) in engines.items():
+        started = time.perf_counter()
+        results[name], outputs[name] = run_engine(build, pages, counts, crosstabs)
+        print(f"  {name}: {time.perf_counter() - started:.1f}s", flush=True)
+
+    steps = ('build', 'pages', 'counts', 'crosstab')
+    print()
+    print(f"{'engine':>12} " + ' '.join(f'{step:>9}' for step in steps) + f" {'filters':>9} {'speedup':>8}")
+    list_time = sum(results['list'][step] for step in steps[1:])
+    for name, seconds in results.items():
+        filters = sum(seconds[step] for step in steps[1:])
+        print(f"{name:>12} " + ' '.join(f'{seconds[step]:>9.4f}' for step in steps) +
+              f" {filters:>9.4f} {list_time / filters:>7.1f}x")
+
+    mismatched = [name for name, output in outputs.items() if output != outputs['list']]
+    print()
+    print("filters = pages + counts + crosstab, in seconds; speedup over list scans")
+    if mismatched:
+        print(f"MISMATCH: {', '.join(mismatched)} differ from the list scans")
+        return 1
+    print("Identical members, counts and crosstabs across engines")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
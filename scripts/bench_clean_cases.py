@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark clean_cases.process_cases() with 1..N worker processes.
+
+Runs the cleaner over a synthetic corpus (see synthetic_cases.py) once per
+job count, checks that every run returns exactly the same cleaned cases
+and removed IDs as the serial run, and prints throughput.
+
+Usage:
+  python3 scripts/bench_clean_cases.py [--cases 50000] [--jobs 1 2 4 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from clean_cases import process_cases
+from synthetic_cases import generate_corpus
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    default_jobs = sorted({1, 2, 4, cpus})
+
+    parser = argparse.ArgumentParser(description="Benchmark process_cases() across job counts.")
+    parser.add_argument('--cases', type=int, default=50_000, help="Synthetic corpus size")
+    parser.add_argument('--jobs', type=int, nargs='+', default=default_jobs)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"Generating {args.cases:,} synthetic cases (seed {args.seed})...")
+    cases = generate_corpus(args.cases, args.seed)['cases']
+    print(f"CPUs available: {cpus}")
+    print()
+    print(f"{'jobs':>5} {'seconds':>9} {'cases/s':>10} {'speedup':>8}")
+
+    baseline = None
+    serial_time = None
+    failed = False
+    for jobs in args.jobs:
+        started = time.perf_counter()
+        result = process_cases(cases, jobs)
+        elapsed = time.perf_counter() - started
+
+        if baseline is None:
+            baseline, serial_time = result, elapsed
+        elif result != baseline:
+            failed = True
+            print(f"  jobs={jobs}: output differs from the first run")
+
+        print(f"{jobs:>5} {elapsed:>9.2f} {len(cases) / elapsed:>10,.0f} {serial_time / elapsed:>7.2f}x")
+
+    kept, removed = baseline
+    print()
+    print(f"Kept {len(kept):,}, removed {len(removed):,}; "
+          f"{'identical across job counts' if not failed else 'MISMATCH'}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Golden check and microbenchmark for clean_cases.clean_text_light().
+
+1. Golden: the compiled cleaner must give byte-identical output to the
+   original one-re.sub-per-rule implementation (kept below as the
+   reference) for every text field in data/cases.json, for a set of
+   edge cases where pass order matters, and for large synthetic contexts.
+2. Benchmark: times both implementations on contexts of growing size.
+
+Exits 1 if any output differs.
+
+Usage:
+  python3 scripts/bench_clean_text.py [path/to/cases.json] [--repeat 20]
+"""
+
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+from clean_cases import (
+    BRAND_NAMES, GREETING_START_PATTERNS,
+    clean_text_light, clean_text_for_title,
+)
+
+DEFAULT_CASES = Path(__file__).parent.parent / 'data' / 'cases.json'
+
+# Inputs where the order of the cleaning passes changes the result
+EDGE_CASES = [
+    '_**_ bold underscore', '#**tag after bold', '[na**me] placeholder',
+    '[им[name]я] nested', '[na[имя]me] nested', '[ссы[имя]лка]',
+    'PassRight и WeGreened, Pride Immigration, prideimmigration',
+    'greencard.pro greencard-pro greencardXpro greencard pro',
+    'visalawfirm lawfirm visalaw', 'Шамаев ШАМАЕВ муверт MUVERT',
+    'Привет!\n\n\n  всем  \t\t привет\n \n', '#хэштег #tag\n#next',
+    '', '   ', '**', '____', '[NAME] [Name] [имя] [ИМЯ]',
+    'Ура!!! Одобрили 🎉🎉 EB-1A 🇺🇸', 'всем привет, наконец-то появилось время все расписать.',
+]
+
+
+def reference_clean_text_light(text: str) -> str:
+    """Original implementation, kept verbatim as the golden reference."""
+    if not text:
+        return ""
+
+    # Remove markdown artifacts
+    text = re.sub(r'\*\*+', '', text)
+    text = re.sub(r'__+', '', text)
+
+    # Remove hashtags
+    text = re.sub(r'#\w+\s*', '', text)
+
+    # Remove/replace placeholders
+    text = re.sub(r'\[name\]', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\[имя\]', '', text)
+    text = re.sub(r'\[ссылка\]', '', text)
+    text = re.sub(r'\[аккаунт\]', '', text)
+
+    # Replace brand names with [сервис]
+    for brand in BRAND_NAMES:
+        text = re.sub(rf'\b{brand}\b', '[сервис]', text, flags=re.IGNORECASE)
+
+    # Clean excessive whitespace but keep single newlines
+    text = re.sub(r'[ \t]+', ' ', text)
+    text = re.sub(r'\n\s*\n+', '\n', text)
+    text = text.strip()
+
+    return text
+
+
+def reference_clean_text_for_title(text: str) -> str:
+    """Original clean_text_for_title() on top of the reference cleaner."""
+    text = reference_clean_text_light(text)
+
+    for pattern in GREETING_START_PATTERNS:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+
+    text = re.sub(r'[☺️💫📖🃏📍😁🙂🥳🙏🎉✨💪🔥❤️🇺🇸🕺😏]+', '', text)
+
+    return text.strip()
+
+
+def collect_texts(cases: list) -> list:
+    """Every string value in every case (title, summary, context, notes...)."""
+    texts = []
+    for case in cases:
+        for value in case.values():
+            if isinstance(value, str):
+                texts.append(value)
+            elif isinstance(value, list):
+                texts.extend(v for v in value if isinstance(v, str))
+    return texts
+
+
+def build_large_context(texts: list, size: int) -> str:
+    """Concatenate real texts (with brands and markup mixed in) up to size chars."""
+    parts = []
+    total = 0
+    i = 0
+    while total < size:
+        chunk = texts[i % len(texts)]
+        if i % 7 == 0:
+            chunk += f" **{BRAND_NAMES[i % len(BRAND_NAMES)]}** #тег [имя]\n\n"
+        parts.append(chunk)
+        total += len(chunk) + 1
+        i += 1
+    return '\n'.join(parts)[:size]
+
+
+def golden_check(texts: list) -> int:
+    """Compare both implementations; return the number of mismatches."""
+    mismatches = 0
+    for text in texts:
+        for new, ref in ((clean_text_light, reference_clean_text_light),
+                         (clean_text_for_title, reference_clean_text_for_title)):
+            if new(text) != ref(text):
+                mismatches += 1
+                print(f"  MISMATCH in {new.__name__}: {text[:80]!r}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Golden check and benchmark for clean_text_light().")
+    parser.add_argument('cases', nargs='?', type=Path, default=DEFAULT_CASES)
+    parser.add_argument('--repeat', type=int, default=20, help="Timing repetitions per size")
+    args = parser.parse_args()
+
+    with open(args.cases, 'r', encoding='utf-8') as f:
+        cases = json.load(f)['cases']
+    texts = collect_texts(cases)
+    large = [build_large_context(texts, size) for size in (1_000, 10_000, 100_000)]
+
+    print(f"Golden check: {len(texts)} case texts, {len(EDGE_CASES)} edge cases, {len(large)} large contexts")
+    mismatches = golden_check(texts + EDGE_CASES + large)
+    print(f"  {'OK' if not mismatches else f'{mismatches} mismatches'}")
+
+    print()
+    print(f"{'input':>16} {'reference':>12} {'compiled':>12} {'speedup':>8}")
+    corpus_ref = timeit.timeit(lambda: [reference_clean_text_light(t) for t in texts], number=args.repeat)
+    corpus_new = timeit.timeit(lambda: [clean_text_light(t) for t in texts], number=args.repeat)
+    print(f"{'cases.json':>16} {corpus_ref / args.repeat * 1000:>10.2f}ms "
+          f"{corpus_new / args.repeat * 1000:>10.2f}ms {corpus_ref / corpus_new:>7.1f}x")
+    for text in large:
+        ref = timeit.timeit(lambda: reference_clean_text_light(text), number=args.repeat)
+        new = timeit.timeit(lambda: clean_text_light(text), number=args.repeat)
+        print(f"{f'{len(text):,} chars':>16} {ref / args.repeat * 1000:>10.2f}ms "
+              f"{new / args.repeat * 1000:>10.2f}ms {ref / new:>7.1f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
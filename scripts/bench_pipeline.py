@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmarks for the cases pipeline, with stored baselines.
+
+For each corpus size, a synthetic corpus is generated (see
+synthetic_cases.py) and every stage runs in-process on it:
+
+  clean       clean_cases.process_cases() on the raw cases (one job, no cache)
+  lint        lint_success_stories_cases.check_case() on the cleaned cases
+  render      regenerate_all_success_stories pages, fresh accordion cache
+  render-mdx  generate_mdx pages, fresh accordion cache
+  nav         CaseIndex + nav counts + docs.json navigation update
+
+Each stage is timed like timeit: run at least MIN_REPEAT times (the first
+run also warms caches) and until MIN_TIME has passed, at most MAX_REPEAT
+times, keeping the best run. Nothing is written to disk.
+
+Results are compared with the baselines in .cache/bench_baseline.json (or
+--baseline PATH); a stage whose throughput dropped by more than --tolerance
+(default 25%) is a regression and the exit status is 1. Baselines are
+machine-specific, so they are kept local and untracked: record one with
+--save-baseline on each machine, and again after an intended slowdown.
+Without a baseline the results are only printed.
+
+Usage:
+  python3 scripts/bench_pipeline.py [--scales 1k 10k 100k] [--stages clean lint ...]
+      [--seed 42] [--baseline PATH] [--tolerance 0.25] [--save-baseline] [-o results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import generate_mdx
+import regenerate_all_success_stories as regenerate_all
+from build_cache import FragmentCache
+from case_index import CaseIndex
+from case_store import atomic_open
+from clean_cases import process_cases
+from lint_success_stories_cases import check_case
+from page_render import DEFAULT_PAGE_SIZE, assign_members, render_outputs
+from synthetic_cases import iter_synthetic_cases
+from update_success_stories_nav_counts import count_cases, update_navigation
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_BASELINE = PROJECT_ROOT / '.cache' / 'bench_baseline.json'  # per machine, not committed
+DOCS_PATH = PROJECT_ROOT / 'docs.json'
+
+SCALES = {'1k': 1_000, '10k': 10_000, '100k': 100_000}
+STAGES = ('clean', 'lint', 'render', 'render-mdx', 'nav')
+MIN_TIME = 1.0
+MIN_REPEAT = 2
+MAX_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25
+
+
+def best_time(func: Callable[[], object]) -> float:
+    """Best wall time of func over repeated runs."""
+    best = None
+    spent = 0.0
+    for run in range(1, MAX_REPEAT + 1):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        spent += elapsed
+        if run >= MIN_REPEAT and spent >= MIN_TIME:
+            break
+    return best
+
+
+def render_pages(pages, cases: List[dict], generate: Callable[[dict], str]) -> int:
+    """Render every page like the generators do, without writing; returns the output count."""
+    fragments = FragmentCache('bench')
+
+    def accordion(case):
+        return fragments.get_or_render(case, generate)
+
+    outputs = 0
+    for spec, page in zip(pages, assign_members(CaseIndex(cases), pages)):
+        outputs += len(render_outputs(spec, page, cases, accordion, DEFAULT_PAGE_SIZE, 'success-stories'))
+    return outputs
+
+
+def update_nav(cases: List[dict], docs_text: str) -> dict:
+    return update_navigation(json.loads(docs_text), count_cases(CaseIndex(cases)))
+
+
+def bench_scale(size: int, seed: int, stages) -> Dict[str, dict]:
+    """{stage: {seconds, items, per_second}} for one corpus size."""
+    raw = list(iter_synthetic_cases(size, seed))
+    cleaned, _ = process_cases(raw)
+    docs_text = DOCS_PATH.read_text(encoding='utf-8')
+
+    runs = {
+        'clean': (lambda: process_cases(raw), len(raw)),
+        'lint': (lambda: [check_case(case) for case in cleaned], len(cleaned)),
+        'render': (lambda: render_pages(regenerate_all.PAGES, cleaned, regenerate_all.generate_accordion),
+                   len(cleaned)),
+        'render-mdx': (lambda: render_pages(generate_mdx.PAGES, cleaned, generate_mdx.make_accordion),
+                       len(cleaned)),
+        'nav': (lambda: update_nav(cleaned, docs_text), len(cleaned)),
+    }
+    results = {}
+    for stage in stages:
+        func, items = runs[stage]
+        seconds = best_time(func)
+        results[stage] = {'seconds': round(seconds, 6), 'items': items, 'per_second': round(items / seconds, 1)}
+    return results
+
+
+def machine() -> dict:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def load_baseline(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(results: Dict[str, Dict[str, dict]], baseline: dict, tolerance: float) -> List[str]:
+    """Regression messages for stages slower than the baseline by more than tolerance."""
+    regressions = []
+    for scale, stages in results.items():
+        for stage, result in stages.items():
+            base = baseline.get('results', {}).get(scale, {}).get(stage)
+            if base and result['per_second'] < base['per_second'] * (1 - tolerance):
+                regressions.append(f"{stage} @ {scale}: {result['per_second']:,.0f} cases/s, "
+                                   f"baseline {base['per_second']:,.0f} cases/s")
+    return regressions
+
+
+def print_results(results: Dict[str, Dict[str, dict]], baseline: dict):
+    print(f"{'scale':>6} {'stage':>11} {'seconds':>9} {'cases/s':>11} {'baseline':>11} {'change':>8}")
+    for scale, stages in results.items():
+        for stage, result in stages.items():
+            base = baseline.get('results', {}).get(scale, {}).get(stage)
+            if base:
+                change = result['per_second'] / base['per_second'] - 1
+                versus = f"{base['per_second']:>11,.0f} {change:>+7.1%}"
+            else:
+                versus = f"{'-':>11} {'-':>8}"
+            print(f"{scale:>6} {stage:>11} {result['seconds']:>9.3f} {result['per_second']:>11,.0f} {versus}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cases pipeline against stored baselines.")
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=list(SCALES))
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE,
+                        help=f"Baseline recorded on this machine (default: {DEFAULT_BASELINE})")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed throughput drop before failing (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Record these results as the new baseline (merged into the existing one)")
+    parser.add_argument('-o', '--output', type=Path, help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    if baseline and baseline.get('seed') != args.seed:
+        print(f"Note: baseline was recorded with seed {baseline.get('seed')}, not {args.seed}")
+
+    results = {}
+    for scale in args.scales:
+        print(f"Benchmarking {SCALES[scale]:,} synthetic cases...", flush=True)
+        results[scale] = bench_scale(SCALES[scale], args.seed, args.stages)
+    print()
+    print_results(results, baseline)
+
+    report = {
+        'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'seed': args.seed,
+        'machine': machine(),
+        'results': results,
+    }
+    if args.output:
+        with atomic_open(args.output) as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+
+    if args.save_baseline:
+        merged = baseline.get('results', {}) if baseline.get('seed') == args.seed else {}
+        for scale, stages in results.items():
+            merged.setdefault(scale, {}).update(stages)
+        report['results'] = {scale: merged[scale] for scale in SCALES if scale in merged}
+        with atomic_open(args.baseline) as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}; record one with --save-baseline")
+    elif regressions:
+        print(f"\nRegressions (more than {args.tolerance:.0%} slower than baseline):")
+        for message in regressions:
+            print(f"  - {message}")
+        return 1
+    else:
+        print(f"\nNo regressions (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Incremental build helpers for the success-stories generators.
+
+- fingerprint(): stable content hash of any JSON-serialisable value.
+- BuildManifest: remembers, per output page, the fingerprint of its inputs
+  (generator source + member cases), the bytes last written and the ids of
+  the cases shown on it, so an unchanged page is neither re-rendered nor
+  rewritten, and other scripts can link to the file a case ended up on.
+- write_if_changed(): skips the write when the bytes on disk already match,
+  which keeps mtimes stable and avoids full reloads in `mintlify dev`.
+- FragmentCache: memoised per-case render output (accordions), keyed by the
+  case fingerprint and the renderer version, optionally kept on disk.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Sequence
+
+from case_store import atomic_open
+from instrumentation import count
+
+MANIFEST_VERSION = 2
+
+
+def fingerprint(value) -> str:
+    """Stable SHA-256 of a JSON-serialisable value (key order independent)."""
+    payload = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def file_fingerprint(paths: Iterable[Path]) -> str:
+    """SHA-256 over the contents of source files (the renderer version)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def bytes_fingerprint(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """Write content to path unless the file already holds the same bytes."""
+    data = content.encode('utf-8')
+    path = Path(path)
+    if path.exists() and path.read_bytes() == data:
+        count('files.unchanged')
+        return False
+    with atomic_open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+class BuildManifest:
+    """Per-page record of input and output fingerprints.
+
+    A page is up to date when its input fingerprint matches the manifest
+    and the file on disk still has the bytes that were last written (so
+    hand edits or a git checkout force a rebuild).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.pages: Dict[str, Dict[str, str]] = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.pages = data.get('pages', {})
+
+    def is_current(self, key: str, inputs: str, output_path: Path) -> bool:
+        entry = self.pages.get(key)
+        if not entry or entry.get('inputs') != inputs:
+            return False
+        output_path = Path(output_path)
+        if not output_path.exists():
+            return False
+        return bytes_fingerprint(output_path.read_bytes()) == entry.get('output')
+
+    def record(self, key: str, inputs: str, content: str, cases: Sequence[str] = ()):
+        self.pages[key] = {
+            'inputs': inputs,
+            'output': bytes_fingerprint(content.encode('utf-8')),
+            'cases': list(cases),
+        }
+
+    def case_ids(self, out_dir: Path) -> Dict[str, List[str]]:
+        """Ids of the cases on each page whose file in out_dir is the one last written."""
+        current = {}
+        for key, entry in self.pages.items():
+            path = Path(out_dir) / key
+            if path.exists() and bytes_fingerprint(path.read_bytes()) == entry.get('output'):
+                current[key] = entry.get('cases', [])
+        return current
+
+    def forget(self, key: str):
+        self.pages.pop(key, None)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'pages': self.pages}, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+class FragmentCache:
+    """Render each case once per build, and across builds when saved to disk.
+
+    Keys are fingerprint([renderer version, case]), so editing a case or
+    the renderer code invalidates exactly the affected fragments.
+    """
+
+    def __init__(self, version: str):
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._fragments: Dict[str, str] = {}
+        self._used: set = set()
+
+    def get_or_render(self, case: dict, render: Callable[[dict], str]) -> str:
+        key = fingerprint([self.version, case])
+        self._used.add(key)
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            self.misses += 1
+            fragment = render(case)
+            self._fragments[key] = fragment
+        else:
+            self.hits += 1
+        return fragment
+
+    def load(self, path: Path):
+        """Load fragments saved by an earlier build of the same renderer."""
+        path = Path(path)
+        if not path.exists():
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == self.version:
+            self._fragments.update(data.get('fragments', {}))
+
+    def save(self, path: Path):
+        """Save the fragments used in this build (stale ones are dropped)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fragments = {k: v for k, v in self._fragments.items() if k in self._used}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'fragments': fragments}, f, ensure_ascii=False)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Build the officer index (rfe-data/officers.json) and the officers page.
+
+The index is built by officer_index.build_index() from the RFE records
+(data/rfe_cases.json), with success stories from data/cases.json that
+name an officer linked to their cases-preview page. The page
+(rfe-data/officers.mdx) shows the percentile distribution per criterion
+and one row per officer; officer_index.py answers the same questions
+from the command line without reading the dataset.
+
+Files are rewritten only when their bytes change. --check writes nothing
+and exits 1 when either is out of date.
+
+Usage:
+  python3 scripts/build_officer_index.py [data/rfe_cases.json] [--cases data/cases.json] [--check]
+      [--timings-report [PATH]] [--profile [PATH]]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from build_cache import write_if_changed
+from build_search_index import case_pages
+from case_store import open_cases
+from generate_rfe_pages import CENTERS, center_link, frontmatter, hero, plural, validate
+from instrumentation import add_arguments, count, instrumented, stage
+from officer_index import ALL_CENTERS, OVERALL, build_index, rate
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_DATA = PROJECT_ROOT / 'data' / 'rfe_cases.json'
+DEFAULT_CASES = PROJECT_ROOT / 'data' / 'cases.json'
+INDEX_PATH = PROJECT_ROOT / 'rfe-data' / 'officers.json'
+PAGE_PATH = PROJECT_ROOT / 'rfe-data' / 'officers.mdx'
+
+OUTCOME_NAMES = {'RFE': 'RFE', 'NOID': 'NOID', 'Denial': 'Отказ'}
+
+
+def officers_word(n: int) -> str:
+    return plural(n, 'офицер', 'офицера', 'офицеров')
+
+
+def share(claimed: int, met: int) -> str:
+    value = rate(claimed, met)
+    return f'{met}/{claimed}' + ('' if value is None else f' ({round(value)}%)')
+
+
+def story_links(cases: List[dict]) -> List[tuple]:
+    """(officer_id, title, href) for every case that names its officer."""
+    hrefs = case_pages(cases)
+    return [(case['officer_id'], case.get('title') or case['id'], href)
+            for case, href in zip(cases, hrefs) if case.get('officer_id')]
+
+
+def render_distribution(index: dict) -> str:
+    officers = index['officers'].values()
+    head = ' | '.join(f'{q}%' for q in index['quantiles'])
+    lines = [f'| Критерий | Офицеров | {head} |', '|' + '---|' * (len(index['quantiles']) + 2)]
+    for key, values in index['distribution'].items():
+        ranked = sum(1 for officer in officers if key in officer.get('percentile', {}))
+        label = '**Все критерии**' if key == OVERALL else key
+        lines.append(f'| {label} | {ranked} | ' + ' | '.join(f'{v}%' for v in values) + ' |')
+    return '\n'.join(lines)
+
+
+def render_officer_row(officer_id: str, officer: dict, index: dict) -> str:
+    entry = officer[ALL_CENTERS]
+    centers = ', '.join(name for code, name in index['centers'].items() if code in officer)
+    outcomes = ', '.join(f'{OUTCOME_NAMES[name]} {n}' for name, n in zip(index['outcomes'], entry['o']) if n)
+    criteria = ' · '.join(f'{name} {met}/{claimed}'
+                          for name, claimed, met in zip(index['criteria'], entry['c'], entry['m']) if claimed)
+    percentile = officer.get('percentile', {}).get(OVERALL)
+    return (f'| **{officer_id}** | {centers or "-"} | {entry["n"]} ({outcomes or "-"}) | '
+            f'{share(sum(entry["c"]), sum(entry["m"]))} | {"-" if percentile is None else percentile} | '
+            f'{criteria or "-"} |')
+
+
+def render_page(index: dict, total: int, unknown: int) -> str:
+    officers = {o: entry for o, entry in index['officers'].items() if entry[ALL_CENTERS]['n']}
+    n = len(officers)
+    ordered = sorted(officers, key=lambda o: (-officers[o][ALL_CENTERS]['n'], o))
+    links = [f'<a href="all" className="rfe-link rfe-link-back">← Все {total}</a>']
+    links += [center_link(c, {}, with_count=False) for c in CENTERS]
+    rows = ['| Офицер | Центр | Документы | Засчитано | Перцентиль | По критериям |',
+            '|---|---|---|---|---|---|']
+    rows += [render_officer_row(o, officers[o], index) for o in ordered]
+    stories = [f'- **{o}**: [{title}]({href})' for o, entry in index['officers'].items()
+               for title, href in entry.get('stories', [])]
+    parts = [
+        frontmatter('Офицеры USCIS: RFE/NOID/Denial EB-1A', 'Офицеры',
+                    'Статистика RFE, NOID и Denial EB-1A по номерам офицеров: что засчитывает каждый офицер.',
+                    'user-shield'),
+        hero('👮 Офицеры USCIS', f'{n} {officers_word(n)}', 'Что засчитывает каждый офицер', links),
+        '<Note>\n'
+        '**Засчитано** — засчитанные критерии из заявленных во всех документах офицера. '
+        f'**Перцентиль** — доля офицеров (с {index["min_claims"]}+ заявленными критериями), '
+        'у которых процент ниже: чем выше, тем лояльнее офицер.\n\n'
+        f'Документы без номера офицера ({unknown}) не учитываются.\n</Note>',
+        '### Процент засчитанных по офицерам',
+        'Процент, ниже которого 10%, 25%, ... офицеров:',
+        render_distribution(index),
+        '### Все офицеры',
+        '\n'.join(rows),
+    ]
+    if stories:
+        parts += ['### Истории с номером офицера', '\n'.join(stories)]
+    parts.append(f'<Info>\nПоказано {n} {officers_word(n)}. Номер офицера указан в документе USCIS.\n</Info>')
+    return '\n\n'.join(parts) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the officer index and the officers page.")
+    parser.add_argument('data', nargs='?', type=Path, default=DEFAULT_DATA)
+    parser.add_argument('--cases', type=Path, default=DEFAULT_CASES,
+                        help="Success stories to link by officer_id")
+    parser.add_argument('--check', action='store_true',
+                        help="Write nothing; exit 1 if the index or page is out of date")
+    add_arguments(parser)
+    args = parser.parse_args()
+    with instrumented('build_officer_index', args, globals(), ('render_officer_row', 'case_pages')):
+        return run(args)
+
+
+def run(args) -> int:
+    with stage('load'):
+        meta, records = open_cases(args.data)
+        records = list(records)
+        _, cases = open_cases(args.cases)
+        cases = list(cases)
+    count('records', len(records))
+
+    problems = validate(records, meta['criteria'])
+    if problems:
+        print(f"{args.data}: {len(problems)} invalid records", file=sys.stderr)
+        for message in problems:
+            print(f"  - {message}", file=sys.stderr)
+        return 1
+
+    with stage('index'):
+        index = build_index(records, meta['criteria'], story_links(cases))
+    count('officers', len(index['officers']))
+    with stage('render'):
+        unknown = sum(1 for r in records if not r.get('officer'))
+        outputs: Dict[Path, str] = {
+            INDEX_PATH: json.dumps(index, ensure_ascii=False, separators=(',', ':')) + '\n',
+            PAGE_PATH: render_page(index, len(records), unknown),
+        }
+
+    with stage('write'):
+        stale = []
+        for path, content in outputs.items():
+            if args.check:
+                if not path.exists() or path.read_text(encoding='utf-8') != content:
+                    stale.append(path.name)
+            elif write_if_changed(path, content):
+                stale.append(path.name)
+
+    if args.check:
+        if stale:
+            print(f"Out of date: {', '.join(stale)}. Run scripts/build_officer_index.py")
+            return 1
+        print("Officer index and page are up to date")
+        return 0
+    size_kb = len(outputs[INDEX_PATH].encode('utf-8')) / 1024
+    print(f"{'Wrote' if stale else 'Unchanged'} officer index: {len(index['officers'])} officers "
+          f"from {len(records)} records, {size_kb:.1f} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
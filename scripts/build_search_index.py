@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Build the static search index for success stories.
+
+Writes success-stories/search-index.json, which scripts/case-search.js
+loads to search cases in the browser without loading cases-preview.mdx.
+
+Each case links to the cases-preview page or part it was rendered on, as
+recorded in the generators' build manifests (.cache/*_manifest.json), so
+run a generator first.
+
+Indexed fields: title, summary, field, criteria (keys and Russian labels)
+and service center (code, English and Russian name). Text is normalized (lowercase, ё -> е,
+hyphenated words also indexed joined: "EB-1A" -> eb, 1a, eb1a) and Russian
+words are reduced with a light suffix stemmer. The client uses the same
+rules, so keep stem() in sync with case-search.js.
+
+Index layout (compact JSON):
+  docs      [[title, summary, visa, field, center, href], ...]
+  terms     sorted stems; a prefix query is a binary-search range over them
+  postings  per term: [doc, fields, doc delta, fields, ...], where fields is
+            a bitmask of FIELD_BITS
+  grams     trigram -> term ids (delta-encoded), for typo-tolerant lookup
+
+Usage:
+  python3 scripts/build_search_index.py [--cases data/cases.json] [-o OUTPUT] [--manifest PATH]
+      [--timings-report [PATH]] [--profile [PATH]]
+"""
+
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+from build_cache import BuildManifest, write_if_changed
+from case_store import open_cases
+from generate_mdx import MANIFEST_PATH as MDX_MANIFEST_PATH
+from instrumentation import add_arguments, count, instrumented, stage
+from regenerate_all_success_stories import MANIFEST_PATH as STORIES_MANIFEST_PATH
+
+INDEX_VERSION = 1
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CASES = PROJECT_ROOT / 'data' / 'cases.json'
+STORIES_DIR = PROJECT_ROOT / 'success-stories'
+DEFAULT_OUTPUT = STORIES_DIR / 'search-index.json'
+# Build manifests of the generators that write cases-preview.mdx
+DEFAULT_MANIFESTS = (STORIES_MANIFEST_PATH, MDX_MANIFEST_PATH)
+PREVIEW_PAGE = 'cases-preview'
+
+# Russian names, so "небраска" finds NSC cases
+CENTER_NAMES_RU = {'NSC': 'Небраска', 'TSC': 'Техас', 'VSC': 'Вермонт', 'CSC': 'Калифорния'}
+
+FIELD_BITS = {'title': 1, 'summary': 2, 'field': 4, 'criteria': 8, 'center': 16}
+SUMMARY_CHARS = 160
+
+WORD_RE = re.compile(r'[0-9a-zа-я]+(?:-[0-9a-zа-я]+)*')
+CYRILLIC_RE = re.compile(r'[а-я]')
+
+# Noun and adjective endings, longest first; a suffix is only stripped if at
+# least 3 letters remain. Same list in case-search.js.
+RU_SUFFIXES = [
+    'иями', 'ость', 'ости',
+    'ями', 'ами', 'иях', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими', 'ией',
+    'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ый', 'ий', 'ой', 'ей', 'ом', 'ем',
+    'ам', 'ям', 'ах', 'ях', 'ую', 'юю', 'ов', 'ев', 'ия', 'ья', 'ию', 'ью', 'ии',
+    'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+]
+
+
+def normalize(text: str) -> str:
+    return (text or '').lower().replace('ё', 'е')
+
+
+def stem(word: str) -> str:
+    """Light Russian stemmer: strip one inflectional suffix. Latin words pass through."""
+    if len(word) <= 3 or not CYRILLIC_RE.search(word):
+        return word
+    for suffix in RU_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Stemmed tokens of a text; hyphenated words also yield the joined form."""
+    tokens = []
+    for match in WORD_RE.finditer(normalize(text)):
+        word = match.group(0)
+        parts = word.split('-')
+        tokens.extend(stem(part) for part in parts)
+        if len(parts) > 1:
+            tokens.append(stem(''.join(parts)))
+    return tokens
+
+
+def trigrams(term: str) -> Iterable[str]:
+    return (term[i:i + 3] for i in range(len(term) - 2))
+
+
+def case_fields(case: dict, meta: dict) -> Dict[str, str]:
+    """Searchable text per field for one case."""
+    criteria_labels = meta.get('criteria_labels', {})
+    center_labels = meta.get('service_center_labels', {})
+    criteria = case.get('claimed_criteria') or case.get('criteria') or []
+    center = case.get('service_center')
+    return {
+        'title': case.get('title') or '',
+        'summary': case.get('summary') or '',
+        'field': case.get('field') or '',
+        'criteria': ' '.join(f"{c} {criteria_labels.get(c, '')}" for c in criteria),
+        'center': f"{center} {center_labels.get(center, '')} {CENTER_NAMES_RU.get(center, '')}" if center else '',
+    }
+
+
+def case_pages(cases: List[dict], manifests: Sequence[Path] = DEFAULT_MANIFESTS,
+               stories_dir: Path = STORIES_DIR) -> List[str]:
+    """Route of the cases-preview page (or part) each case is shown on.
+
+    Read from the generators' build manifests, counting only files whose
+    bytes on disk are the ones last written, so the links follow the build
+    that actually produced cases-preview (any --page-size). A case not on
+    a built page links to the cases-preview index.
+    """
+    routes = {}
+    for path in manifests:
+        for key, case_ids in BuildManifest(path).case_ids(stories_dir).items():
+            if key == f'{PREVIEW_PAGE}.mdx' or key.startswith(f'{PREVIEW_PAGE}/'):
+                for case_id in case_ids:
+                    routes[case_id] = f"/success-stories/{key[:-len('.mdx')]}"
+    return [routes.get(case.get('id'), f'/success-stories/{PREVIEW_PAGE}') for case in cases]
+
+
+def build_index(cases: List[dict], meta: dict, manifests: Sequence[Path] = DEFAULT_MANIFESTS) -> dict:
+    postings: Dict[str, Dict[int, int]] = {}
+    docs = []
+    hrefs = case_pages(cases, manifests)
+
+    for doc_id, case in enumerate(cases):
+        for field, text in case_fields(case, meta).items():
+            bit = FIELD_BITS[field]
+            for token in tokenize(text):
+                entry = postings.setdefault(token, {})
+                entry[doc_id] = entry.get(doc_id, 0) | bit
+
+        summary = case.get('summary') or ''
+        if len(summary) > SUMMARY_CHARS:
+            summary = summary[:SUMMARY_CHARS - 1] + '…'
+        docs.append([
+            case.get('title') or '', summary, case.get('visa') or '',
+            case.get('field') or '', case.get('service_center') or '', hrefs[doc_id],
+        ])
+
+    terms = sorted(postings)
+    encoded = []
+    for term in terms:
+        flat = []
+        previous = 0
+        for doc_id, bits in sorted(postings[term].items()):
+            flat.extend((doc_id - previous, bits))
+            previous = doc_id
+        encoded.append(flat)
+
+    grams: Dict[str, List[int]] = {}
+    for term_id, term in enumerate(terms):
+        for gram in set(trigrams(term)):
+            grams.setdefault(gram, []).append(term_id)
+    for gram, ids in grams.items():
+        grams[gram] = [ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+
+    return {
+        'version': INDEX_VERSION,
+        'fields': FIELD_BITS,
+        'docs': docs,
+        'terms': terms,
+        'postings': encoded,
+        'grams': dict(sorted(grams.items())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the success-stories search index.")
+    parser.add_argument('--cases', type=Path, default=DEFAULT_CASES)
+    parser.add_argument('-o', '--output', type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument('--manifest', type=Path, action='append', dest='manifests',
+                        help="Build manifest to take case links from (repeatable; "
+                             "default: both success-stories generators)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    with instrumented('build_search_index', args, globals(), ('tokenize', 'stem', 'case_pages')):
+        run(args)
+
+
+def run(args):
+    with stage('load'):
+        meta, cases = open_cases(args.cases)
+        cases = list(cases)
+    count('cases.read', len(cases))
+    with stage('index'):
+        index = build_index(cases, meta, args.manifests or DEFAULT_MANIFESTS)
+    with stage('write'):
+        content = json.dumps(index, ensure_ascii=False, separators=(',', ':'))
+        changed = write_if_changed(args.output, content + '\n')
+    size_kb = len(content.encode('utf-8')) / 1024
+    print(f"{'Wrote' if changed else 'Unchanged'} {args.output}: {len(cases)} cases, "
+          f"{len(index['terms'])} terms, {len(index['grams'])} trigrams, {size_kb:.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
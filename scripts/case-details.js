@@ -0,0 +1,109 @@
+// Lazy case details - fills <div data-case-details="..."> placeholders
+// Pages generated with --lazy keep only the accordion title, summary and tags;
+// the detail sections live in success-stories/case-details*/<hash>.json (see
+// scripts/case_details.py). A placeholder is loaded once it becomes visible,
+// i.e. when its accordion is opened.
+(function() {
+  const script = document.currentScript;
+  const siteBase = script && script.src ? script.src.replace(/\/scripts\/case-details\.js(\?.*)?$/, '') : '';
+  const SELECTOR = '[data-case-details]:not([data-state])';
+
+  // Fragment URLs are content-hashed, so a fetched fragment never goes stale
+  const fragments = new Map();
+
+  function fetchFragment(url) {
+    if (!fragments.has(url)) {
+      fragments.set(url, fetch(url)
+        .then(function(response) {
+          if (!response.ok) throw new Error('HTTP ' + response.status);
+          return response.json();
+        })
+        .catch(function(error) {
+          fragments.delete(url);
+          throw error;
+        }));
+    }
+    return fragments.get(url);
+  }
+
+  function escapeHtml(text) {
+    return String(text).replace(/[&<>"']/g, function(ch) {
+      return { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[ch];
+    });
+  }
+
+  // Lines starting with "- " are list items; consecutive items share one list
+  function renderSections(sections) {
+    const html = [];
+    for (const section of sections) {
+      html.push(`<h3>${escapeHtml(section.heading)}</h3>`);
+      let items = [];
+      const flush = function() {
+        if (items.length) html.push(`<ul>${items.join('')}</ul>`);
+        items = [];
+      };
+      for (const line of section.lines) {
+        if (line.startsWith('- ')) {
+          items.push(`<li>${escapeHtml(line.slice(2))}</li>`);
+        } else {
+          flush();
+          html.push(`<p>${escapeHtml(line)}</p>`);
+        }
+      }
+      flush();
+    }
+    return html.join('');
+  }
+
+  function load(el) {
+    if (el.getAttribute('data-state') === 'loading' || el.getAttribute('data-state') === 'done') return;
+    el.setAttribute('data-state', 'loading');
+    fetchFragment(siteBase + el.getAttribute('data-case-details'))
+      .then(function(fragment) {
+        el.innerHTML = renderSections(fragment.sections || []);
+        el.setAttribute('data-state', 'done');
+      })
+      .catch(function() {
+        el.textContent = 'Не удалось загрузить подробности. Закройте и откройте кейс ещё раз.';
+        el.setAttribute('data-state', 'failed');
+      });
+  }
+
+  const visible = 'IntersectionObserver' in window ? new IntersectionObserver(function(entries) {
+    for (const entry of entries) {
+      if (entry.isIntersecting) {
+        visible.unobserve(entry.target);
+        load(entry.target);
+      }
+    }
+  }, { rootMargin: '200px' }) : null;
+
+  function scan() {
+    document.querySelectorAll(SELECTOR).forEach(function(el) {
+      el.setAttribute('data-state', 'waiting');
+      if (visible) visible.observe(el); else load(el);
+    });
+    // Retry failed fragments when their accordion is opened again
+    document.querySelectorAll('[data-case-details][data-state="failed"]').forEach(function(el) {
+      if (visible && !el.offsetParent) {
+        el.setAttribute('data-state', 'waiting');
+        visible.observe(el);
+      }
+    });
+  }
+
+  scan();
+
+  // Accordion bodies and whole pages are added without a reload
+  let pending = false;
+  new MutationObserver(function() {
+    if (pending) return;
+    pending = true;
+    requestAnimationFrame(function() {
+      pending = false;
+      scan();
+    });
+  }).observe(document.documentElement, { childList: true, subtree: true });
+
+  window.caseDetails = { renderSections: renderSections };
+})();
@@ -0,0 +1,217 @@
+// Success stories search - mounts into <div id="case-search"></div>
+// Loads the static index built by scripts/build_search_index.py on first use
+// and searches it in the browser. Tokenizing and stemming must match the
+// Python build script.
+(function() {
+  const script = document.currentScript;
+  const siteBase = script && script.src ? script.src.replace(/\/scripts\/case-search\.js(\?.*)?$/, '') : '';
+  const INDEX_URL = siteBase + '/success-stories/search-index.json';
+  const MAX_RESULTS = 20;
+  const FIELD_WEIGHTS = { title: 5, summary: 1, field: 3, criteria: 3, center: 3 };
+
+  const RU_SUFFIXES = [
+    'иями', 'ость', 'ости',
+    'ями', 'ами', 'иях', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими', 'ией',
+    'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ый', 'ий', 'ой', 'ей', 'ом', 'ем',
+    'ам', 'ям', 'ах', 'ях', 'ую', 'юю', 'ов', 'ев', 'ия', 'ья', 'ию', 'ью', 'ии',
+    'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й'
+  ];
+
+  let indexPromise = null;
+
+  function stem(word) {
+    if (word.length <= 3 || !/[а-я]/.test(word)) return word;
+    for (const suffix of RU_SUFFIXES) {
+      if (word.endsWith(suffix) && word.length - suffix.length >= 3) {
+        return word.slice(0, word.length - suffix.length);
+      }
+    }
+    return word;
+  }
+
+  function tokenize(text) {
+    const tokens = [];
+    const words = (text || '').toLowerCase().replace(/ё/g, 'е').match(/[0-9a-zа-я]+(?:-[0-9a-zа-я]+)*/g) || [];
+    for (const word of words) {
+      const parts = word.split('-');
+      for (const part of parts) tokens.push(stem(part));
+      if (parts.length > 1) tokens.push(stem(parts.join('')));
+    }
+    return tokens;
+  }
+
+  function loadIndex() {
+    if (!indexPromise) {
+      indexPromise = fetch(INDEX_URL)
+        .then(function(response) {
+          if (!response.ok) throw new Error('HTTP ' + response.status);
+          return response.json();
+        })
+        .then(prepareIndex)
+        .catch(function(error) {
+          indexPromise = null;
+          throw error;
+        });
+    }
+    return indexPromise;
+  }
+
+  function prepareIndex(raw) {
+    // Field bit -> weight
+    const weights = [];
+    for (const name in raw.fields) weights.push([raw.fields[name], FIELD_WEIGHTS[name] || 1]);
+    // Undo the delta encoding of trigram lists
+    const grams = new Map();
+    for (const gram in raw.grams) {
+      const ids = raw.grams[gram];
+      let id = 0;
+      grams.set(gram, ids.map(function(delta) { return (id += delta); }));
+    }
+    return { docs: raw.docs, terms: raw.terms, postings: raw.postings, grams: grams, weights: weights };
+  }
+
+  function lowerBound(terms, token) {
+    let lo = 0;
+    let hi = terms.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (terms[mid] < token) lo = mid + 1; else hi = mid;
+    }
+    return lo;
+  }
+
+  // Term ids matching a query token: [termId, factor] pairs
+  function matchTerms(index, token) {
+    const matches = [];
+    for (let i = lowerBound(index.terms, token); i < index.terms.length && index.terms[i].startsWith(token); i++) {
+      matches.push([i, index.terms[i] === token ? 2 : 1]);
+    }
+    if (matches.length || token.length < 4) return matches;
+
+    // No prefix hit: fall back to terms sharing most of the token's trigrams
+    const shared = new Map();
+    const grams = new Set();
+    for (let i = 0; i + 3 <= token.length; i++) grams.add(token.slice(i, i + 3));
+    grams.forEach(function(gram) {
+      for (const id of index.grams.get(gram) || []) shared.set(id, (shared.get(id) || 0) + 1);
+    });
+    const needed = Math.max(2, Math.ceil(grams.size * 0.5));
+    shared.forEach(function(count, id) {
+      if (count >= needed) matches.push([id, 0.5]);
+    });
+    return matches;
+  }
+
+  function fieldScore(index, bits) {
+    let score = 0;
+    for (const [bit, weight] of index.weights) if (bits & bit) score += weight;
+    return score;
+  }
+
+  function search(index, query) {
+    const tokens = Array.from(new Set(tokenize(query)));
+    if (!tokens.length) return [];
+
+    let scores = null;
+    for (const token of tokens) {
+      const tokenScores = new Map();
+      for (const [termId, factor] of matchTerms(index, token)) {
+        const postings = index.postings[termId];
+        let doc = 0;
+        for (let i = 0; i < postings.length; i += 2) {
+          doc += postings[i];
+          const score = fieldScore(index, postings[i + 1]) * factor;
+          if (score > (tokenScores.get(doc) || 0)) tokenScores.set(doc, score);
+        }
+      }
+      // Every query token has to match
+      if (scores === null) {
+        scores = tokenScores;
+      } else {
+        const next = new Map();
+        scores.forEach(function(score, doc) {
+          if (tokenScores.has(doc)) next.set(doc, score + tokenScores.get(doc));
+        });
+        scores = next;
+      }
+      if (!scores.size) return [];
+    }
+
+    return Array.from(scores.entries())
+      .sort(function(a, b) { return b[1] - a[1] || a[0] - b[0]; })
+      .slice(0, MAX_RESULTS)
+      .map(function(entry) { return index.docs[entry[0]]; });
+  }
+
+  function escapeHtml(text) {
+    return String(text).replace(/[&<>"']/g, function(ch) {
+      return { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[ch];
+    });
+  }
+
+  function renderResults(container, results, elapsed) {
+    if (!results.length) {
+      container.innerHTML = '<div style="opacity: 0.7; padding: 8px 0;">Ничего не найдено</div>';
+      return;
+    }
+    const items = results.map(function(doc) {
+      const [title, summary, visa, field, center, href] = doc;
+      const meta = [visa, field, center].filter(Boolean).map(escapeHtml).join(' · ');
+      return `
+        <a href="${escapeHtml(siteBase + href)}" style="display: block; padding: 10px 12px; border-radius: 10px; border: 1px solid rgba(127,127,127,0.25); text-decoration: none; color: inherit;">
+          <div style="font-weight: 600;">${escapeHtml(title)}</div>
+          <div style="font-size: 12px; opacity: 0.7; margin: 2px 0 4px;">${meta}</div>
+          <div style="font-size: 14px;">${escapeHtml(summary)}</div>
+        </a>`;
+    });
+    container.innerHTML = `
+      <div style="font-size: 12px; opacity: 0.6; margin: 4px 0 8px;">${results.length} кейсов · ${elapsed.toFixed(1)} мс</div>
+      <div style="display: flex; flex-direction: column; gap: 8px;">${items.join('')}</div>`;
+  }
+
+  function mount(root) {
+    root.setAttribute('data-ready', '1');
+    root.innerHTML = `
+      <input type="search" placeholder="Поиск по кейсам: сфера, критерий, центр, виза..." autocomplete="off"
+        style="width: 100%; padding: 10px 14px; border-radius: 10px; border: 1px solid rgba(127,127,127,0.4); background: transparent; color: inherit; font-size: 15px;">
+      <div class="case-search-results" style="margin-top: 8px;"></div>`;
+    const input = root.querySelector('input');
+    const results = root.querySelector('.case-search-results');
+    let timer = null;
+
+    function run() {
+      const query = input.value.trim();
+      if (!query) {
+        results.innerHTML = '';
+        return;
+      }
+      loadIndex().then(function(index) {
+        if (input.value.trim() !== query) return;
+        const started = performance.now();
+        const found = search(index, query);
+        renderResults(results, found, performance.now() - started);
+      }).catch(function() {
+        results.innerHTML = '<div style="opacity: 0.7; padding: 8px 0;">Поиск временно недоступен</div>';
+      });
+    }
+
+    input.addEventListener('focus', function() { loadIndex().catch(function() {}); });
+    input.addEventListener('input', function() {
+      clearTimeout(timer);
+      timer = setTimeout(run, 80);
+    });
+  }
+
+  function init() {
+    const root = document.getElementById('case-search');
+    if (root && !root.getAttribute('data-ready')) mount(root);
+  }
+
+  init();
+
+  // Pages change without a reload; mount again when the container appears
+  setInterval(init, 500);
+
+  // Exposed for checking the tokenizer against the Python build script
+  window.caseSearch = { tokenize: tokenize, search: search, prepareIndex: prepareIndex };
+})();
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Columnar view of the cases corpus, filtered with vectorized NumPy masks.
+
+CaseColumns is built in one pass over the cases (a list or a streaming
+iter_cases() generator) and keeps one array per facet:
+
+  visa, field, service_center,   categorical: int32 codes into the facet's
+  prep, consulate_city           values, in order of first appearance
+  premium, rfe, noid             tri-state int8: 1 True, 0 False, -1 None
+  criteria                       uint64 bitmask, one bit per criterion
+
+A selection is a boolean array over case positions: select() turns a
+condition into a lookup table over the facet's codes (or into criteria
+bits) and applies it to the whole column at once. Counts, per-value
+counts and crosstab() are bincounts over the selected codes.
+
+CaseColumns has CaseIndex's interface (values, select, query, count,
+counts, positions, case_ids, all, size), so page_render.assign_members()
+and the nav counts accept either; generate_mdx.py uses it with
+--columnar. NumPy is required for this module only. A missing field is
+stored as None.
+
+Usage (print facet counts, or a crosstab of two facets):
+  python3 scripts/case_columns.py [data/cases.json] [--crosstab visa service_center]
+"""
+
+import argparse
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, List, Optional
+
+from case_index import DEFAULT_CASES, FACETS, MULTI_VALUED, Condition
+from case_store import iter_cases
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TRI_STATE = {'premium', 'rfe', 'noid'}
+TRI_STATE_CODES = {True: 1, False: 0, None: -1}
+MAX_MULTI_VALUES = 64  # bits in a uint64 mask
+
+
+class CaseColumns:
+    """One array per facet in FACETS; selections are boolean masks."""
+
+    def __init__(self, cases: Iterable[dict], facets: Iterable[str] = FACETS):
+        if np is None:
+            raise ImportError("CaseColumns needs NumPy (pip install numpy)")
+        self.facets = tuple(facets)
+        self.ids: List[str] = []
+        self._codes: Dict[str, Dict[Hashable, int]] = {facet: {} for facet in self.facets}
+        raw: Dict[str, list] = {facet: [] for facet in self.facets}
+
+        for case in cases:
+            self.ids.append(case.get('id'))
+            for facet in self.facets:
+                codes = self._codes[facet]
+                value = case.get(facet)
+                if facet in MULTI_VALUED:
+                    mask = 0
+                    for item in value or ():
+                        code = codes.get(item)
+                        if code is None:
+                            if len(codes) == MAX_MULTI_VALUES:
+                                raise ValueError(f"{facet}: more than {MAX_MULTI_VALUES} distinct values")
+                            code = codes[item] = len(codes)
+                        mask |= 1 << code
+                    raw[facet].append(mask)
+                elif facet in TRI_STATE:
+                    if value not in TRI_STATE_CODES:
+                        raise ValueError(f"case {case.get('id')}: {facet} must be true, false or null, not {value!r}")
+                    code = TRI_STATE_CODES[value]
+                    codes.setdefault(value, code)
+                    raw[facet].append(code)
+                else:
+                    code = codes.get(value)
+                    if code is None:
+                        code = codes[value] = len(codes)
+                    raw[facet].append(code)
+
+        self.size = len(self.ids)
+        self.all = np.ones(self.size, dtype=bool)
+        self.columns: Dict[str, 'np.ndarray'] = {}
+        for facet, values in raw.items():
+            if facet in MULTI_VALUED:
+                self.columns[facet] = np.array(values, dtype=np.uint64)
+            elif facet in TRI_STATE:
+                self.columns[facet] = np.array(values, dtype=np.int8)
+            else:
+                self.columns[facet] = np.array(values, dtype=np.int32)
+
+    def _table_size(self, facet: str) -> int:
+        return 3 if facet in TRI_STATE else len(self._codes[facet])
+
+    def _offset(self, facet: str) -> int:
+        """Added to a stored code to index a lookup table (tri-state -1..1 -> 0..2)."""
+        return 1 if facet in TRI_STATE else 0
+
+    def values(self, facet: str) -> List[Hashable]:
+        """Distinct values of a facet, in order of first appearance."""
+        return list(self._codes[facet])
+
+    def select(self, facet: str, condition: Condition) -> 'np.ndarray':
+        """Mask of cases whose facet matches condition."""
+        codes = self._codes[facet]
+        if callable(condition):
+            wanted = [code for value, code in codes.items() if value is not None and condition(value)]
+        elif isinstance(condition, (tuple, list, set, frozenset)):
+            wanted = [codes[value] for value in condition if value in codes]
+        else:
+            wanted = [codes[condition]] if condition in codes else []
+
+        column = self.columns[facet]
+        if facet in MULTI_VALUED:
+            bits = 0
+            for code in wanted:
+                bits |= 1 << code
+            return (column & np.uint64(bits)) != 0
+        offset = self._offset(facet)
+        lookup = np.zeros(self._table_size(facet), dtype=bool)
+        lookup[[code + offset for code in wanted]] = True
+        return lookup[column + offset] if offset else lookup[column]
+
+    def query(self, **conditions: Condition) -> 'np.ndarray':
+        """AND of select() over every keyword, e.g. query(visa='EB-1A', rfe=True)."""
+        result = self.all
+        for facet, condition in conditions.items():
+            result = result & self.select(facet, condition)
+        return result
+
+    def count(self, mask: 'np.ndarray') -> int:
+        return int(np.count_nonzero(mask))
+
+    def _binned(self, facet: str, within: Optional['np.ndarray']) -> 'np.ndarray':
+        """Cases per lookup-table slot of a single-valued facet."""
+        column = self.columns[facet] if within is None else self.columns[facet][within]
+        return np.bincount(column.astype(np.intp) + self._offset(facet), minlength=self._table_size(facet))
+
+    def counts(self, facet: str, within: 'np.ndarray' = None) -> Dict[Hashable, int]:
+        """Cases per value of a facet, optionally restricted to a mask."""
+        if facet in MULTI_VALUED:
+            column = self.columns[facet] if within is None else self.columns[facet][within]
+            return {value: int(np.count_nonzero(column & np.uint64(1 << code)))
+                    for value, code in self._codes[facet].items()}
+        binned = self._binned(facet, within)
+        offset = self._offset(facet)
+        return {value: int(binned[code + offset]) for value, code in self._codes[facet].items()}
+
+    def crosstab(self, rows: str, columns: str, within: 'np.ndarray' = None) -> Dict[Hashable, Dict[Hashable, int]]:
+        """{row value: {column value: cases}}, optionally restricted to a mask."""
+        if rows in MULTI_VALUED or columns in MULTI_VALUED:
+            return {value: self.counts(columns, self.select(rows, value) if within is None
+                                       else self.select(rows, value) & within)
+                    for value in self.values(rows)}
+        width = self._table_size(columns)
+        row_codes = self.columns[rows].astype(np.intp) + self._offset(rows)
+        column_codes = self.columns[columns].astype(np.intp) + self._offset(columns)
+        cells = row_codes * width + column_codes
+        if within is not None:
+            cells = cells[within]
+        binned = np.bincount(cells, minlength=self._table_size(rows) * width)
+        row_offset, column_offset = self._offset(rows), self._offset(columns)
+        return {row: {column: int(binned[(r + row_offset) * width + c + column_offset])
+                      for column, c in self._codes[columns].items()}
+                for row, r in self._codes[rows].items()}
+
+    def positions(self, mask: 'np.ndarray') -> List[int]:
+        """Case positions (indices into the input order) in a mask."""
+        return np.flatnonzero(mask).tolist()
+
+    def case_ids(self, mask: 'np.ndarray') -> List[str]:
+        return [self.ids[i] for i in np.flatnonzero(mask)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print facet counts for a cases corpus from its columns.")
+    parser.add_argument('cases', nargs='?', type=Path, default=DEFAULT_CASES)
+    parser.add_argument('--crosstab', nargs=2, metavar=('ROWS', 'COLUMNS'), choices=FACETS,
+                        help="Print cases per pair of values of two facets instead")
+    args = parser.parse_args()
+
+    columns = CaseColumns(iter_cases(args.cases))
+    print(f"{columns.size} cases")
+    if args.crosstab:
+        rows, cols = args.crosstab
+        for row, counts in columns.crosstab(rows, cols).items():
+            listed = ', '.join(f'{value}: {n}' for value, n in counts.items() if n)
+            print(f"  {row}: {listed}")
+        return
+    for facet in columns.facets:
+        counts = sorted(columns.counts(facet).items(), key=lambda item: (-item[1], str(item[0])))
+        print(f"\n{facet}:")
+        for value, count in counts:
+            print(f"  {count:>6}  {value}")
+
+
+if __name__ == '__main__':
+    main()
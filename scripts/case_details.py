@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Lazy accordion bodies for the success-stories generators (--lazy).
+
+In lazy mode an accordion keeps its title, tags and summary in the MDX, and
+its detail sections (context, criteria, chronology) move to a per-case
+JSON fragment at success-stories/<details dir>/<hash>.json. Each generator
+has its own details directory (DETAILS_DIR for
+regenerate_all_success_stories.py, generate_mdx.DETAILS_DIR), because
+sync_fragments() deletes every fragment in it that the run did not write:
+a plain run of one generator must not remove fragments still referenced
+by the other's pages. The hash is over
+the fragment's content, so a fragment URL never changes meaning and can be
+cached forever. scripts/case-details.js fetches the fragment when the
+accordion is opened.
+
+Fragment format: {"sections": [{"heading": "...", "lines": ["...", ...]}]},
+where a line starting with "- " is a list item.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from build_cache import write_if_changed
+
+DETAILS_DIR = 'case-details'  # default, under the success-stories output directory
+HASH_CHARS = 16
+
+Sections = Sequence[Tuple[str, Sequence[str]]]
+
+
+def fragment_json(sections: Sections) -> str:
+    """Compact JSON of a case's detail sections."""
+    return json.dumps(
+        {'sections': [{'heading': heading, 'lines': list(lines)} for heading, lines in sections]},
+        ensure_ascii=False, separators=(',', ':'),
+    )
+
+
+def fragment_name(content: str) -> str:
+    """Content-hashed file name of a fragment."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:HASH_CHARS] + '.json'
+
+
+def placeholder(base_route: str, name: str, indent: str = '    ', details_dir: str = DETAILS_DIR) -> str:
+    """MDX line that case-details.js replaces with the fragment."""
+    return f'{indent}<div data-case-details="{base_route}/{details_dir}/{name}">Загрузка подробностей…</div>'
+
+
+def sync_fragments(out_dir: Path, fragments: Dict[str, str],
+                   details_dir: str = DETAILS_DIR) -> Tuple[List[str], List[str]]:
+    """Write fragments into out_dir/details_dir and delete unreferenced ones.
+
+    An empty fragments dict removes every fragment in details_dir (a
+    non-lazy build). Returns (written, removed) file names.
+    """
+    details_dir = Path(out_dir) / details_dir
+    written = [name for name, content in sorted(fragments.items())
+               if write_if_changed(details_dir / name, content + '\n')]
+    removed = []
+    if details_dir.is_dir():
+        for path in sorted(details_dir.glob('*.json')):
+            if path.name not in fragments:
+                path.unlink()
+                removed.append(path.name)
+        if not any(details_dir.iterdir()):
+            details_dir.rmdir()
+    return written, removed
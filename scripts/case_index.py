@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Inverted facet index over the cases corpus.
+
+CaseIndex is built in one pass over the cases (a list or a streaming
+iter_cases() generator) and maps every value of the indexed facets to a
+bitset of case positions, stored as a Python int: bit i is set when case i
+has that value. Boolean queries are then plain &, | and ~ on ints, and
+counts are popcounts, with no further passes over the cases.
+
+Indexed facets: visa, field, service_center, premium/rfe/noid (True, False
+or None), prep, criteria (one entry per listed criterion) and
+consulate_city. A missing field is indexed as None.
+
+Usage (print facet counts):
+  python3 scripts/case_index.py [data/cases.json]
+"""
+
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Union
+
+from case_store import iter_cases
+
+FACETS = ('visa', 'field', 'service_center', 'premium', 'rfe', 'noid', 'prep', 'criteria', 'consulate_city')
+MULTI_VALUED = {'criteria'}
+
+DEFAULT_CASES = Path(__file__).parent.parent / 'data' / 'cases.json'
+
+# A facet condition: one value, a tuple/list/set of values (any of them), or a
+# predicate over the facet's distinct values (e.g. lambda v: v.startswith('O-1')).
+Condition = Union[Hashable, tuple, list, set, frozenset, Callable[[Hashable], bool]]
+
+
+def _to_bits(positions: List[int], size: int) -> int:
+    buf = bytearray((size + 7) // 8)
+    for i in positions:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+
+if hasattr(int, 'bit_count'):
+    def popcount(bits: int) -> int:
+        return bits.bit_count()
+else:  # Python < 3.10
+    def popcount(bits: int) -> int:
+        return bin(bits).count('1')
+
+
+def iter_positions(bits: int) -> Iterator[int]:
+    """Set bit positions of bits, ascending."""
+    digits = bin(bits)[:1:-1]  # least significant bit first, without '0b'
+    i = digits.find('1')
+    while i != -1:
+        yield i
+        i = digits.find('1', i + 1)
+
+
+class CaseIndex:
+    """Facet value -> case bitset, for every facet in FACETS."""
+
+    def __init__(self, cases: Iterable[dict], facets: Iterable[str] = FACETS):
+        self.facets = tuple(facets)
+        self.ids: List[str] = []
+        positions: Dict[str, Dict[Hashable, List[int]]] = {facet: {} for facet in self.facets}
+
+        for i, case in enumerate(cases):
+            self.ids.append(case.get('id'))
+            for facet in self.facets:
+                table = positions[facet]
+                value = case.get(facet)
+                if facet in MULTI_VALUED:
+                    for item in value or ():
+                        table.setdefault(item, []).append(i)
+                else:
+                    table.setdefault(value, []).append(i)
+
+        self.size = len(self.ids)
+        self.all = (1 << self.size) - 1
+        self._bits: Dict[str, Dict[Hashable, int]] = {
+            facet: {value: _to_bits(pos, self.size) for value, pos in table.items()}
+            for facet, table in positions.items()
+        }
+
+    def values(self, facet: str) -> List[Hashable]:
+        """Distinct values of a facet, in order of first appearance."""
+        return list(self._bits[facet])
+
+    def select(self, facet: str, condition: Condition) -> int:
+        """Bitset of cases whose facet matches condition."""
+        table = self._bits[facet]
+        if callable(condition):
+            matches = [bits for value, bits in table.items() if value is not None and condition(value)]
+        elif isinstance(condition, (tuple, list, set, frozenset)):
+            matches = [table.get(value, 0) for value in condition]
+        else:
+            return table.get(condition, 0)
+        result = 0
+        for bits in matches:
+            result |= bits
+        return result
+
+    def query(self, **conditions: Condition) -> int:
+        """AND of select() over every keyword, e.g. query(visa='EB-1A', rfe=True)."""
+        result = self.all
+        for facet, condition in conditions.items():
+            result &= self.select(facet, condition)
+        return result
+
+    def count(self, bits: int) -> int:
+        return popcount(bits)
+
+    def counts(self, facet: str, within: int = None) -> Dict[Hashable, int]:
+        """Cases per value of a facet, optionally restricted to a bitset."""
+        if within is None:
+            return {value: popcount(bits) for value, bits in self._bits[facet].items()}
+        return {value: popcount(bits & within) for value, bits in self._bits[facet].items()}
+
+    def positions(self, bits: int) -> List[int]:
+        """Case positions (indices into the input order) in a bitset."""
+        return list(iter_positions(bits))
+
+    def case_ids(self, bits: int) -> List[str]:
+        return [self.ids[i] for i in iter_positions(bits)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print facet counts for a cases corpus.")
+    parser.add_argument('cases', nargs='?', type=Path, default=DEFAULT_CASES)
+    args = parser.parse_args()
+
+    index = CaseIndex(iter_cases(args.cases))
+    print(f"{index.size} cases")
+    for facet in index.facets:
+        counts = sorted(index.counts(facet).items(), key=lambda item: (-item[1], str(item[0])))
+        print(f"\n{facet}:")
+        for value, count in counts:
+            print(f"  {count:>6}  {value}")
+
+
+if __name__ == '__main__':
+    main()
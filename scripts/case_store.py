@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Streaming reader/writer for the cases corpus.
+
+Two on-disk formats, picked by file extension:
+
+- .json   the usual data/cases.json document ({"schema_version": ...,
+          "cases": [...]}, indent=2). Read incrementally: cases are decoded
+          one at a time from a 64 KiB window, never the whole array at once.
+- .jsonl  one case per line, with an optional first line {"_meta": {...}}
+          holding the top-level fields (schema_version, labels, notes).
+
+Writes go to a temp file in the target directory and are renamed into place,
+so a crash mid-write never leaves a truncated cases.json behind. JSON output
+is byte-identical to json.dump(data, f, ensure_ascii=False, indent=2).
+
+Usage (convert between formats):
+  python3 scripts/case_store.py data/cases.json /tmp/cases.jsonl
+"""
+
+import argparse
+import json
+import os
+import re
+import stat
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+from instrumentation import count
+
+CHUNK_SIZE = 1 << 16
+META_KEY = '_meta'
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+
+
+class _JsonStream:
+    """Pull JSON values one by one out of a file without reading it all."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        data = self.f.read(CHUNK_SIZE)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at EOF)."""
+        while True:
+            self.pos = _WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"{self.f.name}: expected {char!r}, found {found or 'EOF'!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number that ends the window may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_json(path: Path, meta: dict) -> Iterator[dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _JsonStream(f)
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+        while True:
+            key = stream.value()
+            stream.expect(':')
+            if key == 'cases':
+                stream.expect('[')
+                if stream.peek() == ']':
+                    stream.pos += 1
+                else:
+                    while True:
+                        yield stream.value()
+                        if stream.peek() == ',':
+                            stream.pos += 1
+                            continue
+                        stream.expect(']')
+                        break
+            else:
+                meta[key] = stream.value()
+            if stream.peek() == ',':
+                stream.pos += 1
+                continue
+            stream.expect('}')
+            return
+
+
+def _iter_jsonl(path: Path, meta: dict) -> Iterator[dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if META_KEY in record and len(record) == 1:
+                meta.update(record[META_KEY])
+                continue
+            yield record
+
+
+def open_cases(path) -> Tuple[dict, Iterator[dict]]:
+    """Return (meta, cases) for a .json or .jsonl corpus.
+
+    meta holds every top-level field except "cases". Fields stored after the
+    cases array only show up in meta once the iterator is exhausted.
+    """
+    meta: dict = {}
+    count('bytes.read', os.path.getsize(path))
+    reader = _iter_jsonl if Path(path).suffix == '.jsonl' else _iter_json
+    cases = reader(Path(path), meta)
+    # Prime the generator up to the first case so fields that precede the
+    # cases array are in meta before the caller starts writing.
+    first = next(cases, None)
+
+    def chained():
+        if first is not None:
+            yield first
+            yield from cases
+
+    return meta, chained()
+
+
+def iter_cases(path) -> Iterator[dict]:
+    """Yield cases one at a time from a .json or .jsonl corpus."""
+    return open_cases(path)[1]
+
+
+def load_cases(path) -> List[dict]:
+    """All cases as a list, for callers that need random access."""
+    return list(iter_cases(path))
+
+
+def _file_mode(path: Path) -> int:
+    """Permissions for the replacement: keep the old file's, else the umask default."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+@contextmanager
+def atomic_open(path, mode: str = 'w'):
+    """Open a temp file next to path; rename it over path on success."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        os.chmod(tmp, _file_mode(path))
+        with os.fdopen(fd, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+            count('files.written')
+            count('bytes.written', os.fstat(f.fileno()).st_size)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _indented(value, prefix: str) -> str:
+    return json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n' + prefix)
+
+
+def _write_json(f, cases: Iterable[dict], meta: dict) -> int:
+    written = set()
+    f.write('{')
+    for key, value in meta.items():
+        f.write(f'\n  {json.dumps(key, ensure_ascii=False)}: {_indented(value, "  ")},')
+        written.add(key)
+
+    count = 0
+    f.write('\n  "cases": [')
+    for case in cases:
+        f.write(',\n    ' if count else '\n    ')
+        f.write(_indented(case, '    '))
+        count += 1
+    f.write('\n  ]' if count else ']')
+
+    # Fields that came after the cases array in the source document
+    for key, value in meta.items():
+        if key not in written:
+            f.write(f',\n  {json.dumps(key, ensure_ascii=False)}: {_indented(value, "  ")}')
+    f.write('\n}')
+    return count
+
+
+def _write_jsonl(f, cases: Iterable[dict], meta: dict) -> int:
+    if meta:
+        f.write(json.dumps({META_KEY: meta}, ensure_ascii=False) + '\n')
+    count = 0
+    for case in cases:
+        f.write(json.dumps(case, ensure_ascii=False) + '\n')
+        count += 1
+    return count
+
+
+def write_cases(path, cases: Iterable[dict], meta: dict = None) -> int:
+    """Stream cases to path atomically (.json or .jsonl). Returns the count.
+
+    cases may be a generator reading from path itself: the original file
+    is only replaced after the last case has been written.
+    """
+    writer = _write_jsonl if Path(path).suffix == '.jsonl' else _write_json
+    with atomic_open(path) as f:
+        return writer(f, cases, meta if meta is not None else {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a cases corpus between .json and .jsonl.")
+    parser.add_argument('source', type=Path)
+    parser.add_argument('target', type=Path)
+    args = parser.parse_args()
+
+    meta, cases = open_cases(args.source)
+    count = write_cases(args.target, cases, meta)
+    print(f"Wrote {count} cases to {args.target}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Persistent, content-addressed cache of cleaned cases.
+
+One SQLite row per input case: the key is fingerprint([cleaner version,
+case]) and the columns hold what process_case() changed (title, context,
+summary, hide_context), or removed = 1 when the case was dropped as garbage. An
+unchanged case is served from the cache without being cleaned again.
+
+clean_cases.py stores each freshly cleaned case twice: under the raw case,
+and (cleaned once more) under the cleaned case. The default run overwrites
+data/cases.json with its output, so the next run's input is the cleaned
+case, and it hits the second row.
+
+The cleaner version is a fingerprint of clean_cases.py, which holds all the
+rule tables (BRAND_NAMES, TITLE_STOP_PHRASES, ...), so editing a rule
+changes every key; rows of other versions are deleted on open.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from build_cache import fingerprint
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cleaned (
+    key           TEXT PRIMARY KEY,
+    version       TEXT NOT NULL,
+    removed       INTEGER NOT NULL,
+    title         TEXT,
+    context       TEXT,
+    summary       TEXT,
+    hide_context  INTEGER
+)
+'''
+
+CLEANED_FIELDS = ('title', 'context', 'summary', 'hide_context')
+_BATCH = 500  # keys per SELECT, below SQLite's bound-parameter limit
+
+
+class CleanCache:
+    """SQLite-backed input case -> cleaned fields cache.
+
+    Used from the process that reads the input; workers never touch it.
+    Writes are committed in one transaction on close().
+    """
+
+    def __init__(self, path: Path, version: str):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(str(path))
+        self._db.execute(SCHEMA)
+        self._db.execute('DELETE FROM cleaned WHERE version != ?', (version,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+    def key(self, case: dict) -> str:
+        return fingerprint([self.version, case])
+
+    def get_many(self, keys: List[str]) -> Dict[str, Optional[tuple]]:
+        """Cached fields by key (None = removed case); unknown keys are absent."""
+        found = {}
+        for start in range(0, len(keys), _BATCH):
+            batch = keys[start:start + _BATCH]
+            rows = self._db.execute(
+                'SELECT key, removed, title, context, summary, hide_context FROM cleaned '
+                f'WHERE key IN ({",".join("?" * len(batch))})', batch)
+            for key, removed, *fields in rows:
+                found[key] = None if removed else fields
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, Optional[dict]]]):
+        """Store process_case() results (None for a removed case) under their keys."""
+        self._db.executemany(
+            'INSERT OR REPLACE INTO cleaned (key, version, removed, title, context, summary, hide_context) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            ((key, self.version, 1, None, None, None, None) if cleaned is None else
+             (key, self.version, 0, *(cleaned.get(field) for field in CLEANED_FIELDS))
+             for key, cleaned in items))
+
+    @staticmethod
+    def apply(case: dict, fields: Optional[tuple]) -> Optional[dict]:
+        """Rebuild process_case(case) from cached fields."""
+        if fields is None:
+            return None
+        title, context, summary, hide_context = fields
+        cleaned = case.copy()
+        cleaned['title'] = title
+        cleaned['context'] = context
+        cleaned['summary'] = summary
+        cleaned['hide_context'] = bool(hide_context)
+        return cleaned
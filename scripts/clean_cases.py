@@ -2,12 +2,58 @@
 """
 Quality gate for success stories cases.
 Cleans text, generates proper titles/summaries, filters garbage.
+
+Usage:
+  python3 scripts/clean_cases.py [data/cases.json] [-o OUTPUT] [--jobs N] [--no-cache]
+      [--timings-report [PATH]] [--profile [PATH]]
+
+--jobs N shards the cases across N worker processes (0 = one per CPU);
+output order and the removed-IDs report are the same as with one job.
+Input and output may be .json or .jsonl; cases are streamed, not loaded
+into memory all at once.
+
+Cleaned cases are cached in .cache/clean_cases.sqlite, keyed by the input
+case and the cleaner version, so a re-run only cleans new or changed cases;
+--no-cache cleans everything again. Each newly cleaned case is also cleaned
+once more and stored under its cleaned form, so the default in-place run
+(which reads back its own output next time) hits the cache as well as -o.
+
+--dedup-report PATH adds a near-duplicate stage: the cleaned contexts are
+compared with MinHash/LSH and merge suggestions are written to PATH (see
+near_duplicates.py). Cases are never merged automatically.
+
+--timings-report and --profile are described in instrumentation.py; the
+report counts calls of the HOT_FUNCTIONS below and of every regex.
 """
 
-import json
+import argparse
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from build_cache import file_fingerprint
+from case_store import open_cases, write_cases
+from clean_cache import CleanCache
+from instrumentation import add_arguments, count, instrumented, stage
+from near_duplicates import DEFAULT_THRESHOLD, NearDuplicateIndex, print_suggestions, write_report
+
+# Cases per task in --jobs mode
+CHUNK_SIZE = 256
+
+# Cleaner version: any change to this file (code or rule tables) invalidates
+# the cleaning cache
+CLEANER_VERSION = file_fingerprint([Path(__file__)])
+DEFAULT_CACHE = Path(__file__).parent.parent / '.cache' / 'clean_cases.sqlite'
+
+# Call counts and times in --timings-report
+HOT_FUNCTIONS = (
+    'process_case', 'clean_text_light', 'clean_text_for_title', 'find_approval_sentence',
+    'generate_title', 'extract_summary', 'is_card_garbage', 'expand_context',
+)
 
 # Stop phrases for titles
 TITLE_STOP_PHRASES = [
@@ -58,6 +104,44 @@ APPROVAL_KEYWORDS = [
     'пришло одобрение', 'has approved'
 ]
 
+# Greeting words that make a sentence filler
+GREETING_KEYWORDS = ['привет', 'делюсь', 'расскажу', 'появилось время', 'наконец то', 'хочу поделиться']
+
+# Keyword groups for the summary heuristics (see find_approval_sentence)
+RFE_KEYWORDS = ['rfe', 'noid']
+RFE_APPROVAL_KEYWORDS = ['апрув', 'одобр', 'approved']
+TIMELINE_KEYWORDS = ['дней', 'недел', 'месяц', 'premium', 'премиум', 'небраска', 'техас', 'вермонт', 'калифорни']
+TIMELINE_ACTION_KEYWORDS = ['рассмотр', 'получ', 'пришел', 'пришло', 'ждал', 'через']
+DETAIL_KEYWORDS = ['подавал', 'подавала', 'критери', 'петиц', 'интервью', 'консульство', 'visa', 'виза']
+
+
+# Precompiled cleaning passes. clean_text_light() applies them in the same
+# order as the original one-re.sub-per-rule version, so output is identical;
+# each pass is skipped when its trigger substring is absent.
+BOLD_RE = re.compile(r'\*\*+')
+UNDERSCORE_RE = re.compile(r'__+')
+HASHTAG_RE = re.compile(r'#\w+\s*')
+PLACEHOLDER_RES = [
+    re.compile(r'\[name\]', re.IGNORECASE),
+    re.compile(r'\[имя\]'),
+    re.compile(r'\[ссылка\]'),
+    re.compile(r'\[аккаунт\]'),
+]
+# All brands in one alternation: brand matches are word-bounded and never
+# overlap, so one pass equals one pass per brand. The lookahead on first
+# letters lets the scan skip most positions without trying every brand.
+BRAND_RE = re.compile(
+    r'\b(?=[' + ''.join(sorted({brand[0] for brand in BRAND_NAMES})) + r'])'
+    r'(?:' + '|'.join(BRAND_NAMES) + r')\b',
+    re.IGNORECASE,
+)
+# Same result as [ \t]+ -> ' ', without rewriting every single space
+SPACES_RE = re.compile(r'[ \t]{2,}|\t')
+BLANK_LINES_RE = re.compile(r'\n\s*\n+')
+
+GREETING_START_RES = [re.compile(p, re.IGNORECASE) for p in GREETING_START_PATTERNS]
+EMOJI_RE = re.compile(r'[☺️💫📖🃏📍😁🙂🥳🙏🎉✨💪🔥❤️🇺🇸🕺😏]+')
+
 
 def clean_text_light(text: str) -> str:
     """Light cleaning - remove only garbage, keep emotions and narrative."""
@@ -65,25 +149,27 @@ def clean_text_light(text: str) -> str:
         return ""
 
     # Remove markdown artifacts
-    text = re.sub(r'\*\*+', '', text)
-    text = re.sub(r'__+', '', text)
+    if '**' in text:
+        text = BOLD_RE.sub('', text)
+    if '__' in text:
+        text = UNDERSCORE_RE.sub('', text)
 
     # Remove hashtags
-    text = re.sub(r'#\w+\s*', '', text)
+    if '#' in text:
+        text = HASHTAG_RE.sub('', text)
 
     # Remove/replace placeholders
-    text = re.sub(r'\[name\]', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\[имя\]', '', text)
-    text = re.sub(r'\[ссылка\]', '', text)
-    text = re.sub(r'\[аккаунт\]', '', text)
+    if '[' in text:
+        for pattern in PLACEHOLDER_RES:
+            text = pattern.sub('', text)
 
     # Replace brand names with [сервис]
-    for brand in BRAND_NAMES:
-        text = re.sub(rf'\b{brand}\b', '[сервис]', text, flags=re.IGNORECASE)
+    text = BRAND_RE.sub('[сервис]', text)
 
     # Clean excessive whitespace but keep single newlines
-    text = re.sub(r'[ \t]+', ' ', text)
-    text = re.sub(r'\n\s*\n+', '\n', text)
+    text = SPACES_RE.sub(' ', text)
+    if '\n' in text:
+        text = BLANK_LINES_RE.sub('\n', text)
     text = text.strip()
 
     return text
@@ -94,98 +180,120 @@ def clean_text_for_title(text: str) -> str:
     text = clean_text_light(text)
 
     # Remove greetings from start
-    for pattern in GREETING_START_PATTERNS:
-        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    for pattern in GREETING_START_RES:
+        text = pattern.sub('', text)
 
     # Remove emoji
-    text = re.sub(r'[☺️💫📖🃏📍😁🙂🥳🙏🎉✨💪🔥❤️🇺🇸🕺😏]+', '', text)
+    text = EMOJI_RE.sub('', text)
 
     return text.strip()
 
 
-def is_garbage_sentence(sent: str) -> bool:
-    """Check if a sentence is just greeting/filler."""
-    sent_lower = sent.lower().strip()
+def keyword_regex(keywords: List[str]) -> re.Pattern:
+    """One regex that finds any of the keywords as a substring."""
+    return re.compile('|'.join(re.escape(kw) for kw in keywords))
 
-    # Check against known garbage sentences
-    for garbage in GARBAGE_SENTENCES:
-        if garbage in sent_lower:
-            return True
 
-    # Check greeting patterns
-    if any(g in sent_lower for g in ['привет', 'делюсь', 'расскажу', 'появилось время', 'наконец то', 'хочу поделиться']):
-        return True
+GARBAGE_RE = keyword_regex(GARBAGE_SENTENCES + GREETING_KEYWORDS)
+APPROVAL_RE = keyword_regex(APPROVAL_KEYWORDS)
+RFE_RE = keyword_regex(RFE_KEYWORDS)
+RFE_APPROVAL_RE = keyword_regex(RFE_APPROVAL_KEYWORDS)
+TIMELINE_RE = keyword_regex(TIMELINE_KEYWORDS)
+TIMELINE_ACTION_RE = keyword_regex(TIMELINE_ACTION_KEYWORDS)
+DETAIL_RE = keyword_regex(DETAIL_KEYWORDS)
+SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+NON_WORD_RE = re.compile(r'\W+')
 
-    # Too short to be meaningful
-    if len(sent_lower) < 15:
-        return True
 
-    return False
+class Sentence:
+    """One sentence with its derived forms computed once."""
+
+    __slots__ = ('text', 'lower', '_garbage', '_norm')
+
+    def __init__(self, raw: str):
+        self.text = raw.strip()
+        self.lower = raw.lower()
+        self._garbage = None
+        self._norm = None
+
+    @property
+    def is_garbage(self) -> bool:
+        if self._garbage is None:
+            sent_lower = self.lower.strip()
+            self._garbage = bool(GARBAGE_RE.search(sent_lower)) or len(sent_lower) < 15
+        return self._garbage
+
+    @property
+    def norm(self) -> str:
+        """Lowercase text without non-word characters, for similarity checks."""
+        if self._norm is None:
+            self._norm = NON_WORD_RE.sub('', self.lower)
+        return self._norm
+
+
+class Document:
+    """Text segmented into sentences once, shared by all summary heuristics."""
+
+    __slots__ = ('text', 'sentences')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.sentences = [Sentence(raw) for raw in SENTENCE_SPLIT_RE.split(text)]
+
+    def approval_sentence(self) -> Optional[str]:
+        """Best sentence describing the result, by pass priority:
+
+        1. clear approval statement
+        2. RFE/NOID with an approval
+        3. timeline info (when + how long)
+        4. case details (visa type, criteria, petition, interview)
+        5. first informative sentence
+
+        One scan records the first hit for each pass; the highest-priority
+        hit wins, exactly as running the passes one after another.
+        """
+        found = [None] * 5
+        for sent in self.sentences:
+            if sent.is_garbage:
+                continue
+            lower = sent.lower
+            length = len(sent.text)
+
+            if length > 15 and APPROVAL_RE.search(lower):
+                return sent.text[:150]
+            if found[1] is None and length > 15 and RFE_RE.search(lower) and RFE_APPROVAL_RE.search(lower):
+                found[1] = sent.text
+            if (found[2] is None and length > 15
+                    and TIMELINE_RE.search(lower) and TIMELINE_ACTION_RE.search(lower)):
+                found[2] = sent.text
+            if length > 20:
+                if found[3] is None and DETAIL_RE.search(lower):
+                    found[3] = sent.text
+                if found[4] is None:
+                    found[4] = sent.text
+
+        for sent_text in found:
+            if sent_text is not None:
+                return sent_text[:150]
+        return None
+
+
+@lru_cache(maxsize=256)
+def analyze_for_summary(text: str) -> Document:
+    """Document over the title-cleaned text, memoised per input string."""
+    return Document(clean_text_for_title(text))
+
+
+def is_garbage_sentence(sent: str) -> bool:
+    """Check if a sentence is just greeting/filler."""
+    return Sentence(sent).is_garbage
 
 
 def find_approval_sentence(text: str) -> Optional[str]:
     """Find a sentence that describes the approval result."""
     if not text:
         return None
-
-    # Clean text first
-    text = clean_text_for_title(text)
-
-    # Split into sentences
-    sentences = re.split(r'[.!?]+', text)
-
-    # First pass: look for clear approval statements
-    for sent in sentences:
-        sent_lower = sent.lower()
-        if is_garbage_sentence(sent):
-            continue
-        # Look for approval keywords
-        if any(kw in sent_lower for kw in APPROVAL_KEYWORDS):
-            clean_sent = sent.strip()
-            if len(clean_sent) > 15:
-                return clean_sent[:150]
-
-    # Second pass: look for RFE/NOID with result
-    for sent in sentences:
-        sent_lower = sent.lower()
-        if is_garbage_sentence(sent):
-            continue
-        if ('rfe' in sent_lower or 'noid' in sent_lower) and any(kw in sent_lower for kw in ['апрув', 'одобр', 'approved']):
-            clean_sent = sent.strip()
-            if len(clean_sent) > 15:
-                return clean_sent[:150]
-
-    # Third pass: look for timeline info
-    for sent in sentences:
-        sent_lower = sent.lower()
-        if is_garbage_sentence(sent):
-            continue
-        if any(kw in sent_lower for kw in ['дней', 'недел', 'месяц', 'premium', 'премиум', 'небраска', 'техас', 'вермонт', 'калифорни']):
-            if any(kw in sent_lower for kw in ['рассмотр', 'получ', 'пришел', 'пришло', 'ждал', 'через']):
-                clean_sent = sent.strip()
-                if len(clean_sent) > 15:
-                    return clean_sent[:150]
-
-    # Fourth pass: look for case details (visa type, criteria, petitioner info)
-    for sent in sentences:
-        sent_lower = sent.lower()
-        if is_garbage_sentence(sent):
-            continue
-        # Case details keywords
-        if any(kw in sent_lower for kw in ['подавал', 'подавала', 'критери', 'петиц', 'интервью', 'консульство', 'visa', 'виза']):
-            clean_sent = sent.strip()
-            if len(clean_sent) > 20:
-                return clean_sent[:150]
-
-    # Fifth pass: first non-garbage sentence
-    for sent in sentences:
-        if is_garbage_sentence(sent):
-            continue
-        clean_sent = sent.strip()
-        if len(clean_sent) > 20:
-            return clean_sent[:150]
-
-    return None
+    return analyze_for_summary(text).approval_sentence()
 
 
 def extract_key_details(case: dict) -> dict:
@@ -327,21 +435,12 @@ def extract_summary(context: str, case: dict) -> str:
     if not context:
         return build_fallback_summary(case)
 
-    # Try to find approval sentence
+    # Approval sentence, or else the first informative sentence (the last
+    # pass of find_approval_sentence)
     approval_sent = find_approval_sentence(context)
     if approval_sent:
         return approval_sent
 
-    # If no approval sentence, try first informative sentence
-    cleaned_context = clean_text_for_title(context)
-    sentences = re.split(r'[.!?]+', cleaned_context)
-    for sent in sentences:
-        if is_garbage_sentence(sent):
-            continue
-        sent_clean = sent.strip()
-        if len(sent_clean) > 20:
-            return sent_clean[:150]
-
     return build_fallback_summary(case)
 
 
@@ -409,19 +508,22 @@ def expand_context(context: str, summary: str) -> str:
         return ""
 
     # If context is same as summary, try to get more
-    sentences = re.split(r'[.!?]+', context)
-    if len(sentences) > 1:
+    doc = Document(context)
+    if len(doc.sentences) > 1:
+        summary_norm = NON_WORD_RE.sub('', summary.lower()) if summary else None
+
         # Skip first sentence if it's the summary, take next ones
         expanded = []
-        for i, sent in enumerate(sentences):
-            sent_clean = sent.strip()
-            if len(sent_clean) < 15:
+        joined_len = -1  # len(' '.join(expanded))
+        for sent in doc.sentences:
+            if len(sent.text) < 15:
                 continue
             # Skip if it's essentially the summary
-            if summary and re.sub(r'\W+', '', sent_clean.lower()) in re.sub(r'\W+', '', summary.lower()):
+            if summary_norm is not None and sent.norm in summary_norm:
                 continue
-            expanded.append(sent_clean)
-            if len(' '.join(expanded)) > 200:
+            expanded.append(sent.text)
+            joined_len += len(sent.text) + 1
+            if joined_len > 200:
                 break
 
         if expanded:
@@ -430,10 +532,15 @@ def expand_context(context: str, summary: str) -> str:
     return context
 
 
-def is_card_garbage(case: dict) -> bool:
-    """Check if the entire card has no useful content."""
-    title = clean_text_for_title(case.get('title', ''))
-    context = clean_text_light(case.get('context', ''))
+def is_card_garbage(case: dict, title: str = None, context: str = None) -> bool:
+    """Check if the entire card has no useful content.
+
+    title/context may be passed in already cleaned to avoid cleaning twice.
+    """
+    if title is None:
+        title = clean_text_for_title(case.get('title', ''))
+    if context is None:
+        context = clean_text_light(case.get('context', ''))
 
     # Title is garbage
     title_bad = is_title_garbage(title)
@@ -456,14 +563,14 @@ def is_card_garbage(case: dict) -> bool:
 
 def process_case(case: dict) -> Optional[dict]:
     """Process a single case, returning cleaned version or None if garbage."""
-    # Check if entire card is garbage
-    if is_card_garbage(case):
-        return None
-
     # Clean texts
     cleaned_title = clean_text_for_title(case.get('title', ''))
     cleaned_context = clean_text_light(case.get('context', ''))
 
+    # Check if entire card is garbage
+    if is_card_garbage(case, cleaned_title, cleaned_context):
+        return None
+
     # Generate title if needed
     if is_title_garbage(cleaned_title):
         cleaned_title = generate_title(case)
@@ -490,38 +597,199 @@ def process_case(case: dict) -> Optional[dict]:
     return cleaned
 
 
-def process_all_cases(input_path: str, output_path: str = None):
-    """Process all cases and save cleaned version."""
-    with open(input_path) as f:
-        data = json.load(f)
+def _process_chunk(chunk: List[dict]) -> List[Optional[dict]]:
+    return [process_case(case) for case in chunk]
 
-    original_count = len(data['cases'])
-    cleaned_cases = []
-    removed_ids = []
 
-    for case in data['cases']:
+def _process_chunk_cached(chunk: List[dict]) -> List[Tuple[Optional[dict], Optional[dict]]]:
+    """(cleaned, cleaned again) per case, the second for the cleaned case's cache entry."""
+    results = []
+    for case in chunk:
         cleaned = process_case(case)
+        again = cleaned if cleaned is None or cleaned == case else process_case(cleaned)
+        results.append((cleaned, again))
+    return results
+
+
+def _chunks(cases: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    chunk = []
+    for case in cases:
+        chunk.append(case)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _lookup(chunk: List[dict], cache: Optional[CleanCache]) -> Tuple[list, dict, List[dict]]:
+    """(keys, cached fields by key, cases still to clean) for one chunk."""
+    if cache is None:
+        return [], {}, chunk
+    with stage('cache'):
+        keys = [cache.key(case) for case in chunk]
+        found = cache.get_many(keys)
+    return keys, found, [case for case, key in zip(chunk, keys) if key not in found]
+
+
+def _merge(chunk: List[dict], keys: list, found: dict, fresh: list,
+           cache: Optional[CleanCache]) -> Iterator[Tuple[dict, Optional[dict]]]:
+    """Yield (case, cleaned) for a chunk from cached fields plus freshly cleaned results.
+
+    With a cache, fresh holds _process_chunk_cached() pairs: the cleaned case
+    is stored under the input's key, and what cleaning it gives under its own
+    key, which is what the next in-place run reads.
+    """
+    if cache is None:
+        yield from zip(chunk, fresh)
+        return
+    fresh = iter(fresh)
+    stored = []
+    for case, key in zip(chunk, keys):
+        if key in found:
+            yield case, cache.apply(case, found[key])
+        else:
+            cleaned, again = next(fresh)
+            stored.append((key, cleaned))
+            if cleaned is not None and cleaned != case:
+                stored.append((cache.key(cleaned), again))
+            yield case, cleaned
+    with stage('cache'):
+        cache.put_many(stored)
+
+
+def iter_processed(cases: Iterable[dict], jobs: int = 1, chunk_size: int = CHUNK_SIZE,
+                   cache: Optional[CleanCache] = None) -> Iterator[Tuple[dict, Optional[dict]]]:
+    """Yield (case, cleaned_or_None) in input order, optionally on a process pool.
+
+    Chunks are submitted as the input is read, with at most 2 * jobs chunks
+    in flight, so memory stays bounded however long the input is. With a
+    cache, only cases missing from it are cleaned (and then stored).
+    """
+    process_chunk = _process_chunk if cache is None else _process_chunk_cached
+    if jobs <= 1:
+        for chunk in _chunks(cases, chunk_size):
+            keys, found, todo = _lookup(chunk, cache)
+            with stage('clean'):
+                fresh = process_chunk(todo)
+            yield from _merge(chunk, keys, found, fresh, cache)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for chunk in _chunks(cases, chunk_size):
+            keys, found, todo = _lookup(chunk, cache)
+            pending.append((chunk, keys, found, pool.submit(process_chunk, todo) if todo else None))
+            if len(pending) >= jobs * 2:
+                done, keys, found, future = pending.popleft()
+                with stage('clean'):
+                    fresh = future.result() if future else []
+                yield from _merge(done, keys, found, fresh, cache)
+        while pending:
+            done, keys, found, future = pending.popleft()
+            with stage('clean'):
+                fresh = future.result() if future else []
+            yield from _merge(done, keys, found, fresh, cache)
+
+
+def process_cases(cases: Iterable[dict], jobs: int = 1, chunk_size: int = CHUNK_SIZE,
+                  cache: Optional[CleanCache] = None) -> Tuple[list, list]:
+    """Run process_case() over cases, optionally on a process pool.
+
+    Results come back in input order, so the output does not depend on the
+    number of jobs.
+
+    Returns (cleaned_cases, removed_ids).
+    """
+    cleaned_cases = []
+    removed_ids = []
+    for case, cleaned in iter_processed(cases, jobs, chunk_size, cache):
         if cleaned:
             cleaned_cases.append(cleaned)
         else:
             removed_ids.append(case.get('id', 'unknown'))
-
-    data['cases'] = cleaned_cases
-
-    output = output_path or input_path
-    with open(output, 'w') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-    print(f"Processed {original_count} cases")
-    print(f"Kept: {len(cleaned_cases)}")
+    return cleaned_cases, removed_ids
+
+
+def process_all_cases(input_path: str, output_path: str = None, jobs: int = 1,
+                      dedup_report: str = None, dedup_threshold: float = DEFAULT_THRESHOLD,
+                      cache_path: Optional[Path] = None) -> list:
+    """Process all cases and save cleaned version.
+
+    Cases are streamed from input to output one at a time (see
+    case_store.py); either path may be .json or .jsonl. With dedup_report,
+    near-duplicate merge suggestions for the kept cases are written there.
+    With cache_path, cases cleaned by an earlier run of the same cleaner
+    version are taken from that cache (see clean_cache.py).
+    Returns the IDs of removed cases.
+    """
+    meta, cases = open_cases(input_path)
+    processed = 0
+    removed_ids = []
+    duplicates = NearDuplicateIndex(dedup_threshold) if dedup_report else None
+    cache = CleanCache(cache_path, CLEANER_VERSION) if cache_path else None
+
+    def kept():
+        nonlocal processed
+        for case, cleaned in iter_processed(cases, jobs, cache=cache):
+            processed += 1
+            if cleaned:
+                if duplicates is not None:
+                    with stage('dedup-index'):
+                        duplicates.add(cleaned)
+                yield cleaned
+            else:
+                removed_ids.append(case.get('id', 'unknown'))
+
+    try:
+        # Reading, cleaning and writing are interleaved: the nested stages
+        # are the cleaning part, the rest is JSON I/O
+        with stage('stream'):
+            kept_count = write_cases(output_path or input_path, kept(), meta)
+    finally:
+        if cache is not None:
+            cache.close()
+    count('cases.read', processed)
+    count('cases.kept', kept_count)
+    count('cases.removed', len(removed_ids))
+
+    print(f"Processed {processed} cases")
+    print(f"Kept: {kept_count}")
     print(f"Removed: {len(removed_ids)}")
     if removed_ids:
         print(f"Removed IDs: {removed_ids}")
+    if cache is not None:
+        print(f"Cache: {cache.hits} reused, {cache.misses} cleaned")
+        count('cache.hits', cache.hits)
+        count('cache.misses', cache.misses)
+
+    if duplicates is not None:
+        with stage('dedup-suggest'):
+            suggestions = duplicates.suggestions()
+        write_report(dedup_report, suggestions, dedup_threshold)
+        print(f"Near-duplicates: {len(suggestions)} merge suggestions written to {dedup_report}")
+        print_suggestions(suggestions[:20])
+        if len(suggestions) > 20:
+            print(f"  ... and {len(suggestions) - 20} more")
 
-    return data
+    return removed_ids
 
 
 if __name__ == '__main__':
-    import sys
-    input_path = sys.argv[1] if len(sys.argv) > 1 else '/Users/aeb/mintlify-docs/data/cases.json'
-    process_all_cases(input_path)
+    parser = argparse.ArgumentParser(description="Clean success-stories cases in place.")
+    parser.add_argument('input', nargs='?', default='/Users/aeb/mintlify-docs/data/cases.json')
+    parser.add_argument('-o', '--output', help="Write here instead of overwriting the input")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Worker processes (default: 1, 0 = one per CPU)")
+    parser.add_argument('--cache', type=Path, default=DEFAULT_CACHE,
+                        help=f"Cleaning cache (default: {DEFAULT_CACHE})")
+    parser.add_argument('--no-cache', action='store_true', help="Clean every case again")
+    parser.add_argument('--dedup-report', help="Write near-duplicate merge suggestions (JSON) here")
+    parser.add_argument('--dedup-threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Minimum estimated context similarity (default: {DEFAULT_THRESHOLD})")
+    add_arguments(parser)
+    args = parser.parse_args()
+    with instrumented('clean_cases', args, globals(), HOT_FUNCTIONS):
+        process_all_cases(args.input, args.output, jobs=args.jobs or os.cpu_count(),
+                          dedup_report=args.dedup_report, dedup_threshold=args.dedup_threshold,
+                          cache_path=None if args.no_cache else args.cache)
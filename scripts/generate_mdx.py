@@ -1,11 +1,29 @@
 #!/usr/bin/env python3
 """
 Generate MDX pages for success stories with quality gate.
+
+Builds are incremental: a page is re-rendered only when its member cases
+or the generator/cleaner code change (see build_cache.py), and a file is
+rewritten only when its bytes differ. Pass --force to rebuild every page.
+Pages with more than --page-size cases are split into parts behind an
+index page (see page_render.py). --lazy moves accordion details to per-case
+JSON fragments loaded on expand (see case_details.py). --columnar resolves
+page members with NumPy masks over a case_columns.CaseColumns instead of
+the bitset CaseIndex; both give the same pages. --timings-report and
+--profile are described in instrumentation.py.
 """
 
-import json
+import argparse
 import re
 from pathlib import Path
+from typing import List, Tuple
+from build_cache import BuildManifest, FragmentCache, file_fingerprint
+from case_details import fragment_json, fragment_name, placeholder
+from case_columns import CaseColumns, np
+from case_index import CaseIndex
+from case_store import load_cases
+from instrumentation import add_arguments, count, instrumented, stage
+from page_render import DEFAULT_PAGE_SIZE, PageSpec, Section, build_pages
 from clean_cases import (
     clean_text_light, clean_text_for_title, is_title_garbage,
     generate_title, extract_summary, is_context_duplicate, expand_context
@@ -14,6 +32,28 @@ from clean_cases import (
 BASE_DIR = Path('/Users/aeb/mintlify-docs')
 DATA_PATH = BASE_DIR / 'data' / 'cases.json'
 STORIES_DIR = BASE_DIR / 'success-stories'
+DOCS_PATH = BASE_DIR / 'docs.json'
+MANIFEST_PATH = BASE_DIR / '.cache' / 'generate_mdx_manifest.json'
+FRAGMENTS_PATH = BASE_DIR / '.cache' / 'generate_mdx_fragments.json'
+LAZY_FRAGMENTS_PATH = BASE_DIR / '.cache' / 'generate_mdx_lazy_fragments.json'
+DETAILS_PATH = BASE_DIR / '.cache' / 'generate_mdx_details.json'
+# --lazy fragments; regenerate_all_success_stories.py owns case-details/
+DETAILS_DIR = 'case-details-mdx'
+SCRIPT_DIR = Path(__file__).parent
+
+# Renderer version: any change to the generator or the cleaner invalidates
+# cached pages and accordion fragments.
+RENDERER_VERSION = file_fingerprint([Path(__file__), SCRIPT_DIR / 'clean_cases.py',
+                                     SCRIPT_DIR / 'page_render.py', SCRIPT_DIR / 'case_index.py',
+                                     SCRIPT_DIR / 'case_columns.py', SCRIPT_DIR / 'case_details.py'])
+ACCORDIONS = FragmentCache(RENDERER_VERSION)
+LAZY_ACCORDIONS = FragmentCache(RENDERER_VERSION + ':lazy')
+DETAILS = FragmentCache(RENDERER_VERSION + ':details')
+
+# Call counts and times in --timings-report
+HOT_FUNCTIONS = ('accordion_parts', 'make_accordion', 'make_lazy_accordion', 'make_details',
+                 'clean_text_light', 'clean_text_for_title', 'generate_title', 'extract_summary',
+                 'expand_context', 'build_pages')
 
 
 def get_icon(field: str, visa: str) -> str:
@@ -39,8 +79,8 @@ def get_icon(field: str, visa: str) -> str:
     return 'star'
 
 
-def make_accordion(case: dict) -> str:
-    """Generate accordion MDX for a case."""
+def accordion_parts(case: dict) -> Tuple[str, List[Tuple[str, List[str]]]]:
+    """Accordion head (opening tag, summary, tags) and detail sections for a case."""
     visa = case.get('visa', 'EB-1A')
     field = case.get('field', '')
 
@@ -97,7 +137,7 @@ def make_accordion(case: dict) -> str:
             show_context = False
 
     # Build accordion
-    accordion = f'''  <Accordion title="{title}" icon="{icon}">
+    head = f'''  <Accordion title="{title}" icon="{icon}">
     **Итог:** {summary}
 
     <div style={{{{display: 'flex', flexWrap: 'wrap', gap: '8px', marginBottom: '16px'}}}}>
@@ -105,6 +145,7 @@ def make_accordion(case: dict) -> str:
     </div>
 '''
 
+    sections = []
     if show_context:
         # Truncate context to reasonable length
         display_context = context[:400]
@@ -114,241 +155,209 @@ def make_accordion(case: dict) -> str:
             if last_period > 200:
                 display_context = display_context[:last_period + 1]
 
-        accordion += f'''
-    ### Контекст
-    {display_context}
-'''
-
-    accordion += '\n  </Accordion>'
-    return accordion
-
-
-def generate_cases_preview(cases: list) -> str:
-    """Generate cases-preview.mdx content."""
-    eb1a = [c for c in cases if c.get('visa') == 'EB-1A']
-    eb2 = [c for c in cases if c.get('visa') == 'EB-2 NIW']
-    o1 = [c for c in cases if c.get('visa', '').startswith('O-1')]
-    total = len(cases)
-
-    output = f'''---
-title: "Все истории успеха"
-sidebarTitle: "Все истории ({total})"
-description: "Все {total} реальных кейсов из сообщества."
-icon: "grid-2"
----
-
-<Note>
-**{total} кейсов** из Telegram-сообщества. Данные из оригинальных сообщений.
-</Note>
-
-<CardGroup cols={{4}}>
-  <Card title="EB-1A ({len(eb1a)})" icon="star" href="/success-stories/by-visa/eb-1a">
-    Полный список
-  </Card>
-  <Card title="EB-2 NIW ({len(eb2)})" icon="lightbulb" href="/success-stories/by-visa/eb-2-niw">
-    Полный список
-  </Card>
-  <Card title="O-1 ({len(o1)})" icon="bolt" href="/success-stories/by-visa/o-1">
-    Полный список
-  </Card>
-</CardGroup>
-
----
-
-## EB-1A ({len(eb1a)})
-
-<AccordionGroup>
-'''
-
-    for case in eb1a:
-        output += make_accordion(case) + '\n'
+        sections.append(('Контекст', [display_context]))
 
-    output += f'''</AccordionGroup>
+    return head, sections
 
-## EB-2 NIW ({len(eb2)})
 
-<AccordionGroup>
-'''
-
-    for case in eb2:
-        output += make_accordion(case) + '\n'
-
-    output += f'''</AccordionGroup>
-
-## O-1 ({len(o1)})
+def make_accordion(case: dict) -> str:
+    """Generate accordion MDX for a case."""
+    accordion, sections = accordion_parts(case)
+    for heading, lines in sections:
+        accordion += f'\n    ### {heading}\n'
+        accordion += ''.join(f'    {line}\n' for line in lines)
+    accordion += '\n  </Accordion>'
+    return accordion
 
-<AccordionGroup>
-'''
 
-    for case in o1:
-        output += make_accordion(case) + '\n'
+def make_details(case: dict) -> str:
+    """JSON fragment with the detail sections, for --lazy (empty string: none)."""
+    _, sections = accordion_parts(case)
+    return fragment_json(sections) if sections else ''
 
-    output += '</AccordionGroup>\n'
-    return output
 
+def make_lazy_accordion(case: dict) -> str:
+    """Accordion with its detail sections replaced by a case-details.js placeholder."""
+    accordion, _ = accordion_parts(case)
+    details = render_details(case)
+    if details:
+        accordion += '\n' + placeholder('/success-stories', fragment_name(details), details_dir=DETAILS_DIR) + '\n'
+    accordion += '\n  </Accordion>'
+    return accordion
 
-def generate_filtered_page(cases: list, filter_fn, title: str, sidebar: str,
-                           description: str, icon: str, heading: str, note: str = None) -> str:
-    """Generate a filtered page (RFE, premium, etc.)."""
-    filtered = [c for c in cases if filter_fn(c)]
-    count = len(filtered)
 
-    output = f'''---
-title: "{title}"
-sidebarTitle: "{sidebar} ({count})"
-description: "{description}"
-icon: "{icon}"
----
-'''
+def render_accordion(case: dict) -> str:
+    """make_accordion() memoised per case, so a case shown on several pages is cleaned once."""
+    return ACCORDIONS.get_or_render(case, make_accordion)
 
-    if note:
-        output += f'''
-<Note>
-{note}
-</Note>
-'''
 
-    output += f'''
-## {heading} ({count})
+def render_details(case: dict) -> str:
+    return DETAILS.get_or_render(case, make_details)
 
-<AccordionGroup>
-'''
 
-    for case in filtered:
-        output += make_accordion(case) + '\n'
+def render_lazy_accordion(case: dict) -> str:
+    return LAZY_ACCORDIONS.get_or_render(case, make_lazy_accordion)
 
-    output += '</AccordionGroup>\n'
-    return output
 
+O1_NOTE = """**O-1** имеет две подкатегории:
+- **O-1A** — для бизнеса, науки, образования, спорта
+- **O-1B** — для искусства, кино, ТВ"""
 
-def generate_visa_page(cases: list, visa_filter: str, title: str, icon: str, note: str = None) -> str:
-    """Generate a by-visa page."""
-    if visa_filter.startswith('O-1'):
-        filtered = [c for c in cases if c.get('visa', '').startswith('O-1')]
-    else:
-        filtered = [c for c in cases if c.get('visa') == visa_filter]
 
-    count = len(filtered)
+def is_o1(visa):
+    """O-1, O-1A and O-1B share one page and one preview section."""
+    return visa.startswith('O-1')
 
-    output = f'''---
-title: "Истории успеха: {visa_filter}"
-sidebarTitle: "{visa_filter} ({count})"
-description: "Реальные кейсы {visa_filter}."
-icon: "{icon}"
----
-'''
 
-    if note:
-        output += f'''
-<Note>
-{note}
-</Note>
-'''
+VISA_WHERE = {
+    'EB-1A': {'visa': 'EB-1A'},
+    'EB-2 NIW': {'visa': 'EB-2 NIW'},
+    'O-1': {'visa': is_o1},
+}
 
-    output += f'''
-## Кейсы {visa_filter} ({count})
+PREVIEW_INTRO = """<CardGroup cols={{4}}>
+  <Card title="EB-1A ({groups[EB-1A]})" icon="star" href="/success-stories/by-visa/eb-1a">
+    Полный список
+  </Card>
+  <Card title="EB-2 NIW ({groups[EB-2 NIW]})" icon="lightbulb" href="/success-stories/by-visa/eb-2-niw">
+    Полный список
+  </Card>
+  <Card title="O-1 ({groups[O-1]})" icon="bolt" href="/success-stories/by-visa/o-1">
+    Полный список
+  </Card>
+</CardGroup>
 
-<AccordionGroup>
-'''
+---"""
+
+
+def visa_page(path: str, visa: str, icon: str, note: str = None) -> PageSpec:
+    """A by-visa page (O-1 covers O-1A and O-1B)."""
+    return PageSpec(
+        path,
+        {
+            'title': f"Истории успеха: {visa}",
+            'sidebarTitle': f"{visa} ({{count}})",
+            'description': f"Реальные кейсы {visa}.",
+            'icon': icon,
+        },
+        sections=(Section(None, f'Кейсы {visa} ({{count}})'),),
+        where=VISA_WHERE[visa],
+        note=note,
+    )
 
-    for case in filtered:
-        output += make_accordion(case) + '\n'
 
-    output += '</AccordionGroup>\n'
-    return output
+# Output pages, relative to STORIES_DIR
+PAGES = [
+    PageSpec(
+        'cases-preview.mdx',
+        {
+            'title': "Все истории успеха",
+            'sidebarTitle': "Все истории ({count})",
+            'description': "Все {count} реальных кейсов из сообщества.",
+            'icon': "grid-2",
+        },
+        sections=tuple(Section(visa, f'{visa} ({{count}})', where) for visa, where in VISA_WHERE.items()),
+        note='**{count} кейсов** из Telegram-сообщества. Данные из оригинальных сообщений.',
+        intro=PREVIEW_INTRO,
+    ),
+    PageSpec(
+        'with-rfe.mdx',
+        {
+            'title': "Кейсы с RFE (Request for Evidence)",
+            'sidebarTitle': "Одобрение через RFE ({count})",
+            'description': "Истории успеха, где USCIS запросил дополнительные доказательства.",
+            'icon': "file-circle-question",
+        },
+        sections=(Section(None, 'Кейсы с RFE ({count})'),),
+        where={'rfe': True},
+        note="**RFE** - запрос дополнительных доказательств. Не отказ, а возможность усилить кейс.",
+    ),
+    PageSpec(
+        'premium.mdx',
+        {
+            'title': "Кейсы с Premium Processing",
+            'sidebarTitle': "Premium ({count})",
+            'description': "Истории успеха с ускоренным рассмотрением.",
+            'icon': "bolt",
+        },
+        sections=(Section(None, 'Кейсы с Premium ({count})'),),
+        where={'premium': True},
+        note="**Premium Processing** - ускоренное рассмотрение за $2,805 (I-140). "
+             "USCIS дает ответ в течение 15 рабочих дней.",
+    ),
+    PageSpec(
+        'self-prepared.mdx',
+        {
+            'title': "Самоподача без адвоката",
+            'sidebarTitle': "Самоподача ({count})",
+            'description': "Кейсы самостоятельной подготовки петиции.",
+            'icon': "user",
+        },
+        sections=(Section(None, 'Кейсы самоподачи ({count})'),),
+        where={'prep': 'self'},
+        note="**Самоподача** - подготовка петиции без адвоката. Экономия $5,000-15,000.",
+    ),
+    visa_page('by-visa/eb-1a.mdx', 'EB-1A', "star"),
+    visa_page('by-visa/eb-2-niw.mdx', 'EB-2 NIW', "lightbulb"),
+    # O-1 page with helpful note
+    visa_page('by-visa/o-1.mdx', 'O-1', "bolt", note=O1_NOTE),
+]
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate success-stories MDX pages.")
+    parser.add_argument('--force', action='store_true', help="Re-render every page")
+    parser.add_argument('--no-fragment-cache', action='store_true',
+                        help="Do not load or save rendered accordions on disk")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"Split pages with more cases into parts (default: {DEFAULT_PAGE_SIZE}, 0 = never)")
+    parser.add_argument('--lazy', action='store_true',
+                        help=f"Move accordion details to success-stories/{DETAILS_DIR}/*.json, loaded on expand")
+    parser.add_argument('--columnar', action='store_true',
+                        help="Filter cases with NumPy column masks instead of the bitset index")
+    add_arguments(parser)
+    args = parser.parse_args()
+    if args.columnar and np is None:
+        parser.error("--columnar needs NumPy (pip install numpy)")
+    with instrumented('generate_mdx', args, globals(), HOT_FUNCTIONS):
+        run(args)
+
+
+def run(args):
     # Load cases
-    with open(DATA_PATH) as f:
-        data = json.load(f)
-    cases = data['cases']
+    with stage('load'):
+        cases = load_cases(DATA_PATH)
+    count('cases.read', len(cases))
 
     print(f"Generating MDX from {len(cases)} cases...")
 
-    # Generate cases-preview.mdx
-    content = generate_cases_preview(cases)
-    (STORIES_DIR / 'cases-preview.mdx').write_text(content)
-    print("  - cases-preview.mdx")
-
-    # Generate with-rfe.mdx
-    content = generate_filtered_page(
-        cases,
-        lambda c: c.get('rfe'),
-        "Кейсы с RFE (Request for Evidence)",
-        "Одобрение через RFE",
-        "Истории успеха, где USCIS запросил дополнительные доказательства.",
-        "file-circle-question",
-        "Кейсы с RFE",
-        note="**RFE** - запрос дополнительных доказательств. Не отказ, а возможность усилить кейс."
-    )
-    (STORIES_DIR / 'with-rfe.mdx').write_text(content)
-    print("  - with-rfe.mdx")
-
-    # Generate premium.mdx
-    content = generate_filtered_page(
-        cases,
-        lambda c: c.get('premium'),
-        "Кейсы с Premium Processing",
-        "Premium",
-        "Истории успеха с ускоренным рассмотрением.",
-        "bolt",
-        "Кейсы с Premium",
-        note="**Premium Processing** - ускоренное рассмотрение за $2,805 (I-140). USCIS дает ответ в течение 15 рабочих дней."
-    )
-    (STORIES_DIR / 'premium.mdx').write_text(content)
-    print("  - premium.mdx")
-
-    # Generate self-prepared.mdx
-    content = generate_filtered_page(
-        cases,
-        lambda c: c.get('prep') == 'self',
-        "Самоподача без адвоката",
-        "Самоподача",
-        "Кейсы самостоятельной подготовки петиции.",
-        "user",
-        "Кейсы самоподачи",
-        note="**Самоподача** - подготовка петиции без адвоката. Экономия $5,000-15,000."
+    if args.lazy:
+        caches = {LAZY_ACCORDIONS: LAZY_FRAGMENTS_PATH, DETAILS: DETAILS_PATH}
+    else:
+        caches = {ACCORDIONS: FRAGMENTS_PATH}
+    index = CaseColumns(cases) if args.columnar else CaseIndex(cases)
+    build_pages(
+        PAGES, cases, index,
+        out_dir=STORIES_DIR, docs_path=DOCS_PATH, manifest=BuildManifest(MANIFEST_PATH),
+        renderer=RENDERER_VERSION,
+        accordion=render_lazy_accordion if args.lazy else render_accordion,
+        details=render_details if args.lazy else None, details_dir=DETAILS_DIR,
+        caches={} if args.no_fragment_cache else caches,
+        page_size=args.page_size, force=args.force,
     )
-    (STORIES_DIR / 'self-prepared.mdx').write_text(content)
-    print("  - self-prepared.mdx")
-
-    # Generate by-visa pages
-    visa_dir = STORIES_DIR / 'by-visa'
-    visa_dir.mkdir(exist_ok=True)
-
-    content = generate_visa_page(cases, 'EB-1A', "Истории успеха: EB-1A", "star")
-    (visa_dir / 'eb-1a.mdx').write_text(content)
-    print("  - by-visa/eb-1a.mdx")
-
-    content = generate_visa_page(cases, 'EB-2 NIW', "Истории успеха: EB-2 NIW", "lightbulb")
-    (visa_dir / 'eb-2-niw.mdx').write_text(content)
-    print("  - by-visa/eb-2-niw.mdx")
-
-    # O-1 page with helpful note
-    o1_note = """**O-1** имеет две подкатегории:
-- **O-1A** — для бизнеса, науки, образования, спорта
-- **O-1B** — для искусства, кино, ТВ"""
-    content = generate_visa_page(cases, 'O-1', "Истории успеха: O-1", "bolt", note=o1_note)
-    (visa_dir / 'o-1.mdx').write_text(content)
-    print("  - by-visa/o-1.mdx")
+    cache = LAZY_ACCORDIONS if args.lazy else ACCORDIONS
+    print(f"  Accordions: {cache.misses} rendered, {cache.hits} reused")
+    count('accordions.rendered', cache.misses)
+    count('accordions.reused', cache.hits)
 
     # Print stats
-    eb1a = len([c for c in cases if c.get('visa') == 'EB-1A'])
-    eb2 = len([c for c in cases if c.get('visa') == 'EB-2 NIW'])
-    o1 = len([c for c in cases if c.get('visa', '').startswith('O-1')])
-    rfe = len([c for c in cases if c.get('rfe')])
-    premium = len([c for c in cases if c.get('premium')])
-    self_prep = len([c for c in cases if c.get('prep') == 'self'])
-
     print(f"\nStats:")
-    print(f"  Total: {len(cases)}")
-    print(f"  EB-1A: {eb1a}")
-    print(f"  EB-2 NIW: {eb2}")
-    print(f"  O-1: {o1}")
-    print(f"  RFE: {rfe}")
-    print(f"  Premium: {premium}")
-    print(f"  Self-prep: {self_prep}")
+    print(f"  Total: {index.size}")
+    for visa, where in VISA_WHERE.items():
+        print(f"  {visa}: {index.count(index.query(**where))}")
+    print(f"  RFE: {index.count(index.query(rfe=True))}")
+    print(f"  Premium: {index.count(index.query(premium=True))}")
+    print(f"  Self-prep: {index.count(index.query(prep='self'))}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Generate the RFE database pages (rfe-data/*.mdx) from data/rfe_cases.json.
+
+One record per RFE, NOID or Denial document (see the notes in the data
+file). Every page is a view of the same records, in file order:
+
+  all.mdx                 every record
+  nebraska.mdx, texas.mdx records of that service center
+  <field>.mdx             records whose "fields" list the page slug
+
+Counts in heroes, links and footers and the "подают X%, засчитывают Y%"
+tips are computed from the records (tips via rfe_stats.CriteriaStats), so editing one record updates every
+page it is on. Styling lives in custom.css (.rfe-* classes; table
+columns are styled by position), so rows carry no inline styles. Field
+page texts (titles, subtitles, the criteria shown in each tip) are
+configured in FIELDS below.
+
+A page file is rewritten only when its bytes change. --check writes
+nothing and exits 1 when a page is out of date (e.g. edited by hand).
+
+Usage:
+  python3 scripts/generate_rfe_pages.py [data/rfe_cases.json] [--check]
+      [--timings-report [PATH]] [--profile [PATH]]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from build_cache import write_if_changed
+from case_store import open_cases
+from instrumentation import add_arguments, count, instrumented, stage
+from officer_index import normalize_officer
+from rfe_stats import ALL, CriteriaStats
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_DATA = PROJECT_ROOT / 'data' / 'rfe_cases.json'
+PAGES_DIR = PROJECT_ROOT / 'rfe-data'
+
+HOT_FUNCTIONS = ('render_row', 'render_criteria')
+
+TYPE_BADGES = {'RFE': ('rfe', 'RFE'), 'NOID': ('noid', 'NOID'), 'Denial': ('denial', 'DENY')}
+CRITERION_NAMES = {'Critical': 'Critical Role'}  # names in tips, where they differ from chips
+
+
+class Center(NamedTuple):
+    slug: str
+    emoji: str
+
+
+CENTERS = {
+    'Nebraska': Center('nebraska', '🌽'),
+    'Texas': Center('texas', '🤠'),
+}
+
+
+class Stat(NamedTuple):
+    criterion: str      # key in a record's criteria
+    label: str = ''     # shown instead of the criterion name
+    comment: str = ''   # appended after the percentages, with its punctuation
+
+
+class Field(NamedTuple):
+    slug: str
+    emoji: str
+    short: str                      # link labels and the tip heading
+    sidebar: str                    # sidebarTitle, footer, finder label
+    name: str                       # page title and hero badge
+    subtitle: str
+    description: str
+    icon: str
+    examples: Tuple[str, ...]       # profession tags in the all.mdx finder
+    stats: Tuple[Stat, ...]
+
+
+BEST = '. Лучший критерий!'
+HARD = '. Сложно, но важен для Final Merits'
+
+FIELDS = (
+    Field('business', '💼', 'Business', 'Business', 'Business & Management',
+          'CEOs, Entrepreneurs, Managers, Consultants',
+          'для бизнес-профессионалов: CEOs, Managers, Consultants, Entrepreneurs', 'chart-line',
+          ('CFO', 'CEO', 'Product Manager', 'Digital Marketer', 'HR Director', 'VC Advisor', 'Tax Consultant'),
+          (Stat('Judgement', comment=BEST), Stat('Scholarly'), Stat('Critical'), Stat('Original', comment=HARD))),
+    Field('it-software', '💻', 'IT', 'IT & Software', 'IT & Software',
+          'Software Engineers, DevOps, ML Engineers',
+          'для IT специалистов: Software Engineers, Developers, DevOps, Data Scientists', 'code',
+          ('Software Engineer', 'ML Engineer', 'Security Engineer', 'Application Architect', 'Developer Lead'),
+          (Stat('Judgement', comment=BEST), Stat('Scholarly'),
+           Stat('Original', comment='. Сложно доказать, но важен для Final Merits'), Stat('Association'))),
+    Field('engineering', '⚙️', 'Engineering', 'Engineering', 'Engineering',
+          'Civil, Electrical, Architects, Construction',
+          'для инженеров: Civil Engineers, Electrical Engineers, Architects, Construction Managers', 'wrench',
+          ('Civil Engineer', 'Construction Manager', 'Solution Architect', 'Electrical Engineer'),
+          (Stat('Judgement', comment=BEST), Stat('Scholarly'), Stat('Critical'), Stat('Original', comment=HARD))),
+    Field('arts-design', '🎨', 'Arts', 'Arts & Design', 'Arts & Design',
+          'Designers, Photographers, Artists',
+          'для творческих профессий: Designers, Artists, Photographers, Art Directors', 'palette',
+          ('Photographer', 'Graphic Designer', 'Interior Designer', 'Light Designer'),
+          (Stat('Judgement', comment=BEST), Stat('Exhibitions', comment='. Ключевой для творческих!'),
+           Stat('Scholarly'), Stat('Award'))),
+    Field('entertainment', '🎬', 'Entertainment', 'Entertainment', 'Entertainment & Media',
+          'Actors, Directors, VFX, Game Developers',
+          'для медиа-профессионалов: Actors, Journalists, Musicians, Film Directors, Producers', 'film',
+          ('Comedian', 'Actor', 'VFX Supervisor', 'Game Developer', 'Radio Host'),
+          (Stat('Exhibitions', comment=BEST), Stat('Judgement'), Stat('Media'), Stat('Award'))),
+    Field('sports', '⚽', 'Sports', 'Sports', 'Sports & Coaching',
+          'Athletes, Coaches, Referees, Dancers',
+          'для спортсменов и тренеров: Athletes, Coaches, Sports Managers', 'medal',
+          ('Figure Skating Coach', 'Race Car Driver', 'Powerlifting Coach', 'Referee'),
+          (Stat('Scholarly'), Stat('Judgement'), Stat('Award'), Stat('Media'))),
+    Field('medicine', '⚕️', 'Medicine', 'Medicine', 'Medicine & Healthcare',
+          'Doctors, Surgeons, Pharmacists, Dentists',
+          'для медиков: Doctors, Surgeons, Pharmacists, Dentists, Medical Scientists', 'heart-pulse',
+          ('Neuropsychologist', 'Dentist', 'Surgeon', 'Pharmacist'),
+          (Stat('Judgement', comment=BEST), Stat('Scholarly'), Stat('Critical'), Stat('Original', comment=HARD))),
+    Field('education', '📚', 'Education', 'Education', 'Education',
+          'Teachers, Professors, Curriculum Specialists',
+          'для педагогов: Teachers, Professors, Curriculum Specialists, Education Consultants', 'graduation-cap',
+          ('Art Teacher', 'ESL Instructor', 'Curriculum Specialist', 'Special Education'),
+          (Stat('Exhibitions'), Stat('Judgement'), Stat('Scholarly'), Stat('Original', comment=HARD))),
+    Field('science', '🔬', 'Science', 'Science', 'Science & Research',
+          'Research Scientists, Postdocs, Chemists',
+          'для ученых: Research Scientists, Postdocs, Chemists, Physicists', 'flask',
+          ('Research Scientist', 'AI Analyst', 'Postdoctoral Associate'),
+          (Stat('Judgement', comment=BEST), Stat('Scholarly'), Stat('Critical'), Stat('Original', comment=HARD))),
+    Field('beauty', '💄', 'Beauty', 'Beauty', 'Beauty & Wellness',
+          'Makeup Artists, Hairstylists, Aestheticians',
+          'для beauty-индустрии: Makeup Artists, Hairstylists, Aestheticians, Massage Therapists', 'sparkles',
+          ('Makeup Artist', 'Hairstylist', 'Massage Therapist', 'Beautician'),
+          (Stat('Judgement', comment='! Почти всем засчитывают!'), Stat('Exhibitions'), Stat('Media'),
+           Stat('Original', comment=HARD))),
+)
+
+ALL_STATS = (
+    Stat('Judgement', 'Judgement (Судейство)'),
+    Stat('Exhibitions', 'Exhibitions (Выставки)'),
+    Stat('Scholarly', 'Scholarly (Научные статьи)'),
+    Stat('Critical', 'Critical Role (Ключевая роль)'),
+    Stat('Media', 'Media (СМИ обо мне)'),
+    Stat('Original', 'Original (Вклад)', '. Сложно доказать, но важен для Final Merits'),
+)
+
+FULLSCREEN_BUTTON = (
+    '<button className="fullscreen-btn" id="fullscreenBtn" onClick={() => { '
+    "const c = document.querySelector('.rfe-table-container'); const b = document.getElementById('fullscreenBtn'); "
+    "if (!document.fullscreenElement) { c.appendChild(b); c.requestFullscreen().then(() => { "
+    "b.textContent = '← Назад'; b.classList.add('back-btn'); }); } else { document.exitFullscreen().then(() => { "
+    "c.parentNode.insertBefore(b, c); b.textContent = '⛶ На весь экран'; b.classList.remove('back-btn'); }); } }}>"
+    '⛶ На весь экран</button>'
+)
+
+LEGEND = '''### Легенда таблицы
+
+<div className="rfe-legend">
+  <span className="rfe-legend-group">
+    <span className="rfe-met">✓ засчитан</span>
+    <span className="rfe-unmet">✗ не засчитан</span>
+  </span>
+  <span className="rfe-legend-group">
+    <span className="rfe-type-rfe">RFE</span>
+    <span className="rfe-type-noid">NOID</span>
+    <span className="rfe-type-denial">Denial</span>
+  </span>
+  <span className="rfe-legend-note"><strong>Sub/Met</strong> = заявлено/засчитано • <strong>Officer</strong> = номер офицера</span>
+</div>'''
+
+TABLE_HEAD = '''<div className="rfe-table-container">
+  <table className="rfe-table">
+    <thead>
+      <tr>
+        <th>Type</th>
+        <th>Center</th>
+        <th>Officer</th>
+        <th>Field</th>
+        <th>Sub/Met</th>
+        <th>Criteria</th>
+      </tr>
+    </thead>
+    <tbody>'''
+
+TABLE_TAIL = '''    </tbody>
+  </table>
+</div>'''
+
+SAME_PETITION_NOTE = '''<Note>
+**Почему похожие записи рядом?** Если заявитель получил RFE, а затем отказ (или NOID → Denial), в таблице будут две записи с похожими данными. Это показывает, **засчитал ли офицер новые критерии** после ответа на RFE/NOID.
+</Note>'''
+
+
+def plural(n: int, one: str, few: str, many: str) -> str:
+    """Russian noun form for n: 1 кейс, 2 кейса, 5 кейсов."""
+    if n % 10 == 1 and n % 100 != 11:
+        return one
+    if 2 <= n % 10 <= 4 and not 12 <= n % 100 <= 14:
+        return few
+    return many
+
+
+def cases_word(n: int) -> str:
+    return plural(n, 'кейс', 'кейса', 'кейсов')
+
+
+def cases_word_dative(n: int) -> str:
+    """"по 21 кейсу", "по 85 кейсам"."""
+    return 'кейсу' if n % 10 == 1 and n % 100 != 11 else 'кейсам'
+
+
+def text(value: str) -> str:
+    """Escape a data value for MDX text."""
+    return (value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            .replace('{', '&#123;').replace('}', '&#125;'))
+
+
+def validate(records: List[dict], criteria: List[str]) -> List[str]:
+    """Problems that would render a broken row, one message each."""
+    fields = {f.slug for f in FIELDS}
+    problems = []
+    seen = set()
+    for record in records:
+        rid = record.get('id')
+        if not rid or rid in seen:
+            problems.append(f"{rid!r}: missing or duplicate id")
+        seen.add(rid)
+        if record.get('type') not in TYPE_BADGES:
+            problems.append(f"{rid}: unknown type {record.get('type')!r}")
+        if record.get('center') not in CENTERS:
+            problems.append(f"{rid}: unknown center {record.get('center')!r}")
+        for slug in record.get('fields') or ():
+            if slug not in fields:
+                problems.append(f"{rid}: unknown field {slug!r}")
+        for name in record.get('criteria') or {}:
+            if name not in criteria:
+                problems.append(f"{rid}: unknown criterion {name!r}")
+        if (record.get('submitted') is None) != (record.get('met') is None):
+            problems.append(f"{rid}: submitted and met must both be set or both be null")
+    return problems
+
+
+def render_criteria(record: dict, criteria: List[str]) -> str:
+    given = record.get('criteria') or {}
+    chips = ''.join(
+        f'<span className="rfe-met">{name} ✓</span>' if given[name] else f'<span className="rfe-unmet">{name} ✗</span>'
+        for name in criteria if name in given)
+    return f'<span className="rfe-chips">{chips}</span>' if chips else '-'
+
+
+def render_row(record: dict, criteria: List[str]) -> str:
+    kind, label = TYPE_BADGES[record['type']]
+    submitted, met = record.get('submitted'), record.get('met')
+    score = '-' if submitted is None else f'<strong>{submitted}</strong>/{met}'
+    # One line per record, so a record edit is a one-line diff on each page
+    return (f'      <tr><td><span className="rfe-type-{kind}">{label}</span></td>'
+            f'<td>{record["center"]}</td>'
+            f'<td>{text(record.get("officer") or "N/A")}</td>'
+            f'<td>{text(record.get("profession") or "")}</td>'
+            f'<td>{score}</td>'
+            f'<td>{render_criteria(record, criteria)}</td></tr>')
+
+
+def render_table(records: List[dict], rows: Dict[str, str]) -> str:
+    return '\n'.join([TABLE_HEAD, *(rows[r['id']] for r in records), TABLE_TAIL])
+
+
+def render_stats(heading: str, criteria_stats: CriteriaStats, group: str, stats: Tuple[Stat, ...]) -> str:
+    lines = [f'**{heading}:**']
+    for stat in stats:
+        row = criteria_stats.criterion(stat.criterion, group)
+        submitted, met = round(row.submit_rate or 0), round(row.rate or 0)
+        label = stat.label or CRITERION_NAMES.get(stat.criterion, stat.criterion)
+        lines.append(f'• **{label}**: подают {submitted}%, засчитывают {met}%{stat.comment}')
+    return '<Tip>\n' + '\n\n'.join(lines) + '\n</Tip>'
+
+
+def frontmatter(title: str, sidebar: str, description: str, icon: str) -> str:
+    return (f'---\ntitle: "{title}"\nsidebarTitle: "{sidebar}"\ndescription: "{description}"\n'
+            f'icon: "{icon}"\nmode: "wide"\n---')
+
+
+def hero(badge: str, title: str, subtitle: Optional[str], links: List[str], variant: str = '') -> str:
+    lines = [
+        f'<div className="rfe-hero{" rfe-hero-" + variant if variant else ""}">',
+        '  <div className="rfe-hero-row">',
+        '    <div>',
+        f'      <div className="rfe-hero-badge">{badge}</div>',
+        f'      <div className="rfe-hero-title">{title}</div>',
+    ]
+    if subtitle:
+        lines.append(f'      <div className="rfe-hero-subtitle">{subtitle}</div>')
+    lines += ['    </div>', '    <div className="rfe-hero-links">']
+    lines += [f'      {link}' for link in links]
+    lines += ['    </div>', '  </div>', '</div>']
+    return '\n'.join(lines)
+
+
+def center_link(center: str, records_by_center: Dict[str, List[dict]], with_count: bool = True) -> str:
+    slug, emoji = CENTERS[center]
+    label = f'{emoji} {center} {len(records_by_center[center])}' if with_count else f'{emoji} {center}'
+    return f'<a href="{slug}" className="rfe-link rfe-link-{slug}">{label}</a>'
+
+
+def field_links(by_field: Dict[str, List[dict]], exclude: str = '') -> List[str]:
+    return [f'<a href="{f.slug}" className="rfe-link rfe-pill">{f.emoji} {f.short} {len(by_field[f.slug])}</a>'
+            for f in FIELDS if f.slug != exclude]
+
+
+def render_all_page(records: List[dict], by_center, by_field, criteria_stats: CriteriaStats, table: str) -> str:
+    n = len(records)
+    finder = []
+    for f in FIELDS:
+        finder += ['', '  <div className="rfe-finder-row">',
+                   f'    <span className="rfe-finder-label">{f.emoji} {f.sidebar.upper()}</span>']
+        finder += [f'    <a href="{f.slug}" className="rfe-link rfe-tag rfe-tag-{f.slug}">{example}</a>'
+                   for example in f.examples]
+        finder.append('  </div>')
+    officers = len({normalize_officer(r['officer']) for r in records if r.get('officer')})
+    pills = [f'<a href="#all-table" className="rfe-link rfe-pill rfe-pill-all">Все {n} ↓</a>',
+             *field_links(by_field),
+             f'<a href="officers" className="rfe-link rfe-pill">👮 Офицеры {officers}</a>']
+    adjective = plural(n, 'реальный', 'реальных', 'реальных')
+    parts = [
+        frontmatter('База RFE/NOID/Denial по EB-1A', 'Все кейсы',
+                    f'{n} {adjective} {cases_word(n)} EB-1A: какие критерии заявляли, сколько засчитали, номера офицеров.',
+                    'database'),
+        hero('Уникальные данные за 3 года', 'Какие критерии засчитывают офицеры', None,
+             [center_link(c, by_center) for c in CENTERS], 'all'),
+        '\n'.join([
+            '<div className="rfe-intro">',
+            '  <div className="rfe-intro-title">💡 Зачем это?</div>',
+            '  <div className="rfe-intro-text">Когда готовишь петицию, важно понять: что реально засчитывают? '
+            'Мы 3 года собирали данные из RFE, NOID и отказов. Теперь можно увидеть, что подавали другие и что им засчитали.</div>',
+            '',
+            '  <div className="rfe-intro-title">📖 Как пользоваться?</div>',
+            '  <div className="rfe-intro-text">Нажмите на категорию: откроется таблица с кейсами из вашей сферы:</div>',
+            '  <div className="rfe-pills">',
+            *(f'    {pill}' for pill in pills),
+            '  </div>',
+            '</div>',
+        ]),
+        '### Какие критерии засчитывают чаще всего?',
+        render_stats(f'По всем {n} {cases_word_dative(n)}', criteria_stats, ALL, ALL_STATS),
+        '\n'.join(['<div className="rfe-finder">',
+                   '  <div className="rfe-finder-title">🔍 Найди свою сферу деятельности:</div>',
+                   *finder, '</div>']),
+        LEGEND,
+        '<div id="all-table"></div>\n' + FULLSCREEN_BUTTON,
+        table,
+        f'<Info>\nПоказано {n} {cases_word(n)}. База обновляется регулярно.\n</Info>',
+    ]
+    return '\n\n'.join(parts) + '\n'
+
+
+def render_center_page(center: str, by_center, table: str) -> str:
+    slug, emoji = CENTERS[center]
+    n = len(by_center[center])
+    links = [f'<a href="all" className="rfe-link rfe-link-back">← Все {sum(map(len, by_center.values()))}</a>']
+    links += [center_link(other, by_center) for other in CENTERS if other != center]
+    parts = [
+        frontmatter(f'RFE/NOID/Denial EB-1A: {center} Service Center', center,
+                    f'База RFE, NOID и Denial кейсов EB-1A из {center} Service Center. Анализ офицеров и критериев.',
+                    'building-columns'),
+        hero(f'{emoji} {center} Service Center', f'{n} {cases_word(n)} EB-1A',
+             f'RFE, NOID и Denial из {center}', links, slug),
+        SAME_PETITION_NOTE,
+        LEGEND,
+        FULLSCREEN_BUTTON,
+        table,
+        f'<Info>\nПоказано {n} {cases_word(n)} из {center} Service Center.\n</Info>',
+    ]
+    return '\n\n'.join(parts) + '\n'
+
+
+def render_field_page(field: Field, total: int, by_center, by_field, criteria_stats: CriteriaStats,
+                      table: str) -> str:
+    records = by_field[field.slug]
+    n = len(records)
+    links = [f'<a href="all" className="rfe-link rfe-link-back">← Все {total}</a>']
+    links += [center_link(c, by_center, with_count=False) for c in CENTERS]
+    parts = [
+        frontmatter(f'RFE/NOID/Denial EB-1A: {field.name}', field.sidebar,
+                    f'База RFE, NOID и Denial кейсов EB-1A {field.description}.', field.icon),
+        hero(f'{field.emoji} {field.name}', f'{n} {cases_word(n)} EB-1A', field.subtitle, links),
+        '### Другие профессии',
+        '\n'.join(['<div className="rfe-pills">', *(f'  {link}' for link in field_links(by_field, field.slug)),
+                   '</div>']),
+        render_stats(f'Статистика по {n} {field.short} {cases_word_dative(n)}', criteria_stats,
+                     field.slug, field.stats),
+        LEGEND,
+        FULLSCREEN_BUTTON,
+        table,
+        f'<Info>\nПоказано {n} {cases_word(n)} в категории {field.sidebar}.\n</Info>',
+    ]
+    return '\n\n'.join(parts) + '\n'
+
+
+def render_pages(records: List[dict], criteria: List[str]) -> Dict[str, str]:
+    """{file name: MDX} for every rfe-data page."""
+    with stage('rows'):
+        rows = {r['id']: render_row(r, criteria) for r in records}
+    by_center = {c: [r for r in records if r['center'] == c] for c in CENTERS}
+    by_field = {f.slug: [r for r in records if f.slug in (r.get('fields') or ())] for f in FIELDS}
+    with stage('stats'):
+        criteria_stats = CriteriaStats(records, criteria, {f.slug: (f.slug,) for f in FIELDS})
+
+    pages = {'all.mdx': render_all_page(records, by_center, by_field, criteria_stats, render_table(records, rows))}
+    for center, (slug, _) in CENTERS.items():
+        pages[f'{slug}.mdx'] = render_center_page(center, by_center, render_table(by_center[center], rows))
+    for field in FIELDS:
+        pages[f'{field.slug}.mdx'] = render_field_page(field, len(records), by_center, by_field, criteria_stats,
+                                                       render_table(by_field[field.slug], rows))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the rfe-data pages from the RFE dataset.")
+    parser.add_argument('data', nargs='?', type=Path, default=DEFAULT_DATA)
+    parser.add_argument('--check', action='store_true',
+                        help="Write nothing; exit 1 if a page differs from the generated one")
+    add_arguments(parser)
+    args = parser.parse_args()
+    with instrumented('generate_rfe_pages', args, globals(), HOT_FUNCTIONS):
+        return run(args)
+
+
+def run(args) -> int:
+    with stage('load'):
+        meta, cases = open_cases(args.data)
+        records = list(cases)
+    count('records', len(records))
+    criteria = meta['criteria']
+
+    problems = validate(records, criteria)
+    if problems:
+        print(f"{args.data}: {len(problems)} invalid records", file=sys.stderr)
+        for message in problems:
+            print(f"  - {message}", file=sys.stderr)
+        return 1
+
+    with stage('render'):
+        pages = render_pages(records, criteria)
+
+    with stage('write'):
+        stale = []
+        for name, content in pages.items():
+            path = PAGES_DIR / name
+            if args.check:
+                if not path.exists() or path.read_text(encoding='utf-8') != content:
+                    stale.append(name)
+            elif write_if_changed(path, content):
+                stale.append(name)
+    count('pages', len(pages))
+
+    if args.check:
+        if stale:
+            print(f"Out of date: {', '.join(stale)}. Run scripts/generate_rfe_pages.py")
+            return 1
+        print(f"All {len(pages)} rfe-data pages are up to date")
+        return 0
+    print(f"Wrote {len(stale)} of {len(pages)} rfe-data pages from {len(records)} records")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,789 @@
+#!/usr/bin/env python3
+"""
+Generate the criteria statistics pages from data/rfe_cases.json.
+
+  rfe-statistics.mdx                      summary, per-direction case tables,
+                                          Nebraska vs Texas, per-criterion advice
+  success-stories/rfe-stats-heatmap.mdx   color-coded rates, rates by document
+                                          type, criteria × direction heatmap
+  success-stories/rfe-stats-visual.mdx    progress bars per criterion, center
+                                          and direction
+  success-stories/rfe-stats-interactive.mdx
+                                          rates and advice for a chosen profile
+  success-stories/rfe-cube.json           counts behind the interactive parts
+
+Every number, ranking and comparison on these pages comes from one
+rfe_stats.CriteriaStats table (center × direction × outcome × criterion).
+The profile picker and the direction heatmap are not pre-rendered: they
+are <div id="rfe-cube"> mounts filled by scripts/rfe-cube.js from
+rfe-cube.json, the rfe_stats.build_cube() counts for every direction and
+field × center × visa × outcome (× criterion). A filter change sums a
+handful of cells in the browser instead of switching between <Tabs>
+holding every combination.
+Rates are "counted / claimed": records that did not claim a criterion are
+left out. Rankings and "X лучше" conclusions only use criteria claimed at
+least MIN_CLAIMS times in the slice, so a single lucky record does not
+top a list. Directions are the broad groups of the old stats pages, each
+a set of rfe-data field slugs (DIRECTIONS); a record with several fields
+is in each of its directions. Hand-written advice (what officers count
+and what they don't) is configured in CRITERIA.
+
+A page file is rewritten only when its bytes change. --check writes
+nothing and exits 1 when a page is out of date (e.g. edited by hand).
+
+Usage:
+  python3 scripts/generate_rfe_stats.py [data/rfe_cases.json] [--check]
+      [--timings-report [PATH]] [--profile [PATH]]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from build_cache import write_if_changed
+from case_store import open_cases
+from generate_rfe_pages import FIELDS, cases_word, plural, text, validate
+from instrumentation import add_arguments, count, instrumented, stage
+from rfe_stats import ALL, CENTERS, OUTCOMES, CriteriaStats, CriterionStats, build_cube
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_DATA = PROJECT_ROOT / 'data' / 'rfe_cases.json'
+
+HOT_FUNCTIONS = ('render_record_row', 'ranked')
+
+MIN_CLAIMS = 5      # claims needed before a criterion is ranked or compared
+NOTABLE_GAP = 5     # percentage points between centers worth calling out
+BIG_GAP = 15        # ... worth an exclamation mark
+BAR_WIDTH = 50
+
+MARKS = {True: '✅', False: '❌', None: '➖'}
+OUTCOME_NAMES = {'RFE': 'RFE', 'NOID': 'NOID', 'Denial': 'Отказ'}
+CUBE_PATH = 'success-stories/rfe-cube.json'
+CUBE_VERSION = 1
+
+SPREADSHEET = 'https://docs.google.com/spreadsheets/d/1cKDWJevy364WyT0HU3IA7rs5Heqag9Sv8all6s8nlv8'
+
+
+class Criterion(NamedTuple):
+    key: str                    # key in a record's criteria
+    name: str                   # tables and lists
+    title: str                  # accordion and card titles
+    column: str                 # case table header
+    icon: str
+    works: Tuple[str, ...] = ()     # what officers count
+    fails: Tuple[str, ...] = ()     # what they don't
+
+
+CRITERIA = (
+    Criterion('Award', 'Award', 'Award', 'Award', 'trophy',
+              ('Международные спортивные награды', 'Государственные награды высшего уровня'),
+              ('Корпоративные награды', 'Региональные конкурсы')),
+    Criterion('Association', 'Association', 'Association', 'Assoc', 'users',
+              ('Членство только по приглашению (invite-only)',),
+              ('Платное членство',)),
+    Criterion('Media', 'Media', 'Media', 'Media', 'newspaper',
+              ('Публикации о вас лично', 'Экспертные интервью в крупных изданиях'),
+              ('Упоминания вскользь',)),
+    Criterion('Judgement', 'Judgement', 'Judgement', 'Judge', 'gavel',
+              ('Рецензирование для научных журналов', 'Участие в жюри конкурсов',
+               'Экспертная оценка грантов/проектов', 'Менторство в акселераторах'),
+              ('Внутренние review в компании', 'Оценка резюме кандидатов')),
+    Criterion('Original', 'Original contributions', 'Original Contributions', 'Contrib', 'lightbulb',
+              ('Патенты с ДОКАЗАННЫМ использованием', 'Решения с метриками влияния на индустрию'),
+              ('Просто патенты', '"Работал над проектом"', 'Код без evidence of adoption')),
+    Criterion('Scholarly', 'Scholarly articles', 'Scholarly Articles', 'Articles', 'book',
+              ('Публикации в научных журналах', 'Каталоги выставок (для Arts)', 'Патенты с цитированиями',
+               'Методические материалы'),
+              ('Статьи без цитирований', 'Посты в блоге')),
+    Criterion('Exhibitions', 'Exhibitions', 'Exhibitions', 'Exhib', 'image',
+              ('Персональные выставки', 'Галереи с репутацией', 'Участие в биеннале')),
+    Criterion('Critical', 'Critical role', 'Critical Role', 'Role', 'user-tie',
+              ('Позиция с влиянием на ключевые решения', 'Руководство критическими проектами',
+               'Уникальная экспертиза в компании'),
+              ('Просто senior позиция', '"Один из многих" в отделе')),
+    Criterion('Salary', 'Salary', 'Salary', 'Salary', 'money-bill',
+              ('Сравнительные данные по рынку', 'Официальные источники (BLS, O*NET)')),
+    Criterion('Commercial', 'Commercial success', 'Commercial Success', 'Comm', 'dollar-sign'),
+)
+CRITERIA_BY_KEY = {c.key: c for c in CRITERIA}
+
+
+class Direction(NamedTuple):
+    slug: str
+    name: str                   # conclusions and cards
+    title: str                  # tab and card titles
+    icon: str
+    fields: Tuple[str, ...]     # rfe-data field slugs
+
+
+DIRECTIONS = (
+    Direction('sciences', 'Sciences', 'Sciences (IT, инженеры)', 'laptop-code',
+              ('it-software', 'engineering', 'science', 'medicine')),
+    Direction('business', 'Business', 'Business', 'briefcase', ('business',)),
+    Direction('arts', 'Arts', 'Arts (дизайн, фото)', 'palette', ('arts-design', 'entertainment', 'beauty')),
+    Direction('athletics', 'Athletics', 'Athletics (спорт)', 'person-running', ('sports',)),
+    Direction('education', 'Education', 'Education', 'graduation-cap', ('education',)),
+)
+
+RATE_WARNING = '''<Warning>
+**Важно:** % считается только среди тех, кто подавал критерий!
+
+`% успеха = засчитали / (засчитали + не засчитали)`
+
+Тех кто не подавал критерий — не учитываем.
+</Warning>'''
+
+SPREADSHEET_EMBED = f'''<iframe
+  src="{SPREADSHEET}/preview?gid=0"
+  width="100%"
+  height="500"
+  frameborder="0"
+  style={{{{border: "1px solid #ddd", borderRadius: "8px"}}}}
+></iframe>
+
+<Note>
+Прокрутите таблицу вправо чтобы увидеть все критерии. Или [откройте на полный экран](success-stories/rfe-data-full)
+</Note>'''
+
+
+def criteria_genitive(n: int) -> str:
+    """"из 1 критерия", "до 9 критериев"."""
+    return 'критерия' if n % 10 == 1 and n % 100 != 11 else 'критериев'
+
+
+def criteria_dative(n: int) -> str:
+    """"по 1 критерию", "по 6 критериям"."""
+    return 'критерию' if n % 10 == 1 and n % 100 != 11 else 'критериям'
+
+
+def percent(row: CriterionStats) -> str:
+    return '—' if row.rate is None else f'{round(row.rate)}%'
+
+
+def color(row: CriterionStats) -> str:
+    """🟢 more than 40% | 🟡 20-40% | 🟠 10-20% | 🔴 less than 10%."""
+    if row.rate is None:
+        return '⚪'
+    rate = round(row.rate)
+    return '🟢' if rate > 40 else '🟡' if rate >= 20 else '🟠' if rate >= 10 else '🔴'
+
+
+def bar(row: CriterionStats) -> str:
+    filled = round((row.rate or 0) * BAR_WIDTH / 100)
+    return '█' * filled + '░' * (BAR_WIDTH - filled)
+
+
+def ranked(rows: List[CriterionStats]) -> List[CriterionStats]:
+    """Criteria claimed at least MIN_CLAIMS times, best rate first (more claims break ties)."""
+    return sorted((r for r in rows if r.submitted >= MIN_CLAIMS), key=lambda r: (-r.rate, -r.submitted))
+
+
+def by_rate(rows: List[CriterionStats]) -> List[CriterionStats]:
+    """Every criterion, best rate first; criteria nobody claimed last."""
+    return sorted(rows, key=lambda r: (r.rate is None, -(r.rate or 0), -r.submitted))
+
+
+def name(row: CriterionStats) -> str:
+    return CRITERIA_BY_KEY[row.criterion].name
+
+
+def gap(stats: CriteriaStats, criterion: str, group: str = ALL) -> Optional[Tuple[str, int]]:
+    """(leading center, lead in percentage points), or None when a center has fewer than MIN_CLAIMS claims."""
+    nebraska, texas = (stats.criterion(criterion, group, center) for center in CENTERS)
+    if nebraska.submitted < MIN_CLAIMS or texas.submitted < MIN_CLAIMS:
+        return None
+    diff = round(nebraska.rate) - round(texas.rate)
+    return ('Nebraska', diff) if diff >= 0 else ('Texas', -diff)
+
+
+def leader_text(lead: Optional[Tuple[str, int]]) -> str:
+    if lead is None:
+        return 'мало данных'
+    center, diff = lead
+    if diff < NOTABLE_GAP:
+        return 'одинаково' if diff <= 1 else f'{center} +{diff}%'
+    return f'**{center} +{diff}%!**' if diff >= BIG_GAP else f'**{center} +{diff}%**'
+
+
+def center_winners(stats: CriteriaStats, group: str = ALL) -> Dict[str, List[Tuple[str, int]]]:
+    """{center: [(criterion, lead)]} for leads of at least NOTABLE_GAP, biggest first."""
+    winners = {center: [] for center in CENTERS}
+    for criterion in CRITERIA:
+        lead = gap(stats, criterion.key, group)
+        if lead and lead[1] >= NOTABLE_GAP:
+            winners[lead[0]].append((criterion.name, lead[1]))
+    for leads in winners.values():
+        leads.sort(key=lambda item: -item[1])
+    return winners
+
+
+def center_comparison(stats: CriteriaStats, group: str = ALL) -> str:
+    """"Nebraska лучше: ..." / "Texas лучше: ..." lines."""
+    lines = []
+    for center, leads in center_winners(stats, group).items():
+        listed = ', '.join(f'{criterion} (+{diff}%)' for criterion, diff in leads) or 'ни по одному критерию'
+        lines.append(f'- **{center} лучше:** {listed}')
+    return '\n'.join(lines)
+
+
+def center_rates(stats: CriteriaStats, criterion: str) -> str:
+    """"**Nebraska (55%) vs Texas (65%)** — Texas лучше."."""
+    nebraska, texas = (stats.criterion(criterion, ALL, center) for center in CENTERS)
+    lead = gap(stats, criterion)
+    if lead is None:
+        verdict = 'данных пока мало.'
+    elif lead[1] < NOTABLE_GAP:
+        verdict = 'разницы почти нет.'
+    else:
+        verdict = f'{lead[0]} лучше{"!" if lead[1] >= BIG_GAP else "."}'
+    return f'**Nebraska ({percent(nebraska)}) vs Texas ({percent(texas)})** — {verdict}'
+
+
+def best_direction(stats: CriteriaStats, criterion: str) -> Optional[Tuple[Direction, CriterionStats]]:
+    rows = [(d, stats.criterion(criterion, d.slug)) for d in DIRECTIONS]
+    rows = [(d, row) for d, row in rows if row.submitted >= MIN_CLAIMS]
+    return max(rows, key=lambda item: (item[1].rate, item[1].submitted), default=None)
+
+
+def signature(stats: CriteriaStats, direction: Direction) -> Optional[CriterionStats]:
+    """The criterion a direction does best relative to all records (biggest rate lift)."""
+    overall = {row.criterion: row for row in stats.table()}
+    rows = ranked(stats.table(direction.slug))
+    return max(rows, key=lambda row: (row.rate - (overall[row.criterion].rate or 0), row.rate), default=None)
+
+
+def signature_lines(stats: CriteriaStats) -> List[str]:
+    """"- Arts → Exhibitions (65%)" for every direction with a signature criterion."""
+    lines = []
+    for direction in DIRECTIONS:
+        row = signature(stats, direction)
+        if row:
+            lines.append(f'- {direction.name} → {name(row)} ({percent(row)})')
+    return lines
+
+
+def frontmatter(title: str, sidebar: str, icon: str, description: str) -> str:
+    return f'---\ntitle: "{title}"\nsidebarTitle: "{sidebar}"\nicon: "{icon}"\ndescription: "{description}"\n---'
+
+
+def headcount(stats: CriteriaStats, group: str) -> str:
+    n = stats.count(group)
+    centers = ' | '.join(f'{center}: {stats.count(group, center)}' for center in CENTERS)
+    return f'{n} {cases_word(n)} | {centers}'
+
+
+def outcome_counts(stats: CriteriaStats) -> str:
+    """"158 RFE, 23 NOID и 61 отказ"."""
+    rfe, noid, denial = (stats.count(outcome=o) for o in OUTCOMES)
+    return f'{rfe} RFE, {noid} NOID и {denial} {plural(denial, "отказ", "отказа", "отказов")}'
+
+
+def source_info(n: int) -> str:
+    return (f'<Info>\n**Источник:** Анализ {n} RFE/NOID/Deny из Telegram-сообщества "Талант в каждом".\n\n'
+            f'[Полная таблица данных]({SPREADSHEET})\n</Info>')
+
+
+def directions_note(records: List[dict]) -> str:
+    """How records map to directions; records outside every direction are only in the overall numbers."""
+    grouped = {slug for direction in DIRECTIONS for slug in direction.fields}
+    missing = sum(1 for r in records if not grouped.intersection(r.get('fields') or ()))
+    note = 'Кейс с несколькими сферами входит в каждое своё направление.'
+    if missing:
+        note += f' Ещё {missing} {cases_word(missing)} без указанной сферы учтены только в общей статистике.'
+    return note
+
+
+def direction_conclusion(stats: CriteriaStats, direction: Direction) -> str:
+    rows = ranked(stats.table(direction.slug))
+    if not rows:
+        return f'**Вывод для {direction.name}:** данных пока мало.'
+    parts = [f'лучше всего засчитывают ' +
+             ' и '.join(f'{name(row)} ({percent(row)})' for row in rows[:2])]
+    weak = [row for row in rows[2:] if round(row.rate) < 10][-2:]
+    if weak:
+        parts.append('почти не засчитывают ' + ' и '.join(f'{name(row)} ({percent(row)})' for row in weak))
+    sentences = [f'**Вывод для {direction.name}:** ' + ', '.join(parts) + '.']
+    winners = center_winners(stats, direction.slug)
+    compared = sum(1 for c in CRITERIA if gap(stats, c.key, direction.slug) is not None)
+    if compared:
+        (first, a), (second, b) = sorted(((c, len(leads)) for c, leads in winners.items()), key=lambda w: -w[1])
+        if a:
+            sentences.append(f'{first} заметно лучше (на {NOTABLE_GAP}+ п.п.) по {a} {criteria_dative(a)} '
+                             f'из {compared}, {second} — по {b}.')
+        else:
+            sentences.append('Заметной разницы между центрами нет.')
+    return ' '.join(sentences)
+
+
+def render_record_row(record: dict) -> str:
+    given = record.get('criteria') or {}
+    marks = ' | '.join(MARKS[given.get(c.key)] for c in CRITERIA)
+    profession = text(record['profession']).replace('|', '\\|')
+    return f'| {profession} | {record["center"]} | {OUTCOME_NAMES[record["type"]]} | {marks} |'
+
+
+def render_record_table(records: List[dict]) -> List[str]:
+    head = ['| Специальность | Центр | Тип | ' + ' | '.join(c.column for c in CRITERIA) + ' |',
+            '|' + '---|' * (len(CRITERIA) + 3)]
+    return head + [render_record_row(r) for r in records]
+
+
+def render_direction_tabs(stats: CriteriaStats, members: Dict[str, List[dict]]) -> str:
+    lines = ['<Tabs>']
+    for direction in DIRECTIONS:
+        records = members[direction.slug]
+        lines += [f'  <Tab title="{direction.title}">', f'    ### {headcount(stats, direction.slug)}', '']
+        lines += [f'    {row}' for row in render_record_table(records)]
+        lines += ['', '    <Tip>', f'    {direction_conclusion(stats, direction)}', '    </Tip>', '  </Tab>', '']
+    lines[-1] = '</Tabs>'
+    return '\n'.join(lines)
+
+
+def render_center_table(stats: CriteriaStats, colored: bool) -> str:
+    if colored:
+        lines = ['| Критерий | Nebraska | Texas | Лидер |', '|----------|----------|-------|-------|']
+    else:
+        lines = ['| Критерий | Nebraska | Texas | Где лучше |', '|----------|----------|-------|-----------|']
+    for row in by_rate(stats.table()):
+        nebraska, texas = (stats.criterion(row.criterion, ALL, center) for center in CENTERS)
+        if colored:
+            cells = [f'{color(r)} {percent(r)}' for r in (nebraska, texas)]
+        else:
+            cells = [percent(nebraska), percent(texas)]
+        lines.append(f'| **{name(row)}** | {cells[0]} | {cells[1]} | {leader_text(gap(stats, row.criterion))} |')
+    return '\n'.join(lines)
+
+
+def render_statistics_page(stats: CriteriaStats, members: Dict[str, List[dict]], note: str) -> str:
+    n = stats.count()
+    rows = by_rate(stats.table())
+    leaders, others = rows[:4], rows[4:]
+    claims = stats.claims
+    top = ranked(stats.table())
+
+    def summary_card(title: str, icon: str, card_rows: List[CriterionStats]) -> List[str]:
+        lines = [f'  <Card title="{title}" icon="{icon}">', '    | Критерий | % засчитано |', '    |----------|-------------|']
+        lines += [f'    | {name(row)} | **{percent(row)}** |' for row in card_rows]
+        return lines + ['  </Card>']
+
+    accordions = []
+    for i, row in enumerate(top):
+        criterion = CRITERIA_BY_KEY[row.criterion]
+        rate = round(row.rate)
+        if rate >= 50:
+            verdict = 'Засчитывают чаще всего. Подавайте обязательно.'
+        elif rate >= 30:
+            verdict = 'Работает — подавайте при хорошей доказательной базе.'
+        elif rate >= 10:
+            verdict = 'Засчитывают редко — только с сильными доказательствами.'
+        else:
+            verdict = '⚠️ Почти никогда не засчитывают!'
+        body = [f'**{verdict}**', '',
+                f'Подают в {round(row.submit_rate)}% кейсов, засчитали {row.met} из {row.submitted}.']
+        if criterion.works:
+            body += ['', 'Что засчитывают:', *(f'- {item}' for item in criterion.works)]
+        if criterion.fails:
+            body += ['', 'Что НЕ засчитывают:', *(f'- {item}' for item in criterion.fails)]
+        body += ['', center_rates(stats, row.criterion)]
+        best = best_direction(stats, row.criterion)
+        if best:
+            body += ['', f'Лучше всего работает для **{best[0].name}** ({percent(best[1])}).']
+        open_attr = ' defaultOpen' if i == 0 else ''
+        accordions += [f'  <Accordion title="{criterion.title} — {rate}% успеха" icon="{criterion.icon}"{open_attr}>',
+                       *(f'    {line}' if line else '' for line in body), '  </Accordion>', '']
+    accordions[-1:] = []
+
+    parts = [
+        frontmatter('Статистика критериев EB-1A', 'Статистика критериев', 'chart-bar',
+                    f'Какие критерии подают и что засчитывают в Nebraska и Texas - анализ {n} реальных '
+                    f'RFE, NOID и отказов'),
+        f'<Note>\nАнализ **{n} {cases_word(n)}** из сообщества: {outcome_counts(stats)}. '
+        f'Смотрите что засчитывают, а что нет.\n</Note>',
+        '---',
+        '## Быстрая сводка',
+        '\n'.join(['<CardGroup cols={2}>', *summary_card('Лидеры по одобрению', 'check', leaders),
+                   *summary_card('Аутсайдеры', 'xmark', others), '</CardGroup>']),
+        RATE_WARNING,
+        '---',
+        '## Все кейсы по направлениям',
+        f'**Обозначения:** ✅ засчитано | ❌ не засчитано | ➖ не подавали\n\n{note}',
+        render_direction_tabs(stats, members),
+        '---',
+        '## Nebraska vs Texas: сравнение',
+        render_center_table(stats, colored=False),
+        f'<Info>\n**По критериям, где разница {NOTABLE_GAP}+ п.п.:**\n{center_comparison(stats)}\n</Info>',
+        '---',
+        '## Рекомендации по критериям',
+        '\n'.join(['<AccordionGroup>', *accordions, '</AccordionGroup>']),
+        '---',
+        '## Сколько критериев подавать',
+        '\n'.join([
+            '<Steps>',
+            f'  <Step title="Средне подают: {claims.mean_submitted:.1f} критерия">',
+            f'    Диапазон: от {claims.min_submitted} до {claims.max_submitted} '
+            f'{criteria_genitive(claims.max_submitted)}.',
+            '  </Step>',
+            '',
+            f'  <Step title="Средне засчитывают: {claims.mean_met:.1f} критерия">',
+            '    При 0 засчитанных - почти всегда отказ.',
+            '',
+            '    Для апрува нужно 2-3 засчитанных.',
+            '  </Step>',
+            '',
+            '  <Step title="Рекомендация: 7-8 критериев">',
+            f'    Упор на {" + ".join(name(row) for row in top[:2])} + ваше сильное направление.',
+            '  </Step>',
+            '</Steps>',
+        ]) if claims.records else '',
+        '---',
+        '## Полная таблица данных',
+        f'<Card title="📊 Открыть базу RFE" icon="table" href="rfe-data/all">\n'
+        f'  {n} {cases_word(n)}: какие критерии заявляли, что засчитали, номера офицеров.\n</Card>',
+        SPREADSHEET_EMBED,
+        source_info(n),
+    ]
+    return '\n\n'.join(part for part in parts if part) + '\n'
+
+
+def render_heatmap_page(stats: CriteriaStats, note: str) -> str:
+    n = stats.count()
+    overall = ['| Критерий | % успеха | Засчит | Не засч | Не подавали |',
+               '|----------|----------|--------|---------|-------------|']
+    overall += [f'| **{name(row)}** | {color(row)} **{percent(row)}** | {row.met} | {row.not_met} | {row.not_submitted} |'
+                for row in by_rate(stats.table())]
+
+    by_outcome = ['| Критерий | ' + ' | '.join(f'{OUTCOME_NAMES[o]} ({stats.count(outcome=o)})' for o in OUTCOMES) + ' |',
+                  '|----------|' + '------|' * len(OUTCOMES)]
+    for row in by_rate(stats.table()):
+        cells = [stats.criterion(row.criterion, outcome=o) for o in OUTCOMES]
+        by_outcome.append(f'| **{name(row)}** | ' + ' | '.join(f'{color(c)} {percent(c)}' for c in cells) + ' |')
+
+    patterns = []
+    for outcome in OUTCOMES:
+        cases = stats.count(outcome=outcome)
+        if not cases:
+            continue
+        rows = stats.table(outcome=outcome)
+        submitted = sum(row.submitted for row in rows) / cases
+        met = sum(row.met for row in rows) / cases
+        most = max(rows, key=lambda row: row.met)
+        patterns += [f'  <Card title="{OUTCOME_NAMES[outcome]}: {cases} {cases_word(cases)}" icon="file-lines">',
+                     f'    - Подано в среднем {submitted:.1f} критерия',
+                     f'    - Засчитано в среднем {met:.1f} критерия',
+                     f'    - Чаще всего засчитан {name(most)} (в {round(100 * most.met / cases)}% документов)',
+                     '  </Card>', '']
+    patterns[-1:] = []
+
+    parts = [
+        frontmatter('Статистика RFE: матрица критериев', 'Статистика (матрица)', 'table-cells',
+                    'Тепловая карта: что засчитывают по направлениям и центрам'),
+        '<Note>\n**Формат матрицы:** компактный обзор всех данных в таблицах с цветовыми индикаторами.\n</Note>',
+        '---',
+        '## Общая статистика',
+        'Цвета: 🟢 более 40% | 🟡 20-40% | 🟠 10-20% | 🔴 менее 10%',
+        '\n'.join(overall),
+        '<Warning>\n**% успеха = засчитали / (засчитали + не засчитали)**\n\n'
+        '"Не подавали" не учитываются при расчёте процента!\n</Warning>',
+        '---',
+        '## По типу документа',
+        '\n'.join(by_outcome),
+        '---',
+        '## Матрица Nebraska vs Texas',
+        render_center_table(stats, colored=True),
+        f'<Info>\n**По критериям, где разница {NOTABLE_GAP}+ п.п.:**\n{center_comparison(stats)}\n</Info>',
+        '---',
+        '## Тепловая карта по направлениям',
+        f'Выберите центр и тип документа. Клетки с менее чем {MIN_CLAIMS} заявками — «—», '
+        f'наведите на клетку, чтобы увидеть засчитано / заявлено.\n\n{note}',
+        '<div id="rfe-cube" data-view="heatmap"></div>',
+        '---',
+        '## Ключевые паттерны',
+        '\n'.join(['<CardGroup cols={3}>', *patterns, '</CardGroup>']),
+        '---',
+        source_info(n),
+    ]
+    return '\n\n'.join(parts) + '\n'
+
+
+def render_visual_page(stats: CriteriaStats) -> str:
+    n = stats.count()
+    claims = stats.claims
+    top = ranked(stats.table())
+    strong, weak = top[:4], top[4:]
+
+    def bar_block(row: CriterionStats, indent: str) -> List[str]:
+        return [f'{indent}```', f'{indent}{bar(row)} {percent(row)}', f'{indent}```']
+
+    accordions = []
+    for i, row in enumerate(strong):
+        criterion = CRITERIA_BY_KEY[row.criterion]
+        body = bar_block(row, '')
+        if criterion.works:
+            body += ['', '**Что работает:**', *(f'- {item}' for item in criterion.works)]
+        if criterion.fails:
+            body += ['', '**Что НЕ работает:**', *(f'- {item}' for item in criterion.fails)]
+        body += ['', center_rates(stats, row.criterion)]
+        open_attr = ' defaultOpen' if i == 0 else ''
+        accordions += [f'  <Accordion title="{criterion.title} — {percent(row)}" icon="{criterion.icon}"{open_attr}>',
+                       *(f'    {line}' if line else '' for line in body), '  </Accordion>', '']
+    accordions[-1:] = []
+
+    cards = []
+    for row in weak:
+        criterion = CRITERIA_BY_KEY[row.criterion]
+        cards += [f'  <Card title="{criterion.title} — {percent(row)}" icon="{criterion.icon}">',
+                  *bar_block(row, '    '),
+                  f'    Подают в {round(row.submit_rate)}% кейсов. {center_rates(stats, row.criterion)}',
+                  '  </Card>', '']
+    cards[-1:] = []
+
+    center_tabs = []
+    for center in CENTERS:
+        rows = ranked(stats.table(center=center))
+        m = stats.count(center=center)
+        center_tabs += [f'  <Tab title="{center}">', f'    ### {m} {cases_word(m)} проанализировано', '',
+                        '    | Критерий | Успех |', '    |----------|-------|',
+                        *(f'    | {name(row)} | `{bar(row)}` {percent(row)} |' for row in rows), '']
+        leads = center_winners(stats)[center]
+        if leads:
+            listed = ', '.join(f'**{criterion}**' for criterion, _ in leads[:3])
+            center_tabs.append(f'    <Tip>{center} лучше для {listed}!</Tip>')
+        else:
+            center_tabs.append(f'    <Tip>{center} не лидирует ни по одному критерию.</Tip>')
+        center_tabs += ['  </Tab>', '']
+    diff_rows = []
+    for center, leads in center_winners(stats).items():
+        diff_rows += [(criterion, center, diff) for criterion, diff in leads]
+    diff_rows.sort(key=lambda item: -item[2])
+    center_tabs += ['  <Tab title="Разница">', '    ### Где какой центр лучше', '',
+                    '    | Критерий | Лидер | Разница |', '    |----------|-------|---------|',
+                    *(f'    | {criterion} | **{center}** | **+{diff}%{"!" if diff >= BIG_GAP else ""}** |'
+                      for criterion, center, diff in diff_rows), '',
+                    '    <Info>', f'    **По критериям, где разница {NOTABLE_GAP}+ п.п.:**',
+                    *(f'    {line}' for line in center_comparison(stats).splitlines()),
+                    '    </Info>', '  </Tab>']
+
+    direction_cards = []
+    for direction in DIRECTIONS:
+        rows = ranked(stats.table(direction.slug))
+        m = stats.count(direction.slug)
+        lines = [f'  <Card title="{direction.title}" icon="{direction.icon}">', f'    **{m} {cases_word(m)}**', '']
+        if rows:
+            lines += ['    Лидеры:', *(f'    - {name(row)}: {percent(row)}' for row in rows[:3])]
+            worst = rows[-1]
+            if len(rows) > 3 and round(worst.rate) < 10:
+                lines += ['', f'    {name(worst)}: {percent(worst)} — не тратьте время!']
+        else:
+            lines.append('    Данных пока мало.')
+        direction_cards += lines + ['  </Card>', '']
+    direction_cards[-1:] = []
+
+    signatures = [f'    {line}' for line in signature_lines(stats)]
+
+    steps = ['<Steps>', '  <Step title="Выберите 7-8 критериев">',
+             '    Больше = больше шансов на 3 засчитанных.', '  </Step>']
+    if top:
+        steps += ['', f'  <Step title="{CRITERIA_BY_KEY[top[0].criterion].title} обязателен">',
+                  f'    {percent(top[0])} успеха — лучший показатель.', '  </Step>']
+    if len(top) > 1:
+        steps += ['', f'  <Step title="{CRITERIA_BY_KEY[top[1].criterion].title} — второй приоритет">',
+                  f'    {percent(top[1])} успеха.', '  </Step>']
+    if signatures:
+        steps += ['', '  <Step title="Учитывайте направление">',
+                  '    Критерий, который в направлении работает заметно лучше, чем в среднем:', '',
+                  *signatures, '  </Step>']
+    steps.append('</Steps>')
+
+    parts = [
+        frontmatter('Статистика RFE: визуальный формат', 'Статистика (визуальный)', 'chart-pie',
+                    'Прогресс-бары и карточки для быстрого восприятия'),
+        '<Note>\n**Альтернативный формат:** упор на визуализацию через прогресс-бары и карточки.\n</Note>',
+        '---',
+        '## Общая картина',
+        '\n'.join([
+            '<CardGroup cols={3}>',
+            f'  <Card title="{n}" icon="folder-open">', f'    {cases_word(n)} проанализировано', '  </Card>',
+            f'  <Card title="{claims.mean_submitted:.1f}" icon="list-check">',
+            '    критериев подают в среднем', '  </Card>',
+            f'  <Card title="{claims.mean_met:.1f}" icon="check-double">', '    критериев засчитывают', '  </Card>',
+            '</CardGroup>',
+        ]) if claims.records else '',
+        '---',
+        '## Эффективность критериев',
+        f'### Топ-{len(strong)} по одобрению',
+        '\n'.join(['<AccordionGroup>', *accordions, '</AccordionGroup>']),
+        '### Слабые критерии',
+        '\n'.join(['<CardGroup cols={2}>', *cards, '</CardGroup>']),
+        RATE_WARNING,
+        '---',
+        '## Сравнение центров',
+        '\n'.join(['<Tabs>', *center_tabs, '</Tabs>']),
+        '---',
+        '## По направлениям: quick stats',
+        '\n'.join(['<CardGroup cols={2}>', *direction_cards, '</CardGroup>']),
+        '---',
+        '## Формула успеха',
+        '\n'.join(steps),
+        '---',
+        source_info(n),
+    ]
+    return '\n\n'.join(part for part in parts if part) + '\n'
+
+
+def render_interactive_page(stats: CriteriaStats, note: str) -> str:
+    n = stats.count()
+    claims = stats.claims
+    top = ranked(stats.table())
+
+    advice = []
+    for criterion in CRITERIA:
+        if not criterion.works and not criterion.fails:
+            continue
+        body = []
+        if criterion.works:
+            body += ['**Что работает:**', *(f'- {item}' for item in criterion.works)]
+        if criterion.fails:
+            body += [''] * bool(body) + ['**Что НЕ работает:**', *(f'- {item}' for item in criterion.fails)]
+        advice += [f'  <Accordion title="{criterion.title}" icon="{criterion.icon}">',
+                   *(f'    {line}' if line else '' for line in body), '  </Accordion>', '']
+    advice[-1:] = []
+
+    steps = ['<Steps>']
+    if top:
+        steps += [f'  <Step title="{CRITERIA_BY_KEY[top[0].criterion].title} — must have">',
+                  f'    {percent(top[0])} успеха. Подавайте всегда.', '  </Step>', '']
+    signatures = signature_lines(stats)
+    if signatures:
+        steps += ['  <Step title="Добавьте 2-й сильный критерий">', *(f'    {line}' for line in signatures),
+                  '  </Step>', '']
+    winners = center_winners(stats)
+    best, leads = max(winners.items(), key=lambda item: len(item[1]))
+    if leads and all(len(others) < len(leads) for center, others in winners.items() if center != best):
+        diffs = [diff for _, diff in leads]
+        steps += [f'  <Step title="{best} если можете">',
+                  f'    Заметно лучше по {len(leads)} {criteria_dative(len(leads))}: '
+                  f'от +{min(diffs)} до +{max(diffs)} п.п.', '  </Step>', '']
+    if claims.records:
+        steps += ['  <Step title="7-8 критериев всего">',
+                  f'    Средне засчитывают {claims.mean_met:.1f}. Нужно 3 для уверенного апрува.', '  </Step>', '']
+    steps[-1:] = ['</Steps>']
+
+    parts = [
+        frontmatter('Статистика RFE: найди свой профиль', 'Статистика (профили)', 'user-check',
+                    'Выберите направление и центр — получите рекомендации'),
+        f'<Note>\n**Интерактивный формат:** выберите направление или сферу, центр и тип документа — '
+        f'проценты пересчитаются для выбранного профиля. Всего в базе {n} {cases_word(n)}.\n\n{note}\n</Note>',
+        '---',
+        '## Выберите ваш профиль',
+        '<div id="rfe-cube" data-view="profile"></div>',
+        f'<Tip>\n✅ **Подавать** — засчитывают более чем в 40% случаев | ⚠️ **Если сильное** — 20-40% | '
+        f'❌ **Не подавать** — реже 20%.\n\nКритерии, которые в выбранном профиле заявляли меньше {MIN_CLAIMS} раз, '
+        f'не оцениваются.\n</Tip>',
+        RATE_WARNING,
+        '---',
+        '## Что засчитывают',
+        '\n'.join(['<AccordionGroup>', *advice, '</AccordionGroup>']),
+        '---',
+        '## Универсальные рекомендации',
+        '\n'.join(steps) if len(steps) > 1 else '',
+        '---',
+        source_info(n),
+    ]
+    return '\n\n'.join(part for part in parts if part) + '\n'
+
+
+def render_cube(records: List[dict], criteria: List[str]) -> str:
+    """rfe-cube.json: build_cube() over every direction and field, with labels for scripts/rfe-cube.js."""
+    groups = {f.slug: (f.slug,) for f in FIELDS}
+    groups.update({d.slug: d.fields for d in DIRECTIONS})
+    cube = build_cube(records, criteria, groups)
+    labels = {ALL: 'Все'}
+    labels.update({f.slug: f'{f.emoji} {f.short}' for f in FIELDS})
+    labels.update({d.slug: d.name for d in DIRECTIONS})
+    cube = {
+        'version': CUBE_VERSION,
+        **cube,
+        'labels': {
+            'group': [labels.get(group, group) for group in cube['dims']['group']],
+            'outcome': [OUTCOME_NAMES[o] for o in cube['dims']['outcome']],
+            'criterion': [CRITERIA_BY_KEY[c].name for c in cube['dims']['criterion']],
+        },
+        'menus': [['Направление', [ALL, *(d.slug for d in DIRECTIONS)]],
+                  ['Сфера', [f.slug for f in FIELDS]]],
+        'min_claims': MIN_CLAIMS,
+    }
+    return json.dumps(cube, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def render_pages(records: List[dict], criteria: List[str]) -> Dict[str, str]:
+    """{path relative to the project root: content} for every stats page and the cube."""
+    with stage('stats'):
+        stats = CriteriaStats(records, criteria, {d.slug: d.fields for d in DIRECTIONS})
+    members = {d.slug: [r for r in records if set(d.fields) & set(r.get('fields') or ())] for d in DIRECTIONS}
+    note = directions_note(records)
+    with stage('cube'):
+        cube = render_cube(records, criteria)
+    return {
+        'rfe-statistics.mdx': render_statistics_page(stats, members, note),
+        'success-stories/rfe-stats-heatmap.mdx': render_heatmap_page(stats, note),
+        'success-stories/rfe-stats-visual.mdx': render_visual_page(stats),
+        'success-stories/rfe-stats-interactive.mdx': render_interactive_page(stats, note),
+        CUBE_PATH: cube,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the criteria statistics pages from the RFE dataset.")
+    parser.add_argument('data', nargs='?', type=Path, default=DEFAULT_DATA)
+    parser.add_argument('--check', action='store_true',
+                        help="Write nothing; exit 1 if a page differs from the generated one")
+    add_arguments(parser)
+    args = parser.parse_args()
+    with instrumented('generate_rfe_stats', args, globals(), HOT_FUNCTIONS):
+        return run(args)
+
+
+def run(args) -> int:
+    with stage('load'):
+        meta, cases = open_cases(args.data)
+        records = list(cases)
+    count('records', len(records))
+    criteria = meta['criteria']
+
+    problems = validate(records, criteria)
+    if set(criteria) != set(CRITERIA_BY_KEY):
+        problems.append(f"criteria {sorted(criteria)} do not match CRITERIA {sorted(CRITERIA_BY_KEY)}")
+    if problems:
+        print(f"{args.data}: {len(problems)} problems", file=sys.stderr)
+        for message in problems:
+            print(f"  - {message}", file=sys.stderr)
+        return 1
+
+    with stage('render'):
+        pages = render_pages(records, criteria)
+
+    with stage('write'):
+        stale = []
+        for name, content in pages.items():
+            path = PROJECT_ROOT / name
+            if args.check:
+                if not path.exists() or path.read_text(encoding='utf-8') != content:
+                    stale.append(name)
+            elif write_if_changed(path, content):
+                stale.append(name)
+    count('pages', len(pages))
+
+    if args.check:
+        if stale:
+            print(f"Out of date: {', '.join(stale)}. Run scripts/generate_rfe_stats.py")
+            return 1
+        print(f"All {len(pages)} stats files are up to date")
+        return 0
+    print(f"Wrote {len(stale)} of {len(pages)} stats files from {len(records)} records")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Run instrumentation shared by the scripts: stage timers, counters, call
+counts for hot functions and regexes, a cProfile dump and a JSON report.
+
+    with instrumented('clean_cases', args, globals(), HOT_FUNCTIONS):
+        with stage('clean'):
+            ...
+        count('cases.kept')
+
+stage() and count() are always on and cheap (a perf_counter pair per
+stage, a dict update per counter), so scripts call them unconditionally;
+stages nest and are reported by dotted path ("render.index"). Hot
+functions and the module's compiled regexes are only wrapped in counting
+proxies while a report is requested, so an ordinary run pays nothing for
+them. Function times are inclusive of nested tracked calls.
+
+Flags added by add_arguments():
+  --timings-report [PATH]  JSON report (default: .cache/timings/<script>-<time>.json)
+  --profile [PATH]         cProfile stats (default: .cache/profiles/<script>.pstats),
+                           read with `python3 -m pstats PATH`
+
+Worker processes (--jobs) are not measured: a stage that waits on them
+counts the wait, and function and regex counts only cover the main
+process, so use --jobs 1 for complete counts.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROJECT_ROOT = Path(__file__).parent.parent
+TIMINGS_DIR = PROJECT_ROOT / '.cache' / 'timings'
+PROFILES_DIR = PROJECT_ROOT / '.cache' / 'profiles'
+REPORT_VERSION = 1
+PROFILE_TOP = 25
+
+_DEFAULT = object()  # flag given without a path
+
+
+class Recorder:
+    """Stage times and counters of one run."""
+
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}     # path -> [seconds, calls]
+        self.counters: Counter = Counter()
+        self.functions: Dict[str, List[float]] = {}  # name -> [calls, seconds]
+        self.regex_calls: Counter = Counter()
+        self.sections: Dict[str, dict] = {}
+        self._stack: List[str] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        self._stack.append(name)
+        entry = self.stages.setdefault('.'.join(self._stack), [0.0, 0])  # listed in start order
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry[0] += time.perf_counter() - started
+            entry[1] += 1
+            self._stack.pop()
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def section(self, name: str, values: dict):
+        """Attach script-specific figures (e.g. lint seconds per rule) to the report."""
+        self.sections[name] = values
+
+
+RECORDER = Recorder()
+
+
+def stage(name: str):
+    """Time a block as a (nested) stage of the current run."""
+    return RECORDER.stage(name)
+
+
+def count(name: str, n: int = 1):
+    RECORDER.count(name, n)
+
+
+def section(name: str, values: dict):
+    RECORDER.section(name, values)
+
+
+class _CountedPattern:
+    """Compiled regex proxy counting calls of its matching methods."""
+
+    __slots__ = ('_pattern', '_name')
+
+    def __init__(self, pattern: re.Pattern, name: str):
+        self._pattern = pattern
+        self._name = name
+
+    def __getattr__(self, attr):
+        value = getattr(self._pattern, attr)
+        if attr in ('search', 'match', 'fullmatch', 'sub', 'subn', 'split', 'findall', 'finditer'):
+            RECORDER.regex_calls[self._name] += 1
+        return value
+
+
+def _track_function(func, name: str):
+    entry = RECORDER.functions.setdefault(name, [0, 0.0])
+
+    @wraps(func)
+    def tracked(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            entry[0] += 1
+            entry[1] += time.perf_counter() - started
+    return tracked
+
+
+def track(namespace: dict, functions: Iterable[str] = ()) -> Dict[str, object]:
+    """Wrap named functions and every compiled regex in namespace.
+
+    Module-level patterns and lists/tuples of patterns are replaced by
+    counting proxies. Returns the original values, for untrack().
+    """
+    originals = {}
+    for name in functions:
+        originals[name] = namespace[name]
+        namespace[name] = _track_function(namespace[name], name)
+    for name, value in list(namespace.items()):
+        if isinstance(value, re.Pattern):
+            originals[name] = value
+            namespace[name] = _CountedPattern(value, name)
+        elif isinstance(value, (list, tuple)) and value and all(isinstance(v, re.Pattern) for v in value):
+            originals[name] = value
+            namespace[name] = type(value)(_CountedPattern(v, f'{name}[{i}]') for i, v in enumerate(value))
+    return originals
+
+
+def untrack(namespace: dict, originals: Dict[str, object]):
+    namespace.update(originals)
+
+
+def add_arguments(parser):
+    """Add --timings-report and --profile to a script's argument parser."""
+    parser.add_argument('--timings-report', nargs='?', const=_DEFAULT, metavar='PATH',
+                        help=f"Write a JSON timing report (default: {TIMINGS_DIR}/<script>-<time>.json)")
+    parser.add_argument('--profile', nargs='?', const=_DEFAULT, metavar='PATH',
+                        help=f"Dump cProfile stats (default: {PROFILES_DIR}/<script>.pstats)")
+
+
+def _max_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def build_report(script: str, started_at: datetime, wall: float, cpu: float) -> dict:
+    report = {
+        'version': REPORT_VERSION,
+        'script': script,
+        'argv': sys.argv[1:],
+        'started_at': started_at.isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'wall_seconds': round(wall, 6),
+        'cpu_seconds': round(cpu, 6),
+        'max_rss_kb': _max_rss_kb(),
+        'stages': {path: {'seconds': round(seconds, 6), 'calls': calls}
+                   for path, (seconds, calls) in RECORDER.stages.items()},
+        'counters': dict(sorted(RECORDER.counters.items())),
+        'functions': {name: {'calls': calls, 'seconds': round(seconds, 6)}
+                      for name, (calls, seconds) in sorted(RECORDER.functions.items(),
+                                                           key=lambda item: -item[1][1])},
+        'regex_calls': dict(RECORDER.regex_calls.most_common()),
+    }
+    report.update(RECORDER.sections)
+    return report
+
+
+def print_report(report: dict, out=sys.stderr):
+    wall = report['wall_seconds'] or 1
+    print(f"\nTimings ({report['script']}): {report['wall_seconds']:.3f}s wall, "
+          f"{report['cpu_seconds']:.3f}s CPU", file=out)
+    for path, entry in report['stages'].items():
+        indent = '  ' * path.count('.')
+        print(f"  {entry['seconds'] * 1000:>10.1f} ms  {entry['seconds'] / wall:>6.1%}  "
+              f"{indent}{path.rsplit('.', 1)[-1]} ({entry['calls']}x)", file=out)
+    for name, entry in report['functions'].items():
+        if entry['calls']:
+            print(f"  {entry['seconds'] * 1000:>10.1f} ms  {entry['calls']:>9} calls  {name}()", file=out)
+    if report['regex_calls']:
+        print(f"  {sum(report['regex_calls'].values()):>9} regex calls, most used: "
+              + ', '.join(f'{name} ({n})' for name, n in list(report['regex_calls'].items())[:5]), file=out)
+    for name, value in report['counters'].items():
+        print(f"  {value:>12}  {name}", file=out)
+
+
+def _resolve(value, default: Path) -> Optional[Path]:
+    if value is None:
+        return None
+    return default if value is _DEFAULT else Path(value)
+
+
+@contextmanager
+def instrumented(script: str, args=None, namespace: Optional[dict] = None, functions: Iterable[str] = ()):
+    """Instrument one run of a script.
+
+    args comes from a parser extended with add_arguments(). With a report
+    requested, the functions named (and the regexes) in namespace are
+    tracked for the run; the report and the profile are written when the
+    block exits, also on sys.exit().
+    """
+    stamp = datetime.now(timezone.utc)
+    report_path = _resolve(getattr(args, 'timings_report', None),
+                           TIMINGS_DIR / f"{script}-{stamp.strftime('%Y%m%d-%H%M%S')}.json")
+    profile_path = _resolve(getattr(args, 'profile', None), PROFILES_DIR / f'{script}.pstats')
+
+    global RECORDER
+    RECORDER = Recorder()
+    originals = track(namespace, functions) if report_path and namespace is not None else {}
+    profiler = cProfile.Profile() if profile_path else None
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    if profiler:
+        profiler.enable()
+    try:
+        yield RECORDER
+    finally:
+        if profiler:
+            profiler.disable()
+        wall = time.perf_counter() - wall_started
+        cpu = time.process_time() - cpu_started
+        if originals:
+            untrack(namespace, originals)
+
+        if profiler:
+            profile_path.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(profile_path))
+            print(f"\nProfile written to {profile_path} (top {PROFILE_TOP} by cumulative time):", file=sys.stderr)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        if report_path:
+            report = build_report(script, stamp, wall, cpu)
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = report_path.with_name(report_path.name + '.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+                f.write('\n')
+            os.replace(tmp, report_path)
+            print_report(report)
+            print(f"Timing report written to {report_path}", file=sys.stderr)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP status cache for the link audit.
+
+One SQLite row per URL: status, final URL, ETag, Last-Modified and the time
+it was checked. Page rows also keep the hrefs found on the page, so a page
+that is still fresh (or answers 304) does not need to be downloaded again.
+
+Entries younger than the TTL are reused as-is; older entries are
+revalidated with If-None-Match / If-Modified-Since.
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+DEFAULT_TTL_HOURS = 24
+COMMIT_EVERY = 50  # writes per transaction, so an interrupted audit keeps its results
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS url_status (
+    url           TEXT PRIMARY KEY,
+    status        INTEGER NOT NULL,
+    final_url     TEXT,
+    etag          TEXT,
+    last_modified TEXT,
+    checked_at    REAL NOT NULL,
+    links         TEXT
+)
+'''
+
+
+class CacheEntry(NamedTuple):
+    url: str
+    status: int
+    final_url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    checked_at: float
+    links: Optional[List[str]]  # hrefs on the page; None for HEAD-only rows
+
+
+class LinkStatusCache:
+    """SQLite-backed URL -> status cache with TTL.
+
+    Only used from the thread that drives the crawl. Writes are committed
+    every COMMIT_EVERY put()/touch() calls and on close(), so a crashed or
+    interrupted crawl loses at most the last few results; use it as a
+    context manager so close() also runs on errors.
+    """
+
+    def __init__(self, path: Path, ttl_hours: float = DEFAULT_TTL_HOURS):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._db = sqlite3.connect(str(path))
+        self._db.execute(SCHEMA)
+        self._uncommitted = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+    def _written(self):
+        self._uncommitted += 1
+        if self._uncommitted >= COMMIT_EVERY:
+            self._db.commit()
+            self._uncommitted = 0
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        row = self._db.execute(
+            'SELECT url, status, final_url, etag, last_modified, checked_at, links '
+            'FROM url_status WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        links = json.loads(row[6]) if row[6] is not None else None
+        return CacheEntry(*row[:6], links)
+
+    def is_fresh(self, entry: CacheEntry, now: float = None) -> bool:
+        now = now if now is not None else time.time()
+        return now - entry.checked_at < self.ttl
+
+    @staticmethod
+    def validators(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """Conditional request headers for a cached entry."""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def put(self, url: str, status: int, final_url: str, etag: str = None,
+            last_modified: str = None, links: List[str] = None):
+        """Store a result. Network errors and 4xx/5xx are never cached."""
+        if status < 0 or status >= 400:
+            self._db.execute('DELETE FROM url_status WHERE url = ?', (url,))
+            self._written()
+            return
+        self._db.execute(
+            'INSERT OR REPLACE INTO url_status '
+            '(url, status, final_url, etag, last_modified, checked_at, links) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (url, status, final_url, etag, last_modified, time.time(),
+             json.dumps(links) if links is not None else None))
+        self._written()
+
+    def touch(self, url: str):
+        """Mark an entry as checked now (after a 304 Not Modified)."""
+        self._db.execute('UPDATE url_status SET checked_at = ? WHERE url = ?', (time.time(), url))
+        self._written()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Concurrent HTTP engine for the link audit.
+
+Page fetches (GET) and link checks (HEAD) share one bounded thread pool.
+Every worker thread keeps one keep-alive connection per host, and a
+semaphore per host caps how many requests hit the same server at once.
+"""
+
+import http.client
+import ssl
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) LinkAudit/1.0'
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 5
+
+# Errors that mean a reused keep-alive connection was closed by the server
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.ResponseNotReady,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class FetchResult(NamedTuple):
+    status: int                  # -1 on network error, 304 if not modified
+    final_url: str               # error message when status is -1
+    etag: Optional[str]
+    last_modified: Optional[str]
+    text: str
+
+
+class CrawlEngine:
+    """Thread-pool HTTP client with per-host limits and connection reuse.
+
+    Use as a context manager:
+
+        with CrawlEngine(workers=16, per_host=8) as engine:
+            future = engine.submit(engine.head, url)
+    """
+
+    def __init__(self, workers: int = 16, per_host: int = 8, timeout: float = 15.0):
+        self.workers = workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self._ssl = ssl.create_default_context()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._connections: List[http.client.HTTPConnection] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __enter__(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix='link-audit')
+        return self
+
+    def __exit__(self, *exc):
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        return False
+
+    def submit(self, fn, *args) -> Future:
+        """Schedule fn(*args) on the worker pool."""
+        return self._executor.submit(fn, *args)
+
+    def _host_limit(self, netloc: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            limit = self._host_limits.get(netloc)
+            if limit is None:
+                limit = threading.BoundedSemaphore(self.per_host)
+                self._host_limits[netloc] = limit
+            return limit
+
+    def _connection(self, scheme: str, netloc: str, fresh: bool = False) -> http.client.HTTPConnection:
+        """Return this thread's keep-alive connection to (scheme, netloc)."""
+        conns = getattr(self._local, 'conns', None)
+        if conns is None:
+            conns = self._local.conns = {}
+
+        key = (scheme, netloc)
+        conn = conns.get(key)
+        if conn is not None and not fresh:
+            return conn
+        if conn is not None:
+            conn.close()
+
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self._ssl)
+        else:
+            conn = http.client.HTTPConnection(netloc, timeout=self.timeout)
+        conns[key] = conn
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def _send(self, method: str, url: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """Send one request (no redirects) over a pooled connection."""
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        request_headers = {'User-Agent': USER_AGENT}
+        request_headers.update(headers)
+
+        with self._host_limit(parts.netloc):
+            # A keep-alive connection may have been closed by the server
+            # between requests; retry once on a fresh connection.
+            for attempt in range(2):
+                conn = self._connection(parts.scheme, parts.netloc, fresh=attempt > 0)
+                try:
+                    conn.request(method, path, headers=request_headers)
+                    resp = conn.getresponse()
+                    body = resp.read()
+                except STALE_CONNECTION_ERRORS:
+                    conn.close()
+                    if attempt:
+                        raise
+                    continue
+                except Exception:
+                    conn.close()
+                    raise
+                if resp.will_close:
+                    conn.close()
+                return resp.status, {k.lower(): v for k, v in resp.getheaders()}, body
+
+    def request(self, method: str, url: str,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, str, Dict[str, str], bytes]:
+        """Send a request, following redirects. Returns (status, final_url, headers, body)."""
+        headers = headers or {}
+        for _ in range(MAX_REDIRECTS + 1):
+            status, resp_headers, body = self._send(method, url, headers)
+            location = resp_headers.get('location')
+            if status not in REDIRECT_CODES or not location:
+                return status, url, resp_headers, body
+            url = urllib.parse.urljoin(url, location)
+            if status == 303 and method != 'HEAD':
+                method = 'GET'
+        return status, url, resp_headers, body
+
+    def fetch(self, method: str, url: str,
+              validators: Optional[Dict[str, str]] = None) -> FetchResult:
+        """Send GET/HEAD (optionally conditional) and never raise."""
+        try:
+            status, final_url, headers, body = self.request(method, url, validators)
+        except Exception as e:
+            return FetchResult(-1, str(e), None, None, '')
+        if status >= 400:
+            final_url = url
+        return FetchResult(status, final_url, headers.get('etag'), headers.get('last-modified'),
+                           body.decode('utf-8', errors='ignore'))
+
+    def get(self, url: str) -> Tuple[int, str, str]:
+        """GET a page. Returns (status, final_url, html); status -1 on network error."""
+        result = self.fetch('GET', url)
+        return result.status, result.final_url, result.text
+
+    def head(self, url: str) -> Tuple[int, str]:
+        """Check HTTP status of URL. Returns (status_code, final_url)."""
+        result = self.fetch('HEAD', url)
+        return result.status, result.final_url
+
+
+def wait_any(pending: Dict[Future, object]) -> List[Tuple[Future, object]]:
+    """Block until at least one pending future finishes.
+
+    `pending` maps futures to caller tags; finished entries are removed
+    and returned as (future, tag) pairs.
+    """
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    return [(future, pending.pop(future)) for future in done]
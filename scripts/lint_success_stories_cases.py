@@ -2,19 +2,50 @@
 """
 QA lint script for success stories cases.
 Fails if cases contain garbage patterns.
+
+Pattern rules are compiled once, and each only runs on fields containing
+the literal declared next to it (e.g. '[' or '**'), so a clean field costs a few
+substring checks. The summary and context are normalized once per case.
+
+--mdx also lints the generated success-stories pages (placeholders, generic
+accordion titles, empty summaries, unclosed accordions), one file per
+worker process with --jobs. --format json/sarif writes machine-readable
+results, and --timings reports the time spent in each rule (pattern rules
+are then run one by one so their time can be attributed). --timings-report
+and --profile are described in instrumentation.py.
+
+Usage:
+  python3 scripts/lint_success_stories_cases.py [data/cases.json] [--mdx [DIR ...]]
+      [--jobs N] [--format text|json|sarif] [-o OUTPUT] [--timings]
+      [--timings-report [PATH]] [--profile [PATH]]
 """
 
+import argparse
 import json
+import os
 import re
 import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 
-# Patterns that should FAIL the lint
-FAIL_PATTERNS = [
-    r'\[name\]',           # Placeholder
-    r'\*\*',               # Markdown bold
-    r'^#\w+',              # Hashtag at start
-]
+from case_store import atomic_open, iter_cases
+from instrumentation import add_arguments, count, instrumented, section, stage
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_MDX_DIR = PROJECT_ROOT / 'success-stories'
+
+# Patterns that should FAIL the lint (rule id -> (pattern, prefilter)).
+# The prefilter is a literal every match contains in any letter case (so
+# no letters), or None to always run the regex; when adding a rule, keep
+# the two in step by hand.
+FAIL_PATTERNS = {
+    'placeholder-name': (r'\[name\]', '['),    # Placeholder
+    'markdown-bold': (r'\*\*', '**'),          # Markdown bold
+    'hashtag-start': (r'^#\w+', '#'),          # Hashtag at start
+}
 
 # Titles that should FAIL
 FAIL_TITLES = [
@@ -29,85 +60,351 @@ FAIL_TITLES = [
     'o-1',
 ]
 
-# Patterns that trigger WARNING
-WARN_PATTERNS = [
-    r'^\s*(привет|ура|здравствуй)',
-    r'\[имя\]',
-    r'\[ссылка\]',
-]
+# Patterns that trigger WARNING (rule id -> (pattern, prefilter), as above)
+WARN_PATTERNS = {
+    'greeting-start': (r'^\s*(привет|ура|здравствуй)', None),
+    'placeholder-imya': (r'\[имя\]', '['),
+    'placeholder-link': (r'\[ссылка\]', '['),
+}
 
+# Fields each severity's patterns are checked against
+FAIL_FIELDS = ('title', 'context', 'summary')
+WARN_FIELDS = ('title', 'context')
 
-def lint_case(case: dict) -> tuple[list, list]:
-    """Lint a single case. Returns (errors, warnings)."""
-    errors = []
-    warnings = []
+# Rule id -> (level, description); used for SARIF rule metadata
+RULES = {
+    **{rule: ('error', f"Text contains '{pattern}'") for rule, (pattern, _) in FAIL_PATTERNS.items()},
+    **{rule: ('warning', f"Text matches '{pattern}'") for rule, (pattern, _) in WARN_PATTERNS.items()},
+    'generic-title': ('error', "Title is a generic stop-phrase"),
+    'summary-equals-context': ('warning', "Summary repeats the context"),
+    'context-too-short': ('warning', "Context is shorter than 20 characters"),
+    'title-too-short': ('error', "Title is shorter than 5 characters"),
+    'mdx-placeholder': ('error', "Generated page contains a placeholder"),
+    'mdx-generic-title': ('error', "Accordion title is a generic stop-phrase"),
+    'mdx-empty-summary': ('warning', "Accordion has an empty summary"),
+    'mdx-unclosed-accordion': ('error', "Accordion tags are not balanced"),
+}
+
+NON_WORD_RE = re.compile(r'\W+')
+MDX_PLACEHOLDER_RE = re.compile(r'\[(?:name|имя|ссылка)\]', re.IGNORECASE)
+MDX_ACCORDION_RE = re.compile(r'<Accordion\s+title="([^"]*)"')
+MDX_SUMMARY_RE = re.compile(r'^\s*\*\*Итог:\*\*\s*$')
+
+
+class Finding(NamedTuple):
+    rule: str
+    level: str                      # 'error' or 'warning'
+    message: str
+    case_id: Optional[str] = None
+    file: Optional[str] = None
+    line: Optional[int] = None
 
+
+class PatternSet:
+    """The pattern rules of one severity, compiled once.
+
+    A rule's regex only runs on text containing its declared prefilter
+    literal, so a clean field costs a few substring checks instead of one
+    regex scan per rule.
+    """
+
+    def __init__(self, rules: Dict[str, Tuple[str, Optional[str]]]):
+        self.patterns = {rule: pattern for rule, (pattern, _) in rules.items()}
+        self.compiled = {rule: re.compile(pattern, re.IGNORECASE) for rule, pattern in self.patterns.items()}
+        self.literals = {rule: literal for rule, (_, literal) in rules.items()}
+        self._checks = [(rule, self.literals[rule], regex) for rule, regex in self.compiled.items()]
+
+    def matches(self, text: str, timings: Optional[Counter] = None) -> List[str]:
+        """Rule ids whose pattern occurs in text, in definition order."""
+        if timings is None:
+            return [rule for rule, literal, regex in self._checks
+                    if (literal is None or literal in text) and regex.search(text)]
+
+        hits = []
+        for rule, literal, regex in self._checks:
+            started = time.perf_counter()
+            if (literal is None or literal in text) and regex.search(text):
+                hits.append(rule)
+            timings[rule] += time.perf_counter() - started
+        return hits
+
+
+FAIL_RULES = PatternSet(FAIL_PATTERNS)
+WARN_RULES = PatternSet(WARN_PATTERNS)
+FAIL_TITLE_SET = frozenset(FAIL_TITLES)
+
+
+def _timed(timings: Optional[Counter], rule: str, started: float):
+    if timings is not None:
+        timings[rule] += time.perf_counter() - started
+
+
+def check_case(case: dict, timings: Optional[Counter] = None) -> List[Finding]:
+    """All findings for one case. Pass a Counter to collect seconds per rule."""
+    findings = []
     case_id = case.get('id', 'unknown')
-    title = case.get('title', '')
-    context = case.get('context', '')
-    summary = case.get('summary', '')
+    fields = {
+        'title': case.get('title', ''),
+        'context': case.get('context', ''),
+        'summary': case.get('summary', ''),
+    }
 
     # Check FAIL patterns in all text fields
-    for field_name, field_value in [('title', title), ('context', context), ('summary', summary)]:
-        for pattern in FAIL_PATTERNS:
-            if re.search(pattern, field_value, re.IGNORECASE):
-                errors.append(f"{case_id}: {field_name} contains '{pattern}'")
+    for field_name in FAIL_FIELDS:
+        for rule in FAIL_RULES.matches(fields[field_name], timings):
+            findings.append(Finding(rule, 'error', f"{case_id}: {field_name} contains '{FAIL_RULES.patterns[rule]}'",
+                                    case_id))
 
     # Check FAIL titles
-    title_lower = title.lower().strip()
-    if title_lower in FAIL_TITLES:
-        errors.append(f"{case_id}: title is generic stop-phrase '{title}'")
+    title = fields['title']
+    started = time.perf_counter() if timings is not None else 0.0
+    if title.lower().strip() in FAIL_TITLE_SET:
+        findings.append(Finding('generic-title', 'error', f"{case_id}: title is generic stop-phrase '{title}'",
+                                case_id))
+    _timed(timings, 'generic-title', started)
 
     # Check WARNING patterns
-    for field_name, field_value in [('title', title), ('context', context)]:
-        for pattern in WARN_PATTERNS:
-            if re.search(pattern, field_value, re.IGNORECASE):
-                warnings.append(f"{case_id}: {field_name} matches warning pattern '{pattern}'")
+    for field_name in WARN_FIELDS:
+        for rule in WARN_RULES.matches(fields[field_name], timings):
+            findings.append(Finding(rule, 'warning',
+                                    f"{case_id}: {field_name} matches warning pattern '{WARN_RULES.patterns[rule]}'",
+                                    case_id))
 
-    # Check if summary == context (too similar)
+    # Check if summary == context (too similar); each side normalized once
+    summary, context = fields['summary'], fields['context']
+    started = time.perf_counter() if timings is not None else 0.0
     if summary and context:
-        s1 = re.sub(r'\W+', '', summary.lower())
-        s2 = re.sub(r'\W+', '', context.lower())
+        s1 = NON_WORD_RE.sub('', summary.lower())
+        s2 = NON_WORD_RE.sub('', context.lower())
         if s1 == s2 or (len(s1) > 10 and s1 in s2):
-            warnings.append(f"{case_id}: summary equals context")
+            findings.append(Finding('summary-equals-context', 'warning', f"{case_id}: summary equals context",
+                                    case_id))
+    _timed(timings, 'summary-equals-context', started)
 
     # Check empty/very short content
+    started = time.perf_counter() if timings is not None else 0.0
     if len(context.strip()) < 20:
-        warnings.append(f"{case_id}: context too short ({len(context)} chars)")
+        findings.append(Finding('context-too-short', 'warning',
+                                f"{case_id}: context too short ({len(context)} chars)", case_id))
+    _timed(timings, 'context-too-short', started)
 
+    started = time.perf_counter() if timings is not None else 0.0
     if len(title.strip()) < 5:
-        errors.append(f"{case_id}: title too short ({len(title)} chars)")
+        findings.append(Finding('title-too-short', 'error', f"{case_id}: title too short ({len(title)} chars)",
+                                case_id))
+    _timed(timings, 'title-too-short', started)
 
+    return findings
+
+
+def _split(findings: Iterable[Finding]) -> Tuple[list, list]:
+    errors = []
+    warnings = []
+    for finding in findings:
+        (errors if finding.level == 'error' else warnings).append(finding.message)
     return errors, warnings
 
 
+def lint_case(case: dict) -> tuple[list, list]:
+    """Lint a single case. Returns (errors, warnings)."""
+    return _split(check_case(case))
+
+
+def check_all_cases(input_path: str, timings: Optional[Counter] = None) -> List[Finding]:
+    """Findings for every case (streamed, .json or .jsonl)."""
+    findings = []
+    cases = 0
+    for case in iter_cases(input_path):
+        findings.extend(check_case(case, timings))
+        cases += 1
+    count('cases.read', cases)
+    return findings
+
+
 def lint_all_cases(input_path: str) -> tuple[list, list]:
-    """Lint all cases. Returns (all_errors, all_warnings)."""
-    with open(input_path) as f:
-        data = json.load(f)
+    """Lint all cases (streamed, .json or .jsonl). Returns (all_errors, all_warnings)."""
+    return _split(check_all_cases(input_path))
 
-    all_errors = []
-    all_warnings = []
 
-    for case in data['cases']:
-        errors, warnings = lint_case(case)
-        all_errors.extend(errors)
-        all_warnings.extend(warnings)
+def check_mdx_file(path: str, timed: bool = False) -> Tuple[List[Finding], Counter]:
+    """Findings for one generated MDX page, and seconds per rule when timed."""
+    findings = []
+    timings = Counter()
+    clock = time.perf_counter if timed else (lambda: 0.0)
+    open_line = None
 
-    return all_errors, all_warnings
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            started = clock()
+            if MDX_PLACEHOLDER_RE.search(line):
+                findings.append(Finding('mdx-placeholder', 'error',
+                                        f"{path}:{number}: contains a placeholder", file=path, line=number))
+            lap = clock()
+            timings['mdx-placeholder'] += lap - started
+
+            if '<Accordion' in line:
+                match = MDX_ACCORDION_RE.search(line)
+                if match and match.group(1).lower().strip() in FAIL_TITLE_SET:
+                    findings.append(Finding('mdx-generic-title', 'error',
+                                            f"{path}:{number}: accordion title is generic stop-phrase "
+                                            f"'{match.group(1)}'", file=path, line=number))
+                if match:
+                    if open_line is not None:
+                        findings.append(Finding('mdx-unclosed-accordion', 'error',
+                                                f"{path}:{open_line}: accordion is not closed",
+                                                file=path, line=open_line))
+                    open_line = number
+            elif '</Accordion>' in line:
+                if open_line is None:
+                    findings.append(Finding('mdx-unclosed-accordion', 'error',
+                                            f"{path}:{number}: </Accordion> without an open accordion",
+                                            file=path, line=number))
+                open_line = None
+            started = clock()
+            timings['mdx-generic-title'] += started - lap
+
+            if MDX_SUMMARY_RE.match(line):
+                findings.append(Finding('mdx-empty-summary', 'warning',
+                                        f"{path}:{number}: accordion summary is empty", file=path, line=number))
+            timings['mdx-empty-summary'] += clock() - started
+
+    if open_line is not None:
+        findings.append(Finding('mdx-unclosed-accordion', 'error', f"{path}:{open_line}: accordion is not closed",
+                                file=path, line=open_line))
+    return findings, timings
+
+
+def mdx_files(dirs: Iterable[Path]) -> List[str]:
+    files = []
+    for directory in dirs:
+        directory = Path(directory)
+        files.extend(str(p) for p in sorted(directory.rglob('*.mdx')) if p.is_file())
+    return files
+
+
+def check_mdx_files(paths: List[str], jobs: int = 1, timings: Optional[Counter] = None) -> List[Finding]:
+    """Lint MDX files, one file per task across jobs worker processes."""
+    timed = timings is not None
+    if jobs <= 1 or len(paths) <= 1:
+        results = [check_mdx_file(path, timed) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(check_mdx_file, paths, [timed] * len(paths)))
+
+    findings = []
+    for file_findings, file_timings in results:
+        findings.extend(file_findings)
+        if timed:
+            timings.update(file_timings)
+    return findings
+
+
+def to_json(findings: List[Finding], timings: Optional[Counter]) -> dict:
+    errors = sum(1 for f in findings if f.level == 'error')
+    report = {
+        'errors': errors,
+        'warnings': len(findings) - errors,
+        'findings': [{key: value for key, value in f._asdict().items() if value is not None} for f in findings],
+    }
+    if timings is not None:
+        report['timings'] = {rule: round(seconds, 6) for rule, seconds in timings.most_common()}
+    return report
+
+
+def to_sarif(findings: List[Finding], timings: Optional[Counter]) -> dict:
+    results = []
+    for f in findings:
+        result = {'ruleId': f.rule, 'level': f.level, 'message': {'text': f.message}}
+        if f.file:
+            result['locations'] = [{'physicalLocation': {
+                'artifactLocation': {'uri': Path(f.file).resolve().as_uri()},
+                'region': {'startLine': f.line},
+            }}]
+        elif f.case_id:
+            result['locations'] = [{'logicalLocations': [{'name': f.case_id, 'kind': 'object'}]}]
+        results.append(result)
+
+    run = {
+        'tool': {'driver': {
+            'name': 'lint_success_stories_cases',
+            'rules': [{'id': rule, 'shortDescription': {'text': description},
+                       'defaultConfiguration': {'level': level}}
+                      for rule, (level, description) in RULES.items()],
+        }},
+        'results': results,
+    }
+    if timings is not None:
+        run['properties'] = {'timings': {rule: round(seconds, 6) for rule, seconds in timings.most_common()}}
+    return {
+        'version': '2.1.0',
+        '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+        'runs': [run],
+    }
+
+
+def print_timings(timings: Counter):
+    total = sum(timings.values()) or 1
+    print(f"\nTimings per rule:")
+    for rule, seconds in timings.most_common():
+        print(f"  {seconds * 1000:>10.1f} ms  {seconds / total:>6.1%}  {rule}")
 
 
 def main():
-    input_path = sys.argv[1] if len(sys.argv) > 1 else '/Users/aeb/mintlify-docs/data/cases.json'
+    parser = argparse.ArgumentParser(description="Lint success-stories cases and generated pages.")
+    parser.add_argument('input', nargs='?', default='/Users/aeb/mintlify-docs/data/cases.json')
+    parser.add_argument('--mdx', type=Path, nargs='*',
+                        help=f"Also lint generated .mdx pages under these directories (default: {DEFAULT_MDX_DIR})")
+    parser.add_argument('--jobs', type=int, default=1, help="Worker processes for --mdx (0 = one per CPU)")
+    parser.add_argument('--format', choices=('text', 'json', 'sarif'), default='text')
+    parser.add_argument('-o', '--output', help="Write the json/sarif report here instead of stdout")
+    parser.add_argument('--timings', action='store_true', help="Report time spent per rule")
+    add_arguments(parser)
+    args = parser.parse_args()
+    with instrumented('lint_success_stories_cases', args, globals(), ('check_case', 'check_mdx_file')):
+        run(args)
+
 
-    print(f"Linting {input_path}...")
-    errors, warnings = lint_all_cases(input_path)
+def run(args):
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    timings = Counter() if args.timings else None
+    text = args.format == 'text'
+
+    if text:
+        print(f"Linting {args.input}...")
+    with stage('cases'):
+        findings = check_all_cases(args.input, timings)
+    if args.mdx is not None:
+        files = mdx_files(args.mdx or [DEFAULT_MDX_DIR])
+        if text:
+            print(f"Linting {len(files)} MDX files...")
+        with stage('mdx'):
+            findings.extend(check_mdx_files(files, jobs, timings))
+        count('mdx.files', len(files))
+    errors, warnings = _split(findings)
+    count('findings.errors', len(errors))
+    count('findings.warnings', len(warnings))
+    if timings is not None:
+        section('rules', {rule: round(seconds, 6) for rule, seconds in timings.most_common()})
+
+    if not text:
+        report = to_sarif(findings, timings) if args.format == 'sarif' else to_json(findings, timings)
+        if args.output:
+            with atomic_open(args.output) as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+                f.write('\n')
+        else:
+            json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+            print()
+        sys.exit(1 if errors else 0)
 
     if warnings:
         print(f"\n⚠️  WARNINGS ({len(warnings)}):")
         for w in warnings:
             print(f"  - {w}")
 
+    if timings is not None:
+        print_timings(timings)
+
     if errors:
         print(f"\n❌ ERRORS ({len(errors)}):")
         for e in errors:
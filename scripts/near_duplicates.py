@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for cases: MinHash signatures + LSH bucketing.
+
+The same story is often posted in several Telegram chats, and such cases
+are merged by hand today (the survivor's merged_from records the other
+case's source_id). This finds candidates across the whole corpus without
+comparing every pair:
+
+- the cleaned context is normalized and cut into word 3-gram shingles,
+  hashed with crc32 (stable across runs and processes);
+- each case gets a one-permutation MinHash signature: a shingle hash's top
+  bits pick one of SIGNATURE_BINS bins and the bin keeps its smallest hash,
+  empty bins borrow from the next non-empty bin (densification); the bins
+  are packed into one int, so comparing two signatures is a few big-int
+  operations instead of a Python loop;
+- LSH splits signatures into BANDS bands of ROWS bins; cases sharing any
+  band are candidates, and a candidate pair is kept when the share of equal
+  bins (the Jaccard estimate) reaches the threshold.
+
+Kept pairs and pairs with the same source_id become merge suggestions,
+strongest first: the case to keep (one with a source_id, then the longest
+context, then the first) and the case to merge into it, with the source_id
+to add to merged_from. A case is merged at most once and a case that others
+merge into is never merged itself, so suggestions do not chain. Pairs
+already linked by merged_from are not suggested again.
+
+Usage:
+  python3 scripts/near_duplicates.py [data/cases.json] [--threshold 0.8] [-o report.json]
+      [--timings-report [PATH]] [--profile [PATH]]
+"""
+
+import argparse
+import json
+import re
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from case_index import popcount
+from case_store import atomic_open, iter_cases
+from instrumentation import add_arguments, count, instrumented, stage
+
+SIGNATURE_BINS = 64
+BANDS = 16
+ROWS = SIGNATURE_BINS // BANDS
+SHINGLE_WORDS = 3
+MIN_SHINGLES = 4            # shorter contexts are only matched by source_id
+DEFAULT_THRESHOLD = 0.8
+# An LSH bucket with more members than this (a boilerplate context shared
+# by many cases) only yields pairs with its first member: the pairs among
+# the others are dropped without being compared, so a real duplicate in
+# such a bucket is only found through another band. Counted as
+# lsh.oversized_buckets in --timings-report.
+MAX_BUCKET_SIZE = 50
+
+_BIN_SHIFT = 32 - (SIGNATURE_BINS - 1).bit_length()  # top bits of a crc32 pick the bin
+_LANE = 32                                              # bits per bin in a packed signature
+_LANE_MASK = (1 << _LANE) - 1
+_BAND_MASK = (1 << (_LANE * ROWS)) - 1
+_LANE_LOW_BITS = sum(1 << (_LANE * b) for b in range(SIGNATURE_BINS))
+_DENSIFY_STEP = 0x9E3779B1
+WORD_RE = re.compile(r'\w+')
+
+DEFAULT_CASES = Path(__file__).parent.parent / 'data' / 'cases.json'
+
+
+def shingles(text: str) -> Set[int]:
+    """crc32 hashes of the word 3-grams of a normalized text."""
+    words = WORD_RE.findall((text or '').lower().replace('ё', 'е'))
+    if len(words) < SHINGLE_WORDS:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+    return {zlib.crc32(' '.join(words[i:i + SHINGLE_WORDS]).encode('utf-8'))
+            for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def signature(hashes: Iterable[int]) -> int:
+    """One-permutation MinHash signature of a shingle hash set.
+
+    Packed into one int, SIGNATURE_BINS lanes of 32 bits, bin 0 lowest.
+    """
+    # Reverse order, so the smallest hash of each bin is written last and wins
+    firsts = {h >> _BIN_SHIFT: h for h in sorted(hashes, reverse=True)}
+    values = [firsts.get(b) for b in range(SIGNATURE_BINS)]
+    if len(firsts) < SIGNATURE_BINS:
+        # Densify: an empty bin takes the next non-empty bin's value (wrapping
+        # around), mixed with the distance so it cannot equal a genuine minimum
+        following = min(firsts) + SIGNATURE_BINS
+        for b in range(SIGNATURE_BINS - 1, -1, -1):
+            if values[b] is not None:
+                following = b
+            else:
+                source = values[following % SIGNATURE_BINS]
+                values[b] = (source + (following - b) * _DENSIFY_STEP) & _LANE_MASK
+    return int.from_bytes(array('I', values).tobytes(), 'little')
+
+
+def similarity(a: int, b: int) -> float:
+    """Share of equal signature bins: an estimate of the shingle Jaccard index."""
+    # OR each lane's bits down into its lowest bit; shifts total 31, so no
+    # bit crosses into the lane below
+    x = a ^ b
+    for shift in (16, 8, 4, 2, 1):
+        x |= x >> shift
+    return (SIGNATURE_BINS - popcount(x & _LANE_LOW_BITS)) / SIGNATURE_BINS
+
+
+class NearDuplicateIndex:
+    """Collects case signatures, then suggests merges for near-duplicates."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.ids: List[str] = []
+        self.source_ids: List[Optional[str]] = []
+        self.merged_from: List[Set[str]] = []
+        self.lengths: List[int] = []
+        self.signatures: List[Optional[int]] = []
+
+    def add(self, case: dict):
+        """Index one (cleaned) case; only its ids and signature are kept."""
+        context = case.get('context') or ''
+        hashes = shingles(context)
+        merged = case.get('merged_from') or ()
+        self.ids.append(case.get('id', 'unknown'))
+        self.source_ids.append(case.get('source_id'))
+        self.merged_from.append({merged} if isinstance(merged, str) else set(merged))
+        self.lengths.append(len(context))
+        self.signatures.append(signature(hashes) if len(hashes) >= MIN_SHINGLES else None)
+
+    def candidate_pairs(self) -> Iterator[Tuple[int, int]]:
+        """Pairs of case positions (a < b) sharing an LSH band, each yielded once.
+
+        Bands are bucketed one at a time, so only one band's buckets are in
+        memory; seen pairs are kept as single ints. Buckets larger than
+        MAX_BUCKET_SIZE only pair their first member with the rest.
+        """
+        size = len(self.signatures)
+        seen = set()
+        for band in range(BANDS):
+            shift = band * ROWS * _LANE
+            buckets: Dict[int, List[int]] = {}
+            for i, sig in enumerate(self.signatures):
+                if sig is not None:
+                    buckets.setdefault((sig >> shift) & _BAND_MASK, []).append(i)
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                if len(members) <= MAX_BUCKET_SIZE:
+                    pairs = [(a, b) for n, a in enumerate(members) for b in members[n + 1:]]
+                else:
+                    count('lsh.oversized_buckets')
+                    pairs = [(members[0], b) for b in members[1:]]
+                for a, b in pairs:
+                    key = a * size + b
+                    if key not in seen:
+                        seen.add(key)
+                        yield a, b
+
+    def similar_pairs(self) -> Dict[Tuple[int, int], float]:
+        """Candidate pairs whose estimated similarity reaches the threshold."""
+        sigs = self.signatures
+        result = {}
+        for a, b in self.candidate_pairs():
+            score = similarity(sigs[a], sigs[b])
+            if score >= self.threshold:
+                result[(a, b)] = score
+        return result
+
+    def same_source_pairs(self) -> List[Tuple[int, int]]:
+        """Pairs of cases with the same source_id (the same message, indexed twice)."""
+        first: Dict[str, int] = {}
+        pairs = []
+        for i, source_id in enumerate(self.source_ids):
+            if source_id:
+                if source_id in first:
+                    pairs.append((first[source_id], i))
+                else:
+                    first[source_id] = i
+        return pairs
+
+    def _linked(self, a: int, b: int) -> bool:
+        """Already merged by hand: one case's merged_from names the other's source."""
+        return self.source_ids[b] in self.merged_from[a] or self.source_ids[a] in self.merged_from[b]
+
+    def _rank(self, i: int) -> tuple:
+        return self.source_ids[i] is None, -self.lengths[i], i
+
+    def suggestions(self) -> List[dict]:
+        """Merge suggestions, one per case to merge away, strongest pairs first."""
+        sigs = self.signatures
+        edges = [(1.0, 0, a, b) for a, b in self.same_source_pairs()]
+        edges += [(score, 1, a, b) for (a, b), score in self.similar_pairs().items()]
+        edges.sort(key=lambda e: (-e[0], e[1], e[2], e[3]))
+
+        merged_into: Dict[int, int] = {}
+        keepers: Set[int] = set()
+        result = []
+        for score, kind, a, b in edges:
+            if a in merged_into or b in merged_into or self._linked(a, b):
+                continue
+            if a in keepers and b in keepers:
+                continue
+            if a in keepers or b in keepers:
+                keep, other = (a, b) if a in keepers else (b, a)
+            else:
+                keep, other = sorted((a, b), key=self._rank)
+            merged_into[other] = keep
+            keepers.add(keep)
+
+            same_source = kind == 0
+            if same_source:
+                score = similarity(sigs[a], sigs[b]) if sigs[a] is not None and sigs[b] is not None else None
+            result.append({
+                'keep': self.ids[keep],
+                'merge': self.ids[other],
+                'similarity': None if score is None else round(score, 3),
+                'reason': 'same source_id' if same_source else 'similar context',
+                'keep_source_id': self.source_ids[keep],
+                'merge_source_id': self.source_ids[other],
+                # Value for the kept case's merged_from, as done by hand today
+                'merged_from': None if same_source else self.source_ids[other],
+            })
+        return result
+
+
+def find_near_duplicates(cases: Iterable[dict], threshold: float = DEFAULT_THRESHOLD) -> List[dict]:
+    """Merge suggestions for a corpus (see NearDuplicateIndex.suggestions)."""
+    index = NearDuplicateIndex(threshold)
+    for case in cases:
+        index.add(case)
+    return index.suggestions()
+
+
+def write_report(path, suggestions: List[dict], threshold: float):
+    with atomic_open(path) as f:
+        json.dump({'threshold': threshold, 'suggestions': suggestions}, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def print_suggestions(suggestions: List[dict]):
+    for s in suggestions:
+        score = f"{s['similarity']:.2f}" if s['similarity'] is not None else '-'
+        print(f"  {s['merge']} -> {s['keep']}  ({s['reason']}, similarity {score})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggest merges for near-duplicate cases.")
+    parser.add_argument('cases', nargs='?', type=Path, default=DEFAULT_CASES)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Minimum estimated context similarity (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('-o', '--output', type=Path, help="Write the suggestions as JSON")
+    add_arguments(parser)
+    args = parser.parse_args()
+    with instrumented('near_duplicates', args, globals(), ('shingles', 'signature', 'similarity')):
+        run(args)
+
+
+def run(args):
+    index = NearDuplicateIndex(args.threshold)
+    with stage('index'):
+        for case in iter_cases(args.cases):
+            index.add(case)
+    count('cases.read', len(index.ids))
+    with stage('suggest'):
+        suggestions = index.suggestions()
+    count('suggestions', len(suggestions))
+    if args.output:
+        write_report(args.output, suggestions, args.threshold)
+    print_suggestions(suggestions)
+    print(f"{len(suggestions)} merge suggestions")
+
+
+if __name__ == '__main__':
+    main()
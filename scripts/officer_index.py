@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Per-officer statistics for the RFE dataset, as a static JSON index.
+
+build_index() makes one pass over the RFE records (data/rfe_cases.json)
+and counts, for every officer number, per service center and over all
+centers: records, outcomes (RFE/NOID/Denial) and claimed/counted
+criteria. Success stories in data/cases.json that name an officer
+(officer_id) are attached as links. Percentiles are precomputed: for
+each criterion and overall, officers with at least MIN_CLAIMS claims are
+ranked by acceptance rate (counted / claimed).
+
+OfficerIndex wraps the written index (rfe-data/officers.json, built by
+build_officer_index.py): a lookup is a dict access and a rate is one
+division, whatever the size of the dataset.
+
+Index layout (compact JSON):
+  criteria      criterion names; "c" and "m" arrays follow this order
+  outcomes      ["RFE", "NOID", "Denial"]; "o" arrays follow this order
+  centers       {code: name}, e.g. {"TSC": "Texas"}
+  min_claims    claims an officer needs to be ranked
+  quantiles     percent points of "distribution", e.g. [10, 25, 50, 75, 90]
+  distribution  {"overall" | criterion: rates at those quantiles}
+  officers      {officer: {"all" | center code: {"n": records, "o": [...],
+                "c": [claimed...], "m": [counted...]},
+                "percentile": {"overall" | criterion: 0-100},
+                "stories": [[title, href], ...]}}
+
+Usage (look up one officer, or list the busiest ones):
+  python3 scripts/officer_index.py [0592] [--center TSC] [--criterion judging] [--index rfe-data/officers.json]
+"""
+
+import argparse
+import json
+import math
+import sys
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from rfe_stats import OUTCOMES
+
+INDEX_VERSION = 1
+DEFAULT_INDEX = Path(__file__).parent.parent / 'rfe-data' / 'officers.json'
+
+MIN_CLAIMS = 3
+QUANTILES = (10, 25, 50, 75, 90)
+OVERALL = 'overall'
+ALL_CENTERS = 'all'
+
+CENTER_CODES = {'Nebraska': 'NSC', 'Texas': 'TSC'}
+
+# data/cases.json criteria keys -> RFE dataset criteria
+CRITERIA_ALIASES = {
+    'awards': 'Award', 'membership': 'Association', 'press': 'Media', 'judging': 'Judgement',
+    'contributions': 'Original', 'authorship': 'Scholarly', 'exhibitions': 'Exhibitions',
+    'critical_role': 'Critical', 'salary': 'Salary',
+}
+
+
+def normalize_officer(value) -> str:
+    """Officer numbers as printed: "592" and "0592" are the same officer."""
+    officer = str(value).strip().upper()
+    return officer.zfill(4) if officer.isdigit() else officer
+
+
+def _empty_entry(criteria: int) -> dict:
+    return {'n': 0, 'o': [0] * len(OUTCOMES), 'c': [0] * criteria, 'm': [0] * criteria}
+
+
+def rate(claimed: int, met: int) -> Optional[float]:
+    return 100 * met / claimed if claimed else None
+
+
+def percentile_ranks(rates: Dict[str, float]) -> Dict[str, int]:
+    """{officer: share of ranked officers with a lower rate, ties counted half}."""
+    ordered = sorted(rates.values())
+    ranks = {}
+    for officer, value in rates.items():
+        below = bisect_left(ordered, value)
+        equal = bisect_right(ordered, value) - below
+        ranks[officer] = round(100 * (below + equal / 2) / len(ordered))
+    return ranks
+
+
+def quantiles(values: List[float]) -> List[int]:
+    """Nearest-rank values at QUANTILES, rounded to whole percents."""
+    ordered = sorted(values)
+    return [round(ordered[max(math.ceil(q * len(ordered) / 100) - 1, 0)]) for q in QUANTILES]
+
+
+def build_index(records: Iterable[dict], criteria: List[str],
+                stories: Iterable[Tuple[str, str, str]] = ()) -> dict:
+    """Index of the RFE records; stories are (officer_id, title, href) from data/cases.json."""
+    position = {name: i for i, name in enumerate(criteria)}
+    outcome_position = {name: i for i, name in enumerate(OUTCOMES)}
+    officers: Dict[str, dict] = {}
+    for record in records:
+        if not record.get('officer'):
+            continue
+        officer = officers.setdefault(normalize_officer(record['officer']), {})
+        center = CENTER_CODES[record['center']]
+        for key in (ALL_CENTERS, center):
+            entry = officer.setdefault(key, _empty_entry(len(criteria)))
+            entry['n'] += 1
+            entry['o'][outcome_position[record['type']]] += 1
+            for name, counted in (record.get('criteria') or {}).items():
+                entry['c'][position[name]] += 1
+                entry['m'][position[name]] += counted
+    for officer_id, title, href in stories:
+        officer = officers.setdefault(normalize_officer(officer_id), {ALL_CENTERS: _empty_entry(len(criteria))})
+        officer.setdefault('stories', []).append([title, href])
+
+    distribution = {}
+    for key in (OVERALL, *criteria):
+        rates = {}
+        for officer_id, officer in officers.items():
+            entry = officer[ALL_CENTERS]
+            claimed, met = ((sum(entry['c']), sum(entry['m'])) if key == OVERALL
+                            else (entry['c'][position[key]], entry['m'][position[key]]))
+            if claimed >= MIN_CLAIMS:
+                rates[officer_id] = rate(claimed, met)
+        if not rates:
+            continue
+        distribution[key] = quantiles(list(rates.values()))
+        for officer_id, rank in percentile_ranks(rates).items():
+            officers[officer_id].setdefault('percentile', {})[key] = rank
+
+    return {
+        'version': INDEX_VERSION,
+        'criteria': list(criteria),
+        'outcomes': list(OUTCOMES),
+        'centers': {code: name for name, code in CENTER_CODES.items()},
+        'min_claims': MIN_CLAIMS,
+        'quantiles': list(QUANTILES),
+        'distribution': distribution,
+        'officers': dict(sorted(officers.items())),
+    }
+
+
+class OfficerStats(NamedTuple):
+    officer: str
+    center: str                     # center code, or "all"
+    records: int
+    outcomes: Dict[str, int]
+    claimed: int
+    met: int
+    rate: Optional[float]           # counted / claimed, in percent
+    percentile: Optional[int]       # over all centers; None when not ranked
+
+
+class OfficerIndex:
+    """Constant-time lookups in a built officer index."""
+
+    def __init__(self, index: dict):
+        self.index = index
+        self.criteria = index['criteria']
+        self._criterion = {name.lower(): i for i, name in enumerate(self.criteria)}
+        self._criterion.update({alias: self.criteria.index(name) for alias, name in CRITERIA_ALIASES.items()
+                                if name in self.criteria})
+        self._center = {ALL_CENTERS: ALL_CENTERS}
+        for code, name in index['centers'].items():
+            self._center[code.lower()] = self._center[name.lower()] = code
+
+    @classmethod
+    def from_file(cls, path: Path = DEFAULT_INDEX) -> 'OfficerIndex':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def criterion(self, name: str) -> str:
+        """Criterion name for a name or alias in any case ("judging" -> "Judgement")."""
+        try:
+            return self.criteria[self._criterion[name.lower()]]
+        except KeyError:
+            raise KeyError(f"unknown criterion {name!r}") from None
+
+    def center(self, name: str) -> str:
+        """Center code for a code or name in any case ("Texas" -> "TSC")."""
+        try:
+            return self._center[name.lower()]
+        except KeyError:
+            raise KeyError(f"unknown center {name!r}") from None
+
+    def lookup(self, officer: str, center: str = ALL_CENTERS, criterion: Optional[str] = None) -> Optional[OfficerStats]:
+        """Stats of one officer, optionally at one center and for one criterion; None if not in the index."""
+        officer = normalize_officer(officer)
+        center = self.center(center)
+        entry = self.index['officers'].get(officer, {}).get(center)
+        if entry is None:
+            return None
+        if criterion is None:
+            key, claimed, met = OVERALL, sum(entry['c']), sum(entry['m'])
+        else:
+            key = self.criterion(criterion)
+            i = self.criteria.index(key)
+            claimed, met = entry['c'][i], entry['m'][i]
+        return OfficerStats(officer, center, entry['n'], dict(zip(self.index['outcomes'], entry['o'])),
+                            claimed, met, rate(claimed, met),
+                            self.index['officers'][officer].get('percentile', {}).get(key))
+
+    def stories(self, officer: str) -> List[Tuple[str, str]]:
+        return [tuple(story) for story in self.index['officers'].get(normalize_officer(officer), {}).get('stories', [])]
+
+    def busiest(self, limit: int, center: str = ALL_CENTERS) -> List[str]:
+        """Officers with the most records at a center."""
+        center = self.center(center)
+        officers = {o: entries[center]['n'] for o, entries in self.index['officers'].items() if center in entries}
+        return sorted(officers, key=lambda o: (-officers[o], o))[:limit]
+
+
+def format_stats(stats: OfficerStats, what: str) -> str:
+    outcomes = ', '.join(f'{name} {n}' for name, n in stats.outcomes.items() if n)
+    share = '-' if stats.rate is None else f'{round(stats.rate)}%'
+    ranked = '' if stats.percentile is None else f', percentile {stats.percentile}'
+    return (f"{stats.officer} @ {stats.center}: {stats.records} records ({outcomes or 'none'}); "
+            f"{what}: {stats.met}/{stats.claimed} counted = {share}{ranked}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up officer statistics in the officer index.")
+    parser.add_argument('officer', nargs='?', help="Officer number; without it, list the busiest officers")
+    parser.add_argument('--center', default=ALL_CENTERS, help="NSC, TSC, Nebraska or Texas (default: all)")
+    parser.add_argument('--criterion', help="Criterion name or alias, e.g. Judgement or judging")
+    parser.add_argument('--top', type=int, default=20, help="Officers to list without an officer number")
+    parser.add_argument('--index', type=Path, default=DEFAULT_INDEX)
+    args = parser.parse_args()
+
+    index = OfficerIndex.from_file(args.index)
+    try:
+        index.center(args.center)
+        what = index.criterion(args.criterion) if args.criterion else 'all criteria'
+    except KeyError as e:
+        parser.error(e.args[0])
+    if not args.officer:
+        for officer in index.busiest(args.top, args.center):
+            print(format_stats(index.lookup(officer, args.center, args.criterion), what))
+        return 0
+    stats = index.lookup(args.officer, args.center, args.criterion)
+    if stats is None:
+        print(f"No records for officer {normalize_officer(args.officer)} at {index.center(args.center)}")
+        return 1
+    print(format_stats(stats, what))
+    for title, href in index.stories(args.officer):
+        print(f"  story: {title} ({href})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Local route table and link extraction for the offline link audit.
+
+Routes come from the file tree (every .mdx/.md page, plus static files such
+as images) and from docs.json (navigation pages and redirect sources).
+Links come from markdown `[text](url)` and `href=` attributes on <Card>,
+<a> and other JSX tags. Fenced code blocks are ignored.
+
+Files under snippets/ are not pages: Mintlify renders a snippet inside
+each page that imports it, so snippet_includers() maps every snippet to
+those pages and its links are resolved against them.
+"""
+
+import bisect
+import json
+import posixpath
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Set, Tuple
+
+PAGE_EXTENSIONS = ('.mdx', '.md')
+SNIPPETS_DIR = 'snippets'
+SKIP_DIRS = {'.git', '.cache', 'node_modules', '__pycache__'}
+
+NEWLINE_RE = re.compile(r'\n')
+CODE_FENCE_RE = re.compile(r'^(```|~~~).*?^\1[^\n]*$', re.MULTILINE | re.DOTALL)
+LINK_RE = re.compile(
+    r'\]\(\s*<?(?P<md>[^)\s>]+)>?(?:\s+"[^"]*")?\s*\)'
+    r'|\bhref=(?:\{\s*)?(?:"(?P<dq>[^"]*)"|\'(?P<sq>[^\']*)\')'
+)
+IMPORT_RE = re.compile(r'^import\s+[\w{}\s,]+?\s+from\s+[\'"](?P<path>[^\'"]+\.mdx?)[\'"]', re.MULTILINE)
+
+
+class LocalLink(NamedTuple):
+    source: str   # route of the page the link is on, e.g. "rfe-data/all"
+    line: int
+    href: str
+
+
+def iter_files(root: Path) -> Iterator[Path]:
+    """Yield every file under root, skipping VCS and cache directories."""
+    for path in root.iterdir():
+        if path.name in SKIP_DIRS:
+            continue
+        if path.is_dir():
+            yield from iter_files(path)
+        else:
+            yield path
+
+
+def page_route(rel_path: str) -> str:
+    """'guides/index.mdx' -> 'guides/index'."""
+    return posixpath.splitext(rel_path)[0]
+
+
+def nav_pages(docs: dict) -> List[str]:
+    """Collect page paths from docs.json navigation (groups, tabs, nested groups)."""
+    nav = []
+
+    def walk(node):
+        if isinstance(node, str):
+            nav.append(node)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+        elif isinstance(node, dict):
+            if 'page' in node:
+                nav.append(node['page'])
+            for key in ('tabs', 'groups', 'pages'):
+                if key in node:
+                    walk(node[key])
+
+    walk(docs.get('navigation', {}))
+    return list(dict.fromkeys(nav))
+
+
+def load_docs_routes(docs_path: Path) -> Tuple[List[str], List[str]]:
+    """Return (navigation pages, redirect sources) from docs.json."""
+    with open(docs_path, 'r', encoding='utf-8') as f:
+        docs = json.load(f)
+    redirects = [r['source'].strip('/') for r in docs.get('redirects', []) if r.get('source')]
+    return nav_pages(docs), redirects
+
+
+def build_routes(root: Path, docs_path: Path = None) -> Tuple[Set[str], Dict[str, Path], List[str]]:
+    """Build the set of resolvable routes for the local tree.
+
+    Returns (routes, pages, nav_pages) where pages maps each .mdx route to
+    its file and nav_pages lists the docs.json navigation entries.
+    """
+    routes: Set[str] = set()
+    pages: Dict[str, Path] = {}
+
+    for path in iter_files(root):
+        rel = path.relative_to(root).as_posix()
+        if path.suffix in PAGE_EXTENSIONS:
+            route = page_route(rel)
+            routes.add(route)
+            if route == 'index':
+                routes.add('')
+            elif route.endswith('/index'):
+                routes.add(route[:-len('/index')])
+            if path.suffix == '.mdx':
+                pages[route] = path
+        else:
+            routes.add(rel)  # static asset, served under its own name
+
+    nav_pages: List[str] = []
+    if docs_path is not None and docs_path.exists():
+        nav_pages, redirects = load_docs_routes(docs_path)
+        routes.update(redirects)
+
+    return routes, pages, nav_pages
+
+
+def extract_links(route: str, text: str) -> List[LocalLink]:
+    """Extract markdown and href links from one MDX page."""
+    # Blank out fenced code blocks but keep newlines so line numbers hold
+    text = CODE_FENCE_RE.sub(lambda m: '\n' * m.group(0).count('\n'), text)
+
+    newlines = [m.start() for m in NEWLINE_RE.finditer(text)]
+    links = []
+    for m in LINK_RE.finditer(text):
+        href = m.group('md') or m.group('dq') or m.group('sq')
+        if not href:
+            continue
+        line = bisect.bisect_left(newlines, m.start()) + 1
+        links.append(LocalLink(route, line, href))
+    return links
+
+
+def resolve_href(href: str, source_route: str) -> str:
+    """Resolve an in-repo href to a route, as the browser would on prod.
+
+    Pages are served at /docs/<route>, so relative hrefs resolve
+    against the page's directory and root-relative hrefs against the docs
+    root (Mintlify adds the base path). Returns None for external links
+    and pure anchors.
+    """
+    if href.startswith(('http://', 'https://', 'mailto:', 'tel:', 'javascript:', '#', '{')):
+        return None
+
+    href = href.split('#', 1)[0].split('?', 1)[0]
+    if not href:
+        return None
+
+    if href.startswith('/'):
+        target = posixpath.normpath(href)
+    else:
+        target = posixpath.normpath(posixpath.join(posixpath.dirname('/' + source_route), href))
+
+    return target.strip('/') if target != '/' else ''
+
+
+def is_snippet(route: str) -> bool:
+    return route.startswith(SNIPPETS_DIR + '/')
+
+
+def snippet_includers(texts: Dict[str, str]) -> Dict[str, List[str]]:
+    """Snippet route -> routes of the pages that import it, directly or through other snippets.
+
+    texts maps each .mdx route to its source. Snippets nobody imports are
+    absent.
+    """
+    imports: Dict[str, Set[str]] = {}
+    for route, text in texts.items():
+        for m in IMPORT_RE.finditer(text):
+            target = resolve_href(m.group('path'), route)
+            if target and is_snippet(target):
+                imports.setdefault(page_route(target), set()).add(route)
+
+    def pages_of(snippet: str, seen: Set[str]) -> Set[str]:
+        found = set()
+        for route in imports.get(snippet, ()):
+            if not is_snippet(route):
+                found.add(route)
+            elif route not in seen:
+                seen.add(route)
+                found |= pages_of(route, seen)
+        return found
+
+    return {snippet: sorted(pages_of(snippet, {snippet})) for snippet in imports}
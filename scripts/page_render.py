@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Declarative page specs and renderer for success-stories pages.
+
+A PageSpec describes one MDX page: which cases belong on it (CaseIndex
+query conditions, or every case), its frontmatter, an optional
+note/intro/footer, and how the members are split into accordion sections.
+
+assign_members() resolves every page and section with bitset operations on
+a CaseIndex built once per run, so no page re-scans the cases. A
+case_columns.CaseColumns works the same way, with boolean masks instead
+of bitsets.
+render_page() collects the page in a list and joins it once.
+
+Pages with more than page_size cases are sharded by render_outputs(): the
+page's own path becomes an index with per-part counts, and the accordions
+move to <page>/page-N.mdx parts with prev/next links.
+register_shards() lists the parts under the page in docs.json navigation.
+
+build_pages() is the build loop both generators share: it skips pages
+whose BuildManifest entry is current, renders and writes the rest, prunes
+stale parts, updates navigation and syncs --lazy detail fragments.
+"""
+
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+from build_cache import BuildManifest, FragmentCache, fingerprint, write_if_changed
+from case_details import DETAILS_DIR, fragment_name, sync_fragments
+from case_index import CaseIndex
+from case_store import atomic_open
+from instrumentation import count, stage
+
+DEFAULT_PAGE_SIZE = 100  # cases per page before it is split into parts
+
+
+class Section(NamedTuple):
+    key: Hashable                   # {key} in the heading, {groups[<key>]} in the intro
+    heading: str                    # text after '## '; format fields: {key}, {count}
+    where: Optional[dict] = None    # CaseIndex.query() conditions; None = every page member
+
+
+class PageSpec(NamedTuple):
+    path: str                                       # relative to the output directory
+    frontmatter: Dict[str, str]                     # values may use {count}
+    sections: Tuple[Section, ...] = ()              # always rendered, even when empty
+    where: Optional[dict] = None                    # CaseIndex.query() conditions; None = every case
+    note: Optional[str] = None                      # may use {count}
+    intro: Optional[str] = None                     # format fields: {count}, {groups[<key>]}
+    group_by: Optional[str] = None                  # facet whose values become extra sections
+    group_heading: Optional[str] = None             # heading for those sections
+    group_order: Tuple[Hashable, ...] = ()          # these values first, the rest as first seen
+    footer: Optional[str] = None
+
+
+class PageMembers(NamedTuple):
+    bits: int                                       # CaseIndex bitset (CaseColumns mask) of the page
+    members: List[int]                              # case positions, in input order
+    sections: List[Tuple[Hashable, str, List[int]]]  # (key, heading, case positions)
+
+
+def _page_sections(spec: PageSpec, index: CaseIndex, bits: int) -> List[Tuple[Hashable, str, List[int]]]:
+    sections = []
+    for section in spec.sections:
+        section_bits = bits & index.query(**section.where) if section.where else bits
+        members = index.positions(section_bits)
+        sections.append((section.key, section.heading.format(key=section.key, count=len(members)), members))
+
+    if spec.group_by and spec.group_heading:
+        listed = {section.key for section in spec.sections}
+        values = index.values(spec.group_by)
+        ordered = [value for value in spec.group_order if value in values]
+        ordered += [value for value in values if value not in spec.group_order]
+        for value in ordered:
+            group_bits = bits & index.select(spec.group_by, value)
+            if value in listed or not index.count(group_bits):
+                continue
+            members = index.positions(group_bits)
+            sections.append((value, spec.group_heading.format(key=value, count=len(members)), members))
+
+    return sections
+
+
+def assign_members(index: CaseIndex, specs: Sequence[PageSpec]) -> List[PageMembers]:
+    """Resolve the members and sections of every page from the index."""
+    pages = []
+    for spec in specs:
+        bits = index.query(**spec.where) if spec.where else index.all
+        pages.append(PageMembers(bits, index.positions(bits), _page_sections(spec, index, bits)))
+    return pages
+
+
+def _frontmatter(fields: Dict[str, str], count: int) -> List[str]:
+    lines = ['---']
+    lines.extend(f'{key}: "{value.format(count=count)}"' for key, value in fields.items())
+    lines.append('---')
+    lines.append('')
+    return lines
+
+
+def _accordion_groups(lines: List[str], sections, cases: Sequence[dict], accordion: Callable[[dict], str]):
+    for _, heading, members in sections:
+        lines.extend((f'## {heading}', '', '<AccordionGroup>'))
+        lines.extend(accordion(cases[i]) for i in members)
+        lines.extend(('</AccordionGroup>', ''))
+
+
+def render_page(spec: PageSpec, page: PageMembers, cases: Sequence[dict],
+                accordion: Callable[[dict], str]) -> str:
+    """Render one page as MDX."""
+    count = len(page.members)
+    lines = _frontmatter(spec.frontmatter, count)
+
+    if spec.note:
+        lines.extend(('<Note>', spec.note.format(count=count), '</Note>', ''))
+    if spec.intro:
+        groups = Counter({key: len(members) for key, _, members in page.sections})
+        lines.extend((spec.intro.format(count=count, groups=groups), ''))
+
+    _accordion_groups(lines, page.sections, cases, accordion)
+
+    if spec.footer:
+        lines.extend((spec.footer, ''))
+
+    return '\n'.join(lines)
+
+
+def shard_count(page: PageMembers, page_size: Optional[int]) -> int:
+    """Number of parts a page is split into (0 = rendered as one page)."""
+    total = sum(len(members) for _, _, members in page.sections)
+    if not page_size or total <= page_size:
+        return 0
+    return -(-total // page_size)
+
+
+def shard_path(path: str, number: int) -> str:
+    """'cases-preview.mdx', 2 -> 'cases-preview/page-2.mdx'."""
+    return f'{path[:-len(".mdx")]}/page-{number}.mdx'
+
+
+def output_paths(spec: PageSpec, page: PageMembers, page_size: Optional[int]) -> List[str]:
+    """Every file a page renders to: the page itself, then its parts."""
+    parts = shard_count(page, page_size)
+    return [spec.path] + [shard_path(spec.path, n) for n in range(1, parts + 1)]
+
+
+def output_members(page: PageMembers, page_size: Optional[int]) -> List[List[int]]:
+    """Case positions shown on each output_paths() file (none on a parts index)."""
+    if not shard_count(page, page_size):
+        return [page.members]
+    shards = split_sections(page.sections, page_size)
+    return [[]] + [[i for _, _, members in shard for i in members] for shard in shards]
+
+
+def split_sections(sections, page_size: int) -> List[list]:
+    """Cut sections into runs of at most page_size cases, keeping headings."""
+    shards = [[]]
+    room = page_size
+    for key, heading, members in sections:
+        start = 0
+        while start < len(members):
+            if room == 0:
+                shards.append([])
+                room = page_size
+            chunk = members[start:start + room]
+            shards[-1].append((key, heading if start == 0 else f'{heading} (продолжение)', chunk))
+            start += len(chunk)
+            room -= len(chunk)
+    return shards
+
+
+def _route(base_route: str, path: str) -> str:
+    return f'/{base_route}/{path[:-len(".mdx")]}'
+
+
+def render_outputs(spec: PageSpec, page: PageMembers, cases: Sequence[dict],
+                   accordion: Callable[[dict], str], page_size: Optional[int],
+                   base_route: str) -> List[Tuple[str, str]]:
+    """(path, MDX) for every output of a page, in output_paths() order.
+
+    base_route is the URL prefix of the output directory, e.g.
+    'success-stories', used for the links between the index and its parts.
+    """
+    if not shard_count(page, page_size):
+        return [(spec.path, render_page(spec, page, cases, accordion))]
+
+    count = len(page.members)
+    shards = split_sections(page.sections, page_size)
+    total = len(shards)
+    title = spec.frontmatter.get('title', '').format(count=count)
+    index_route = _route(base_route, spec.path)
+
+    ranges = []
+    first = 1
+    for shard in shards:
+        size = sum(len(members) for _, _, members in shard)
+        ranges.append((first, first + size - 1))
+        first += size
+
+    # Index page: the original path, with counts per part instead of accordions
+    lines = _frontmatter(spec.frontmatter, count)
+    if spec.note:
+        lines.extend(('<Note>', spec.note.format(count=count), '</Note>', ''))
+    if spec.intro:
+        groups = Counter({key: len(members) for key, _, members in page.sections})
+        lines.extend((spec.intro.format(count=count, groups=groups), ''))
+    lines.extend((f'## Все кейсы по частям ({total})', '', '<CardGroup cols={2}>'))
+    for number, (shard, (start, end)) in enumerate(zip(shards, ranges), 1):
+        groups = Counter()
+        for key, _, members in shard:
+            groups[key] += len(members)
+        breakdown = ', '.join(f'{key} ({n})' for key, n in groups.items() if key is not None)
+        lines.append(f'  <Card title="Часть {number}: кейсы {start}–{end}" icon="file-lines" '
+                     f'href="{_route(base_route, shard_path(spec.path, number))}">')
+        lines.append(f'    {breakdown or f"{end - start + 1} кейсов"}')
+        lines.append('  </Card>')
+    lines.extend(('</CardGroup>', ''))
+    if spec.footer:
+        lines.extend((spec.footer, ''))
+    outputs = [(spec.path, '\n'.join(lines))]
+
+    # Parts
+    for number, (shard, (start, end)) in enumerate(zip(shards, ranges), 1):
+        frontmatter = dict(spec.frontmatter)
+        frontmatter['title'] = f'{title} — часть {number} из {total}'
+        frontmatter['sidebarTitle'] = f'Часть {number}'
+        lines = _frontmatter(frontmatter, count)
+        lines.extend(('<Note>', f'Часть {number} из {total}: кейсы {start}–{end} из {count}. '
+                                f'[Все части]({index_route})', '</Note>', ''))
+        _accordion_groups(lines, shard, cases, accordion)
+
+        lines.append('<CardGroup cols={2}>')
+        if number > 1:
+            prev_start, prev_end = ranges[number - 2]
+            lines.append(f'  <Card title="← Часть {number - 1}" icon="arrow-left" '
+                         f'href="{_route(base_route, shard_path(spec.path, number - 1))}">')
+            lines.append(f'    Кейсы {prev_start}–{prev_end}')
+            lines.append('  </Card>')
+        if number < total:
+            next_start, next_end = ranges[number]
+            lines.append(f'  <Card title="Часть {number + 1} →" icon="arrow-right" '
+                         f'href="{_route(base_route, shard_path(spec.path, number + 1))}">')
+            lines.append(f'    Кейсы {next_start}–{next_end}')
+            lines.append('  </Card>')
+        lines.extend(('</CardGroup>', ''))
+        outputs.append((shard_path(spec.path, number), '\n'.join(lines)))
+
+    return outputs
+
+
+def remove_stale_shards(out_dir: Path, spec: PageSpec, keep: Sequence[str]) -> List[Path]:
+    """Delete part files left over from a build that had more parts."""
+    removed = []
+    parts_dir = Path(out_dir) / spec.path[:-len('.mdx')]
+    keep = {Path(out_dir) / path for path in keep}
+    for path in sorted(parts_dir.glob('page-*.mdx')):
+        if path not in keep:
+            path.unlink()
+            removed.append(path)
+    if removed and parts_dir.is_dir() and not any(parts_dir.iterdir()):
+        parts_dir.rmdir()
+    return removed
+
+
+def nav_title(spec: PageSpec, page: PageMembers) -> str:
+    """Sidebar label for the page's navigation group."""
+    label = spec.frontmatter.get('sidebarTitle') or spec.frontmatter.get('title', spec.path)
+    return label.format(count=len(page.members))
+
+
+def _generated_group(item, route: str) -> bool:
+    """Whether item is a group register_shards() made: [route, route/page-1, ...]."""
+    if not (isinstance(item, dict) and 'group' in item and item.get('pages')):
+        return False
+    head, *rest = item['pages']
+    if head != route and not (isinstance(head, dict) and head.get('page') == route):
+        return False
+    return bool(rest) and all(isinstance(page, str) and re.fullmatch(re.escape(route) + r'/page-\d+', page)
+               for page in rest)
+
+
+def register_shards(docs_path: Path, route: str, shard_routes: List[str], title: str) -> Optional[bool]:
+    """Point the docs.json nav entry for route at the page and its parts.
+
+    With parts, the page entry (a page string or a {"page": ...} object,
+    whose title is kept) becomes a group [entry, *shard_routes] titled
+    title; a group made by an earlier run gets the current parts and
+    title. Without parts, such a group goes back to its page entry and
+    anything else is left alone. Groups written by hand are never
+    rewritten, only the route inside them. Returns None when route is not
+    in the navigation, else whether docs.json changed.
+    """
+    with open(docs_path, 'r', encoding='utf-8') as f:
+        docs = json.load(f)
+
+    found = False
+
+    def walk(node):
+        nonlocal found
+        if isinstance(node, dict):
+            for key in ('tabs', 'groups', 'pages'):
+                if key in node:
+                    walk(node[key])
+        elif isinstance(node, list):
+            for i, item in enumerate(node):
+                if _generated_group(item, route):
+                    head = item['pages'][0]
+                    node[i] = dict(item, group=title, pages=[head] + shard_routes) if shard_routes else head
+                    found = True
+                elif item == route or (isinstance(item, dict) and item.get('page') == route):
+                    if shard_routes:
+                        node[i] = {'group': title, 'pages': [item] + shard_routes}
+                    found = True
+                else:
+                    walk(item)
+
+    before = json.dumps(docs, ensure_ascii=False, indent=2) + '\n'
+    walk(docs.get('navigation', {}))
+    if not found:
+        return None
+    after = json.dumps(docs, ensure_ascii=False, indent=2) + '\n'
+    if after == before:
+        return False
+    with atomic_open(docs_path) as f:
+        f.write(after)
+    return True
+
+
+def build_pages(specs: Sequence[PageSpec], cases: Sequence[dict], index: CaseIndex, *,
+                out_dir: Path, docs_path: Path, manifest: BuildManifest, renderer: str,
+                accordion: Callable[[dict], str], details: Optional[Callable[[dict], str]] = None,
+                details_dir: str = DETAILS_DIR, caches: Optional[Dict[FragmentCache, Path]] = None,
+                page_size: Optional[int] = DEFAULT_PAGE_SIZE, force: bool = False,
+                base_route: str = 'success-stories') -> List[PageMembers]:
+    """Build every page of specs into out_dir and return their members.
+
+    renderer is the generator's version fingerprint. details renders a
+    case's lazy fragment (--lazy; None for a plain build) into details_dir,
+    which only this generator may use: fragments there that this build
+    did not write are deleted. caches are the
+    accordion FragmentCaches to load before and save after the build.
+    """
+    out_dir = Path(out_dir)
+    caches = caches or {}
+    with stage('cache-load'):
+        for cache, path in caches.items():
+            cache.load(path)
+    with stage('fingerprint'):
+        case_fps = [fingerprint(case) for case in cases]
+
+    # Every case's fragment, so unreferenced ones can be removed even when
+    # pages are skipped as up to date
+    fragments = {}
+    if details:
+        with stage('details'):
+            for case in cases:
+                content = details(case)
+                if content:
+                    fragments[fragment_name(content)] = content
+
+    with stage('index'):
+        pages = assign_members(index, specs)
+
+    for spec, page in zip(specs, pages):
+        outputs = output_paths(spec, page, page_size)
+        inputs = fingerprint([renderer, spec.path, page_size, details is not None,
+                              [case_fps[i] for i in page.members]])
+
+        if not force and all(manifest.is_current(p, inputs, out_dir / p) for p in outputs):
+            print(f"  = {spec.path} (up to date)")
+            count('pages.up_to_date')
+        else:
+            with stage('render'):
+                rendered = render_outputs(spec, page, cases, accordion, page_size, base_route)
+            with stage('write'):
+                shown = output_members(page, page_size)
+                for (filename, content), members in zip(rendered, shown):
+                    if write_if_changed(out_dir / filename, content):
+                        print(f"  - {filename}")
+                    else:
+                        print(f"  = {filename} (unchanged)")
+                    manifest.record(filename, inputs, content, [cases[i].get('id') for i in members])
+            count('pages.rendered', len(rendered))
+
+        with stage('nav'):
+            for path in remove_stale_shards(out_dir, spec, outputs):
+                manifest.forget(path.relative_to(out_dir).as_posix())
+                print(f"  x {path.relative_to(out_dir)} (removed)")
+            routes = [f"{base_route}/{p[:-len('.mdx')]}" for p in outputs]
+            registered = register_shards(docs_path, routes[0], routes[1:], nav_title(spec, page))
+        if registered is None and routes[1:]:
+            print(f"  ! {routes[0]} is not in docs.json navigation; parts are linked from its index page")
+
+    with stage('write'):
+        written, removed = sync_fragments(out_dir, fragments, details_dir)
+    if details or removed:
+        print(f"  Case details: {len(fragments)} fragments, {len(written)} written, {len(removed)} removed")
+
+    with stage('cache-save'):
+        manifest.save()
+        for cache, path in caches.items():
+            cache.save(path)
+    return pages
@@ -9,11 +9,45 @@ Pages generated:
 - self-prepared.mdx (prep="self")
 - by-center/nebraska.mdx (service_center="NSC")
 - by-center/vermont.mdx (service_center="VSC")
+
+Builds are incremental: a page is re-rendered only when its member cases
+or this script change (see build_cache.py), and a file is rewritten only
+when its bytes differ. Pass --force to rebuild every page.
+
+Pages with more than --page-size cases (default 100) are split into
+<page>/page-N.mdx parts behind an index page, and the parts are added to
+the page's docs.json navigation entry (see page_render.py).
+
+With --lazy, accordions keep only the title, summary and tags; the detail
+sections go to success-stories/case-details/<hash>.json and are fetched by
+scripts/case-details.js when an accordion is opened (see case_details.py).
+
+--timings-report and --profile are described in instrumentation.py.
 """
 
-import json
+import argparse
 from pathlib import Path
-from collections import defaultdict
+
+from build_cache import BuildManifest, FragmentCache, file_fingerprint
+from case_details import fragment_json, fragment_name, placeholder
+from case_index import CaseIndex
+from case_store import load_cases
+from instrumentation import add_arguments, count, instrumented, stage
+from page_render import DEFAULT_PAGE_SIZE, PageSpec, Section, build_pages
+
+# Renderer version: any change to this script or the page renderer
+# invalidates cached pages and accordion fragments.
+RENDERER_VERSION = file_fingerprint([Path(__file__), Path(__file__).parent / 'page_render.py',
+                                     Path(__file__).parent / 'case_index.py',
+                                     Path(__file__).parent / 'case_details.py'])
+MANIFEST_PATH = Path(__file__).parent.parent / '.cache' / 'success_stories_manifest.json'
+ACCORDIONS = FragmentCache(RENDERER_VERSION)
+LAZY_ACCORDIONS = FragmentCache(RENDERER_VERSION + ':lazy')
+DETAILS = FragmentCache(RENDERER_VERSION + ':details')
+
+# Call counts and times in --timings-report
+HOT_FUNCTIONS = ('generate_accordion', 'generate_lazy_accordion', 'generate_details', 'generate_tags',
+                 'build_pages')
 
 CRITERIA_RU = {
     "awards": "Награды",
@@ -82,11 +116,10 @@ def generate_tags(case):
     return tags
 
 
-def generate_accordion(case):
+def accordion_head(case):
+    """Opening tag, summary and tags: the part of an accordion always kept in the MDX."""
     title = case.get("title", "Кейс")
     summary = case.get("summary", "")
-    context = case.get("context")
-    criteria = case.get("claimed_criteria") or case.get("criteria", [])
     icon = get_icon(case)
 
     lines = []
@@ -101,26 +134,32 @@ def generate_accordion(case):
         lines.append(f"      {tag_codes}")
         lines.append(f"    </div>")
         lines.append('')
+    return lines
+
+
+def accordion_sections(case):
+    """Detail sections of an accordion as (heading, lines) pairs."""
+    context = case.get("context")
+    criteria = case.get("claimed_criteria") or case.get("criteria", [])
+    sections = []
 
     if context and len(context) > 10 and not context.startswith('#'):
-        lines.append('    ### Контекст')
         if len(context) > 300:
             context = context[:297] + "..."
-        lines.append(f'    {context}')
-        lines.append('')
+        sections.append(('Контекст', [context]))
 
     criteria_str = format_criteria(criteria)
     has_package_info = criteria_str or case.get("attorney") or case.get("rec_letters")
 
     if has_package_info:
-        lines.append('    ### Что заявляли / использовали в пакете')
+        package = []
         if criteria_str:
-            lines.append(f'    В истории упоминаются: {criteria_str}')
+            package.append(f'В истории упоминаются: {criteria_str}')
         if case.get("attorney"):
-            lines.append(f'    - Адвокат: {case["attorney"]}')
+            package.append(f'- Адвокат: {case["attorney"]}')
         if case.get("rec_letters"):
-            lines.append(f'    - Рекомендательных писем: {case["rec_letters"]}')
-        lines.append('')
+            package.append(f'- Рекомендательных писем: {case["rec_letters"]}')
+        sections.append(('Что заявляли / использовали в пакете', package))
 
     details = []
     if case.get("timeline_days"):
@@ -137,230 +176,189 @@ def generate_accordion(case):
         details.append(f"- Расходы: ${case['cost_usd']:,}")
 
     if details:
-        lines.append('    ### Хронология')
-        lines.extend(f'    {d}' for d in details)
-        lines.append('')
-
-    lines.append('  </Accordion>')
-    return '\n'.join(lines)
-
-
-def generate_premium_mdx(cases):
-    premium_cases = [c for c in cases if c.get("premium") is True]
-
-    lines = []
-    lines.append('---')
-    lines.append('title: "Кейсы с Premium Processing"')
-    lines.append('sidebarTitle: "Premium"')
-    lines.append('description: "Подборка историй с ускоренным рассмотрением. Таймлайны, когда стоит платить."')
-    lines.append('icon: "bolt"')
-    lines.append('---')
-    lines.append('')
-    lines.append('<Note>')
-    lines.append(f'**Premium Processing** - ускоренное рассмотрение за $2,805 (I-140). USCIS дает ответ в течение 15 рабочих дней.')
-    lines.append('</Note>')
-    lines.append('')
-    lines.append(f'## Кейсы с Premium ({len(premium_cases)} из 25)')
-    lines.append('')
-    lines.append('<AccordionGroup>')
-    for case in premium_cases:
-        lines.append(generate_accordion(case))
-    lines.append('</AccordionGroup>')
-    lines.append('')
-
-    return '\n'.join(lines)
-
-
-def generate_rfe_mdx(cases):
-    rfe_cases = [c for c in cases if c.get("rfe") is True]
-
-    lines = []
-    lines.append('---')
-    lines.append('title: "Кейсы с RFE (Request for Evidence)"')
-    lines.append('sidebarTitle: "С RFE"')
-    lines.append('description: "Истории успеха, где USCIS запросил дополнительные доказательства."')
-    lines.append('icon: "file-circle-question"')
-    lines.append('---')
-    lines.append('')
-    lines.append('<Note>')
-    lines.append('**RFE** - запрос дополнительных доказательств. Не отказ, а возможность усилить кейс.')
-    lines.append('</Note>')
-    lines.append('')
-    lines.append(f'## Кейсы с RFE ({len(rfe_cases)} из 25)')
-    lines.append('')
-    lines.append('<AccordionGroup>')
-    for case in rfe_cases:
-        lines.append(generate_accordion(case))
-    lines.append('</AccordionGroup>')
-    lines.append('')
-
-    return '\n'.join(lines)
-
-
-def generate_self_mdx(cases):
-    self_cases = [c for c in cases if c.get("prep") == "self"]
-
-    lines = []
-    lines.append('---')
-    lines.append('title: "Самоподача без адвоката"')
-    lines.append('sidebarTitle: "Самоподача"')
-    lines.append('description: "Кейсы самостоятельной подготовки петиции. Экономия, риски, что нужно знать."')
-    lines.append('icon: "user"')
-    lines.append('---')
-    lines.append('')
-    lines.append('<Note>')
-    lines.append('**Самоподача** - подготовка петиции без адвоката. Экономия $5,000-15,000.')
-    lines.append('</Note>')
-    lines.append('')
-    lines.append(f'## Кейсы самоподачи ({len(self_cases)})')
-    lines.append('')
-    lines.append('<AccordionGroup>')
-    for case in self_cases:
-        lines.append(generate_accordion(case))
-    lines.append('</AccordionGroup>')
-    lines.append('')
-
-    return '\n'.join(lines)
+        sections.append(('Хронология', details))
+    return sections
 
 
-def generate_nebraska_mdx(cases):
-    nsc_cases = [c for c in cases if c.get("service_center") == "NSC"]
-
-    lines = []
-    lines.append('---')
-    lines.append('title: "Кейсы Nebraska Service Center (NSC)"')
-    lines.append('sidebarTitle: "Nebraska (NSC)"')
-    lines.append('description: "Подборка историй с рассмотрением в Nebraska Service Center."')
-    lines.append('icon: "building-columns"')
-    lines.append('---')
-    lines.append('')
-    lines.append('<Note>')
-    lines.append('**Nebraska Service Center (NSC)** обрабатывает петиции EB-1A, EB-2 NIW и O-1.')
-    lines.append('</Note>')
-    lines.append('')
-    lines.append(f'## Подтвержденные кейсы NSC ({len(nsc_cases)})')
-    lines.append('')
-    lines.append('<AccordionGroup>')
-    for case in nsc_cases:
-        lines.append(generate_accordion(case))
-    lines.append('</AccordionGroup>')
-    lines.append('')
-
-    return '\n'.join(lines)
-
-
-def generate_vermont_mdx(cases):
-    vsc_cases = [c for c in cases if c.get("service_center") == "VSC"]
-
-    lines = []
-    lines.append('---')
-    lines.append('title: "Кейсы Vermont Service Center (VSC)"')
-    lines.append('sidebarTitle: "Vermont (VSC)"')
-    lines.append('description: "Истории успеха с рассмотрением в Vermont Service Center."')
-    lines.append('icon: "building-columns"')
-    lines.append('---')
-    lines.append('')
-    lines.append('<Note>')
-    lines.append('**Vermont Service Center (VSC)** обрабатывает петиции O-1.')
-    lines.append('</Note>')
-    lines.append('')
-    lines.append(f'## Подтвержденные кейсы VSC ({len(vsc_cases)})')
-    lines.append('')
-    lines.append('<AccordionGroup>')
-    for case in vsc_cases:
-        lines.append(generate_accordion(case))
-    lines.append('</AccordionGroup>')
-    lines.append('')
-
+def generate_accordion(case):
+    lines = accordion_head(case)
+    for heading, body in accordion_sections(case):
+        lines.append(f'    ### {heading}')
+        lines.extend(f'    {line}' for line in body)
+        lines.append('')
+    lines.append('  </Accordion>')
     return '\n'.join(lines)
 
 
-def group_cases_by_visa(cases):
-    groups = defaultdict(list)
-    visa_order = ["EB-1A", "EB-2 NIW", "O-1"]
-
-    for case in cases:
-        visa = case.get("visa", "Other")
-        groups[visa].append(case)
+def generate_details(case):
+    """JSON fragment with the detail sections, for --lazy (empty string: none)."""
+    sections = accordion_sections(case)
+    return fragment_json(sections) if sections else ''
 
-    result = []
-    for visa in visa_order:
-        if visa in groups:
-            result.append((visa, groups.pop(visa)))
-    for visa, cases_list in groups.items():
-        result.append((visa, cases_list))
 
-    return result
-
-
-def generate_preview_mdx(cases):
-    lines = []
-    lines.append('---')
-    lines.append('title: "Витрина кейсов"')
-    lines.append('sidebarTitle: "Витрина (25 кейсов)"')
-    lines.append('description: "Все 25 реальных кейсов из сообщества с контекстом и деталями."')
-    lines.append('icon: "grid-2"')
-    lines.append('---')
-    lines.append('')
-    lines.append('<Note>')
-    lines.append('**25 кейсов** из Telegram-сообщества. Данные из оригинальных сообщений.')
-    lines.append('</Note>')
-    lines.append('')
-
-    grouped = group_cases_by_visa(cases)
-    for visa, visa_cases in grouped:
-        lines.append(f'## {visa} ({len(visa_cases)} кейсов)')
-        lines.append('')
-        lines.append('<AccordionGroup>')
-        for case in visa_cases:
-            lines.append(generate_accordion(case))
-        lines.append('</AccordionGroup>')
+def generate_lazy_accordion(case):
+    """Accordion with its detail sections replaced by a case-details.js placeholder."""
+    lines = accordion_head(case)
+    details = render_details(case)
+    if details:
+        lines.append(placeholder('/success-stories', fragment_name(details)))
         lines.append('')
+    lines.append('  </Accordion>')
+    return '\n'.join(lines)
 
-    lines.append('---')
-    lines.append('')
-    lines.append('<CardGroup cols={2}>')
-    lines.append('  <Card title="Premium Processing" icon="bolt" href="/success-stories/premium">')
-    lines.append('    Кейсы с ускоренным рассмотрением.')
-    lines.append('  </Card>')
-    lines.append('  <Card title="С RFE" icon="file-circle-question" href="/success-stories/with-rfe">')
-    lines.append('    Кейсы с запросом доказательств.')
-    lines.append('  </Card>')
-    lines.append('</CardGroup>')
-    lines.append('')
 
-    return '\n'.join(lines)
+def render_accordion(case):
+    """generate_accordion() memoised per case, so a case shown on several pages renders once."""
+    return ACCORDIONS.get_or_render(case, generate_accordion)
+
+
+def render_details(case):
+    return DETAILS.get_or_render(case, generate_details)
+
+
+def render_lazy_accordion(case):
+    return LAZY_ACCORDIONS.get_or_render(case, generate_lazy_accordion)
+
+
+PREVIEW_FOOTER = """---
+
+<CardGroup cols={2}>
+  <Card title="Premium Processing" icon="bolt" href="/success-stories/premium">
+    Кейсы с ускоренным рассмотрением.
+  </Card>
+  <Card title="С RFE" icon="file-circle-question" href="/success-stories/with-rfe">
+    Кейсы с запросом доказательств.
+  </Card>
+</CardGroup>"""
+
+PAGES = [
+    PageSpec(
+        'cases-preview.mdx',
+        {
+            'title': "Витрина кейсов",
+            'sidebarTitle': "Витрина (25 кейсов)",
+            'description': "Все 25 реальных кейсов из сообщества с контекстом и деталями.",
+            'icon': "grid-2",
+        },
+        note='**25 кейсов** из Telegram-сообщества. Данные из оригинальных сообщений.',
+        group_by='visa',
+        group_heading='{key} ({count} кейсов)',
+        group_order=("EB-1A", "EB-2 NIW", "O-1"),
+        footer=PREVIEW_FOOTER,
+    ),
+    PageSpec(
+        'premium.mdx',
+        {
+            'title': "Кейсы с Premium Processing",
+            'sidebarTitle': "Premium",
+            'description': "Подборка историй с ускоренным рассмотрением. Таймлайны, когда стоит платить.",
+            'icon': "bolt",
+        },
+        sections=(Section(None, 'Кейсы с Premium ({count} из 25)'),),
+        where={'premium': True},
+        note='**Premium Processing** - ускоренное рассмотрение за $2,805 (I-140). '
+             'USCIS дает ответ в течение 15 рабочих дней.',
+    ),
+    PageSpec(
+        'with-rfe.mdx',
+        {
+            'title': "Кейсы с RFE (Request for Evidence)",
+            'sidebarTitle': "С RFE",
+            'description': "Истории успеха, где USCIS запросил дополнительные доказательства.",
+            'icon': "file-circle-question",
+        },
+        sections=(Section(None, 'Кейсы с RFE ({count} из 25)'),),
+        where={'rfe': True},
+        note='**RFE** - запрос дополнительных доказательств. Не отказ, а возможность усилить кейс.',
+    ),
+    PageSpec(
+        'self-prepared.mdx',
+        {
+            'title': "Самоподача без адвоката",
+            'sidebarTitle': "Самоподача",
+            'description': "Кейсы самостоятельной подготовки петиции. Экономия, риски, что нужно знать.",
+            'icon': "user",
+        },
+        sections=(Section(None, 'Кейсы самоподачи ({count})'),),
+        where={'prep': "self"},
+        note='**Самоподача** - подготовка петиции без адвоката. Экономия $5,000-15,000.',
+    ),
+    PageSpec(
+        'by-center/nebraska.mdx',
+        {
+            'title': "Кейсы Nebraska Service Center (NSC)",
+            'sidebarTitle': "Nebraska (NSC)",
+            'description': "Подборка историй с рассмотрением в Nebraska Service Center.",
+            'icon': "building-columns",
+        },
+        sections=(Section(None, 'Подтвержденные кейсы NSC ({count})'),),
+        where={'service_center': "NSC"},
+        note='**Nebraska Service Center (NSC)** обрабатывает петиции EB-1A, EB-2 NIW и O-1.',
+    ),
+    PageSpec(
+        'by-center/vermont.mdx',
+        {
+            'title': "Кейсы Vermont Service Center (VSC)",
+            'sidebarTitle': "Vermont (VSC)",
+            'description': "Истории успеха с рассмотрением в Vermont Service Center.",
+            'icon': "building-columns",
+        },
+        sections=(Section(None, 'Подтвержденные кейсы VSC ({count})'),),
+        where={'service_center': "VSC"},
+        note='**Vermont Service Center (VSC)** обрабатывает петиции O-1.',
+    ),
+]
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Regenerate success-stories MDX pages.")
+    parser.add_argument('--force', action='store_true', help="Re-render every page")
+    parser.add_argument('--no-fragment-cache', action='store_true',
+                        help="Do not load or save rendered accordions on disk")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"Split pages with more cases into parts (default: {DEFAULT_PAGE_SIZE}, 0 = never)")
+    parser.add_argument('--lazy', action='store_true',
+                        help="Move accordion details to success-stories/case-details/*.json, loaded on expand")
+    add_arguments(parser)
+    args = parser.parse_args()
+    with instrumented('regenerate_all_success_stories', args, globals(), HOT_FUNCTIONS):
+        run(args)
+
+
+def run(args):
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
 
     cases_path = project_root / 'data' / 'cases.json'
     ss_dir = project_root / 'success-stories'
+    docs_path = project_root / 'docs.json'
+    cache_dir = project_root / '.cache'
+    if args.lazy:
+        caches = {LAZY_ACCORDIONS: cache_dir / 'success_stories_lazy_fragments.json',
+                  DETAILS: cache_dir / 'success_stories_details.json'}
+    else:
+        caches = {ACCORDIONS: cache_dir / 'success_stories_fragments.json'}
 
     print("Loading cases...")
-    with open(cases_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    cases = data.get('cases', [])
+    with stage('load'):
+        cases = load_cases(cases_path)
     print(f"Found {len(cases)} cases")
-
-    pages = [
-        ('cases-preview.mdx', generate_preview_mdx(cases)),
-        ('premium.mdx', generate_premium_mdx(cases)),
-        ('with-rfe.mdx', generate_rfe_mdx(cases)),
-        ('self-prepared.mdx', generate_self_mdx(cases)),
-        ('by-center/nebraska.mdx', generate_nebraska_mdx(cases)),
-        ('by-center/vermont.mdx', generate_vermont_mdx(cases)),
-    ]
-
-    for filename, content in pages:
-        path = ss_dir / filename
-        print(f"Writing {path}...")
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(content)
-
+    count('cases.read', len(cases))
+
+    build_pages(
+        PAGES, cases, CaseIndex(cases),
+        out_dir=ss_dir, docs_path=docs_path,
+        manifest=BuildManifest(MANIFEST_PATH),
+        renderer=RENDERER_VERSION,
+        accordion=render_lazy_accordion if args.lazy else render_accordion,
+        details=render_details if args.lazy else None,
+        caches={} if args.no_fragment_cache else caches,
+        page_size=args.page_size, force=args.force,
+    )
+    cache = LAZY_ACCORDIONS if args.lazy else ACCORDIONS
+    print(f"Accordions: {cache.misses} rendered, {cache.hits} reused")
+    count('accordions.rendered', cache.misses)
+    count('accordions.reused', cache.hits)
     print("Done!")
 
 
@@ -12,12 +12,18 @@ Rules:
 - Do NOT say "засчитали критерии" - use "В истории упоминаются..."
 - If service_center_uncertain=true, show as "по словам автора"
 - If field is missing - hide the section
+
+Usage:
+  python3 scripts/regenerate_cases_preview.py [--timings-report [PATH]] [--profile [PATH]]
 """
 
-import json
+import argparse
 from pathlib import Path
 from collections import defaultdict
 
+from case_store import atomic_open, load_cases
+from instrumentation import add_arguments, count, instrumented, stage
+
 CRITERIA_RU = {
     "awards": "Награды",
     "membership": "Членство",
@@ -224,6 +230,14 @@ def generate_mdx(cases):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Regenerate success-stories/cases-preview.mdx.")
+    add_arguments(parser)
+    args = parser.parse_args()
+    with instrumented('regenerate_cases_preview', args, globals(), ('generate_mdx', 'generate_accordion')):
+        run()
+
+
+def run():
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
 
@@ -231,18 +245,19 @@ def main():
     output_path = project_root / 'success-stories' / 'cases-preview.mdx'
 
     print("Loading cases...")
-    with open(cases_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    cases = data.get('cases', [])
+    with stage('load'):
+        cases = load_cases(cases_path)
     print(f"Found {len(cases)} cases")
+    count('cases.read', len(cases))
 
     print("Generating MDX...")
-    mdx = generate_mdx(cases)
+    with stage('render'):
+        mdx = generate_mdx(cases)
 
     print(f"Writing {output_path}...")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(mdx)
+    with stage('write'):
+        with atomic_open(output_path) as f:
+            f.write(mdx)
 
     print("Done!")
 
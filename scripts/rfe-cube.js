@@ -0,0 +1,225 @@
+// RFE criteria stats by profile - mounts into <div id="rfe-cube" data-view="profile"></div>
+// (criteria for one direction/field, center and document type) or
+// data-view="heatmap" (criteria × directions for one center and document type).
+// Loads the cube built by scripts/generate_rfe_stats.py on first use and
+// slices it in the browser: a filter change adds up at most
+// centers × visas × outcomes cells per criterion, however many records the
+// cube was built from. Colors and thresholds must match generate_rfe_stats.py.
+(function() {
+  const script = document.currentScript;
+  const siteBase = script && script.src ? script.src.replace(/\/scripts\/rfe-cube\.js(\?.*)?$/, '') : '';
+  const CUBE_URL = siteBase + '/success-stories/rfe-cube.json';
+  const ALL = -1;
+
+  let cubePromise = null;
+
+  function loadCube() {
+    if (!cubePromise) {
+      cubePromise = fetch(CUBE_URL)
+        .then(function(response) {
+          if (!response.ok) throw new Error('HTTP ' + response.status);
+          return response.json();
+        })
+        .then(prepareCube)
+        .catch(function(error) {
+          cubePromise = null;
+          throw error;
+        });
+    }
+    return cubePromise;
+  }
+
+  function prepareCube(raw) {
+    // Key -> position along each dimension
+    const position = {};
+    for (const dim in raw.dims) {
+      position[dim] = {};
+      raw.dims[dim].forEach(function(key, i) { position[dim][key] = i; });
+    }
+    const menus = raw.menus.map(function(menu) {
+      return [menu[0], menu[1].filter(function(key) { return key in position.group; })
+        .map(function(key) { return position.group[key]; })];
+    });
+    return Object.assign({}, raw, { position: position, menus: menus });
+  }
+
+  function range(n) {
+    return Array.from({ length: n }, function(_, i) { return i; });
+  }
+
+  // Counts of one group summed over the chosen center, visa and outcome (ALL = every value)
+  function slice(cube, group, center, visa, outcome) {
+    const [, C, V, O, K] = cube.shape;
+    const centers = center === ALL ? range(C) : [center];
+    const visas = visa === ALL ? range(V) : [visa];
+    const outcomes = outcome === ALL ? range(O) : [outcome];
+    const result = { cases: 0, claimed: new Array(K).fill(0), met: new Array(K).fill(0) };
+    for (const c of centers) {
+      for (const v of visas) {
+        for (const o of outcomes) {
+          const cell = ((group * C + c) * V + v) * O + o;
+          result.cases += cube.cases[cell];
+          for (let k = 0; k < K; k++) {
+            result.claimed[k] += cube.claimed[cell * K + k];
+            result.met[k] += cube.met[cell * K + k];
+          }
+        }
+      }
+    }
+    return result;
+  }
+
+  function rate(claimed, met) {
+    return claimed ? 100 * met / claimed : null;
+  }
+
+  // Same thresholds as color() in generate_rfe_stats.py
+  function color(value) {
+    if (value === null) return '⚪';
+    const rounded = Math.round(value);
+    return rounded > 40 ? '🟢' : rounded >= 20 ? '🟡' : rounded >= 10 ? '🟠' : '🔴';
+  }
+
+  function verdict(value) {
+    const rounded = Math.round(value);
+    return rounded > 40 ? '✅ Подавать' : rounded >= 20 ? '⚠️ Если сильное' : '❌ Не подавать';
+  }
+
+  function casesWord(n) {
+    const tens = n % 100;
+    const ones = n % 10;
+    if (ones === 1 && tens !== 11) return 'кейс';
+    if (ones >= 2 && ones <= 4 && (tens < 12 || tens > 14)) return 'кейса';
+    return 'кейсов';
+  }
+
+  function escapeHtml(text) {
+    return String(text).replace(/[&<>"']/g, function(ch) {
+      return { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[ch];
+    });
+  }
+
+  const CELL = 'padding: 6px 10px; border-bottom: 1px solid rgba(127,127,127,0.2); text-align: left;';
+
+  function chips(title, dim, options, selected) {
+    const buttons = options.map(function(option) {
+      const active = option[0] === selected;
+      return `<button type="button" data-dim="${dim}" data-value="${option[0]}"
+        style="padding: 4px 10px; border-radius: 999px; border: 1px solid rgba(127,127,127,0.4); background: ${active ? 'rgba(127,127,127,0.25)' : 'transparent'}; color: inherit; font-size: 13px; font-weight: ${active ? 600 : 400}; cursor: pointer;">${escapeHtml(option[1])}</button>`;
+    });
+    return `
+      <div style="display: flex; flex-wrap: wrap; align-items: center; gap: 6px; margin: 6px 0;">
+        <span style="font-size: 13px; opacity: 0.7; min-width: 96px;">${escapeHtml(title)}:</span>${buttons.join('')}
+      </div>`;
+  }
+
+  function dimensionChips(cube, state, dim, title) {
+    const options = [[ALL, 'Все']].concat(cube.dims[dim].map(function(key, i) {
+      return [i, cube.labels[dim] ? cube.labels[dim][i] : key];
+    }));
+    return options.length > 2 ? chips(title, dim, options, state[dim]) : '';
+  }
+
+  function filterChips(cube, state) {
+    return dimensionChips(cube, state, 'center', 'Центр') +
+      dimensionChips(cube, state, 'visa', 'Виза') +
+      dimensionChips(cube, state, 'outcome', 'Документ');
+  }
+
+  function table(head, rows) {
+    return `
+      <div style="overflow-x: auto; margin-top: 12px;">
+        <table style="width: 100%; border-collapse: collapse; font-size: 14px;">
+          <thead><tr>${head.map(function(cell) { return `<th style="${CELL}">${cell}</th>`; }).join('')}</tr></thead>
+          <tbody>${rows.map(function(row) { return `<tr>${row.join('')}</tr>`; }).join('')}</tbody>
+        </table>
+      </div>`;
+  }
+
+  function renderProfile(cube, state) {
+    const found = slice(cube, state.group, state.center, state.visa, state.outcome);
+    const perCenter = cube.dims.center.map(function(name, c) {
+      return `${escapeHtml(name)}: ${slice(cube, state.group, c, state.visa, state.outcome).cases}`;
+    });
+    const rows = found.claimed.map(function(claimed, k) {
+      return { k: k, claimed: claimed, met: found.met[k], rate: rate(claimed, found.met[k]) };
+    });
+    rows.sort(function(a, b) {
+      const rankedA = a.claimed >= cube.min_claims;
+      const rankedB = b.claimed >= cube.min_claims;
+      if (rankedA !== rankedB) return rankedA ? -1 : 1;
+      return (b.rate || 0) - (a.rate || 0) || b.claimed - a.claimed;
+    });
+    const body = rows.filter(function(row) { return row.claimed; }).map(function(row) {
+      const ranked = row.claimed >= cube.min_claims;
+      return [
+        `<td style="${CELL}"><b>${escapeHtml(cube.labels.criterion[row.k])}</b></td>`,
+        `<td style="${CELL}">${color(row.rate)} ${Math.round(row.rate)}%</td>`,
+        `<td style="${CELL}">${row.met} из ${row.claimed}</td>`,
+        `<td style="${CELL}">${ranked ? verdict(row.rate) : '— мало данных'}</td>`
+      ];
+    });
+    const menus = cube.menus.map(function(menu) {
+      return chips(menu[0], 'group', menu[1].map(function(g) { return [g, cube.labels.group[g]]; }), state.group);
+    });
+    return menus.join('') + filterChips(cube, state) + `
+      <div style="margin-top: 12px;"><b>${found.cases} ${casesWord(found.cases)}</b> | ${perCenter.join(' | ')}</div>` +
+      (body.length
+        ? table(['Критерий', 'Успех', 'Засчитано', 'Рекомендация'], body)
+        : '<div style="opacity: 0.7; padding: 8px 0;">Нет кейсов с такими фильтрами</div>');
+  }
+
+  function renderHeatmap(cube, state) {
+    const groups = cube.menus[state.menu][1];
+    const slices = groups.map(function(g) { return slice(cube, g, state.center, state.visa, state.outcome); });
+    const overall = slice(cube, cube.position.group.all, state.center, state.visa, state.outcome);
+    const order = range(cube.shape[4]).sort(function(a, b) {
+      return (rate(overall.claimed[b], overall.met[b]) || 0) - (rate(overall.claimed[a], overall.met[a]) || 0);
+    });
+    const head = ['Критерий'].concat(groups.map(function(g, i) {
+      return `${escapeHtml(cube.labels.group[g])} <span style="opacity: 0.6; font-weight: 400;">(${slices[i].cases})</span>`;
+    }));
+    const body = order.map(function(k) {
+      return [`<td style="${CELL}"><b>${escapeHtml(cube.labels.criterion[k])}</b></td>`].concat(slices.map(function(found) {
+        const claimed = found.claimed[k];
+        const title = `${found.met[k]} из ${claimed}`;
+        const value = claimed >= cube.min_claims ? `${color(rate(claimed, found.met[k]))} ${Math.round(rate(claimed, found.met[k]))}%` : '—';
+        return `<td style="${CELL} white-space: nowrap;" title="${title}">${value}</td>`;
+      }));
+    });
+    const menus = chips('Колонки', 'menu', cube.menus.map(function(menu, i) { return [i, menu[0]]; }), state.menu);
+    return menus + filterChips(cube, state) + table(head, body);
+  }
+
+  function mount(root) {
+    root.setAttribute('data-ready', '1');
+    const view = root.getAttribute('data-view') === 'heatmap' ? renderHeatmap : renderProfile;
+    root.innerHTML = '<div style="opacity: 0.7; padding: 8px 0;">Загрузка статистики...</div>';
+    loadCube().then(function(cube) {
+      const state = { group: cube.position.group.all, center: ALL, visa: ALL, outcome: ALL, menu: 0 };
+      function render() { root.innerHTML = view(cube, state); }
+      root.addEventListener('click', function(event) {
+        const button = event.target.closest('button[data-dim]');
+        if (!button) return;
+        state[button.getAttribute('data-dim')] = Number(button.getAttribute('data-value'));
+        render();
+      });
+      render();
+    }).catch(function() {
+      root.innerHTML = '<div style="opacity: 0.7; padding: 8px 0;">Статистика временно недоступна</div>';
+    });
+  }
+
+  function init() {
+    const root = document.getElementById('rfe-cube');
+    if (root && !root.getAttribute('data-ready')) mount(root);
+  }
+
+  init();
+
+  // Pages change without a reload; mount again when the container appears
+  setInterval(init, 500);
+
+  // Exposed for checking slices against scripts/rfe_stats.py
+  window.rfeCube = { loadCube: loadCube, prepareCube: prepareCube, slice: slice };
+})();
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Criteria acceptance statistics over the RFE dataset (data/rfe_cases.json).
+
+CriteriaStats is built in one pass over the records and holds, for every
+service center × group × outcome (RFE/NOID/Denial) cell:
+
+  cases      records in the cell
+  submitted  per criterion: records that claimed it
+  met        per criterion: records where the officer counted it
+
+Groups are named sets of rfe-data field slugs: a record is in every group
+that shares a field with it, and the "all" group holds every record, so
+one table answers both per-field and per-direction questions. Centers and
+outcomes partition the records, so queries sum over them freely; groups
+overlap and are never summed.
+
+Records are first encoded as small ints (center, outcome, field bits,
+claimed and counted criteria bits). With numpy installed the counts are
+then bincounts over (record, group) pairs; without it, array('l')
+counters are filled from the set bits. Both give the same tables.
+
+build_cube() flattens these tables, one per visa, into the columnar
+group × center × visa × outcome (× criterion) cube that the interactive
+stats pages slice in the browser (see generate_rfe_stats.py).
+
+Usage (print acceptance rates):
+  python3 scripts/rfe_stats.py [data/rfe_cases.json] [--field business] [--center Texas] [--outcome RFE]
+"""
+
+import argparse
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from case_index import iter_positions, popcount
+from case_store import open_cases
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CENTERS = ('Nebraska', 'Texas')
+OUTCOMES = ('RFE', 'NOID', 'Denial')
+ALL = 'all'
+DEFAULT_VISA = 'EB-1A'  # the RFE dataset is EB-1A only; records carry no visa field yet
+
+DEFAULT_DATA = Path(__file__).parent.parent / 'data' / 'rfe_cases.json'
+
+
+class CriterionStats(NamedTuple):
+    criterion: str
+    cases: int          # records in the slice
+    submitted: int      # ... that claimed the criterion
+    met: int            # ... where it was counted
+
+    @property
+    def not_met(self) -> int:
+        return self.submitted - self.met
+
+    @property
+    def not_submitted(self) -> int:
+        return self.cases - self.submitted
+
+    @property
+    def rate(self) -> Optional[float]:
+        """Share of claims that were counted, in percent; None when nobody claimed it."""
+        return 100 * self.met / self.submitted if self.submitted else None
+
+    @property
+    def submit_rate(self) -> Optional[float]:
+        """Share of records claiming the criterion, in percent."""
+        return 100 * self.submitted / self.cases if self.cases else None
+
+
+class ClaimSummary(NamedTuple):
+    """Criteria claimed and counted per record, over records that list any."""
+    records: int
+    mean_submitted: Optional[float]
+    mean_met: Optional[float]
+    min_submitted: Optional[int]
+    max_submitted: Optional[int]
+
+
+def _encode(records: Iterable[dict], criteria: Sequence[str], fields: Dict[str, int]):
+    """Per-record ints: center, outcome, field bits, claimed bits, counted bits; claim sizes."""
+    criterion_bit = {name: 1 << i for i, name in enumerate(criteria)}
+    center_index = {name: i for i, name in enumerate(CENTERS)}
+    outcome_index = {name: i for i, name in enumerate(OUTCOMES)}
+    centers, outcomes = array('b'), array('b')
+    field_bits, claimed_bits, met_bits = [], [], []
+    claim_sizes = []
+    for record in records:
+        try:
+            centers.append(center_index[record['center']])
+            outcomes.append(outcome_index[record['type']])
+        except KeyError as e:
+            raise ValueError(f"{record.get('id')}: unknown center or type {e}") from None
+        bits = 0
+        for slug in record.get('fields') or ():
+            bits |= fields.setdefault(slug, 1 << len(fields))
+        field_bits.append(bits)
+        claimed = met = 0
+        for name, counted in (record.get('criteria') or {}).items():
+            if name not in criterion_bit:
+                raise ValueError(f"{record.get('id')}: unknown criterion {name!r}")
+            claimed |= criterion_bit[name]
+            if counted:
+                met |= criterion_bit[name]
+        claimed_bits.append(claimed)
+        met_bits.append(met)
+        if claimed:
+            claim_sizes.append((popcount(claimed), popcount(met)))
+    return centers, outcomes, field_bits, claimed_bits, met_bits, claim_sizes
+
+
+class CriteriaStats:
+    """Submitted/met counts per center × group × outcome × criterion."""
+
+    def __init__(self, records: Iterable[dict], criteria: Sequence[str],
+                 groups: Optional[Dict[str, Iterable[str]]] = None, use_numpy: Optional[bool] = None):
+        """groups maps a name to field slugs; every slug seen in the records is also a group."""
+        self.criteria = list(criteria)
+        fields: Dict[str, int] = {}
+        for slugs in (groups or {}).values():
+            for slug in slugs:
+                fields.setdefault(slug, 1 << len(fields))
+        centers, outcomes, field_bits, claimed, met, sizes = _encode(records, self.criteria, fields)
+
+        group_masks = {ALL: -1}  # every bit: matches records without fields too, see _count_*
+        for slug, bit in fields.items():
+            group_masks.setdefault(slug, bit)
+        for name, slugs in (groups or {}).items():
+            mask = 0
+            for slug in slugs:
+                mask |= fields[slug]
+            group_masks[name] = mask
+        self.groups = list(group_masks)
+        self._group_index = {name: i for i, name in enumerate(self.groups)}
+        self.records = len(centers)
+
+        use_numpy = np is not None if use_numpy is None else use_numpy
+        count = self._count_numpy if use_numpy else self._count_python
+        self.cases, self.submitted, self.met = count(centers, outcomes, field_bits, claimed, met,
+                                                     list(group_masks.values()))
+        self.claims = ClaimSummary(
+            len(sizes),
+            sum(s for s, _ in sizes) / len(sizes) if sizes else None,
+            sum(m for _, m in sizes) / len(sizes) if sizes else None,
+            min((s for s, _ in sizes), default=None),
+            max((s for s, _ in sizes), default=None),
+        )
+
+    def _cell(self, center: int, group: int, outcome: int) -> int:
+        return (center * len(self.groups) + group) * len(OUTCOMES) + outcome
+
+    def _count_python(self, centers, outcomes, field_bits, claimed, met, masks):
+        n_criteria = len(self.criteria)
+        size = len(CENTERS) * len(masks) * len(OUTCOMES)
+        cases = array('l', bytes(size * array('l').itemsize))
+        submitted = array('l', bytes(size * n_criteria * array('l').itemsize))
+        counted = array('l', bytes(size * n_criteria * array('l').itemsize))
+        criterion_positions: Dict[int, List[int]] = {}  # bits -> positions, few distinct values
+        for center, outcome, bits, claims, meets in zip(centers, outcomes, field_bits, claimed, met):
+            claim_positions = criterion_positions.get(claims)
+            if claim_positions is None:
+                claim_positions = criterion_positions[claims] = list(iter_positions(claims))
+            met_positions = criterion_positions.get(meets)
+            if met_positions is None:
+                met_positions = criterion_positions[meets] = list(iter_positions(meets))
+            for group, mask in enumerate(masks):
+                if group and not bits & mask:
+                    continue
+                cell = self._cell(center, group, outcome)
+                cases[cell] += 1
+                base = cell * n_criteria
+                for c in claim_positions:
+                    submitted[base + c] += 1
+                for c in met_positions:
+                    counted[base + c] += 1
+        return cases, submitted, counted
+
+    def _count_numpy(self, centers, outcomes, field_bits, claimed, met, masks):
+        n_criteria = len(self.criteria)
+        n_groups = len(masks)
+        size = len(CENTERS) * n_groups * len(OUTCOMES)
+        if not centers:
+            return [0] * size, [0] * (size * n_criteria), [0] * (size * n_criteria)
+        # Field and criteria bits fit in int64 for up to 63 fields/criteria
+        bits = np.array(field_bits, dtype=np.int64)
+        member = (bits[:, None] & np.array([0] + masks[1:], dtype=np.int64)[None, :]) != 0
+        member[:, 0] = True
+        rec, group = np.nonzero(member)
+        cell = ((np.frombuffer(centers, dtype=np.int8)[rec].astype(np.int64) * n_groups + group)
+                * len(OUTCOMES) + np.frombuffer(outcomes, dtype=np.int8)[rec])
+        cases = np.bincount(cell, minlength=size)
+
+        shifts = np.arange(n_criteria, dtype=np.int64)
+        slots = (cell[:, None] * n_criteria + shifts[None, :]).ravel()
+
+        def per_criterion(values):
+            flags = (np.array(values, dtype=np.int64)[rec][:, None] >> shifts[None, :]) & 1
+            return np.bincount(slots, weights=flags.ravel(), minlength=size * n_criteria).astype(np.int64)
+
+        return cases.tolist(), per_criterion(claimed).tolist(), per_criterion(met).tolist()
+
+    def _cells(self, group: str, center: Optional[str], outcome: Optional[str]) -> List[int]:
+        if group not in self._group_index:
+            raise KeyError(f"unknown group {group!r}")
+        g = self._group_index[group]
+        centers = range(len(CENTERS)) if center is None else (CENTERS.index(center),)
+        outcomes = range(len(OUTCOMES)) if outcome is None else (OUTCOMES.index(outcome),)
+        return [self._cell(c, g, o) for c in centers for o in outcomes]
+
+    def count(self, group: str = ALL, center: Optional[str] = None, outcome: Optional[str] = None) -> int:
+        """Records in a slice; None means every center/outcome."""
+        return sum(self.cases[cell] for cell in self._cells(group, center, outcome))
+
+    def criterion(self, criterion: str, group: str = ALL, center: Optional[str] = None,
+                  outcome: Optional[str] = None) -> CriterionStats:
+        c = self.criteria.index(criterion)
+        cells = self._cells(group, center, outcome)
+        n = len(self.criteria)
+        return CriterionStats(criterion,
+                              sum(self.cases[cell] for cell in cells),
+                              sum(self.submitted[cell * n + c] for cell in cells),
+                              sum(self.met[cell * n + c] for cell in cells))
+
+    def table(self, group: str = ALL, center: Optional[str] = None,
+              outcome: Optional[str] = None) -> List[CriterionStats]:
+        """One CriterionStats per criterion, in criteria order."""
+        return [self.criterion(name, group, center, outcome) for name in self.criteria]
+
+
+def build_cube(records: List[dict], criteria: Sequence[str], groups: Dict[str, Iterable[str]],
+               default_visa: str = DEFAULT_VISA) -> dict:
+    """Counts of every group × center × visa × outcome (× criterion) cell, as flat columns.
+
+    groups should list every field slug so the group order does not depend
+    on the records. Records without a "visa" are counted as default_visa.
+    """
+    visas = sorted({r.get('visa') or default_visa for r in records}) or [default_visa]
+    tables = [CriteriaStats([r for r in records if (r.get('visa') or default_visa) == visa], criteria, groups)
+              for visa in visas]
+    group_names = tables[0].groups
+    cases, claimed, met = [], [], []
+    for group in group_names:
+        for center in CENTERS:
+            for table in tables:
+                for outcome in OUTCOMES:
+                    cases.append(table.count(group, center, outcome))
+                    for row in table.table(group, center, outcome):
+                        claimed.append(row.submitted)
+                        met.append(row.met)
+    return {
+        'dims': {'group': group_names, 'center': list(CENTERS), 'visa': visas,
+                 'outcome': list(OUTCOMES), 'criterion': list(criteria)},
+        'shape': [len(group_names), len(CENTERS), len(visas), len(OUTCOMES), len(criteria)],
+        'cases': cases,
+        'claimed': claimed,
+        'met': met,
+    }
+
+
+def load_stats(path: Path = DEFAULT_DATA, groups: Optional[Dict[str, Iterable[str]]] = None,
+               use_numpy: Optional[bool] = None) -> Tuple[dict, List[dict], CriteriaStats]:
+    """(meta, records, stats) for an RFE dataset file."""
+    meta, cases = open_cases(path)
+    records = list(cases)
+    return meta, records, CriteriaStats(records, meta['criteria'], groups, use_numpy)
+
+
+def format_rate(value: Optional[float]) -> str:
+    return '-' if value is None else f'{round(value)}%'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print criteria acceptance rates for the RFE dataset.")
+    parser.add_argument('data', nargs='?', type=Path, default=DEFAULT_DATA)
+    parser.add_argument('--field', default=ALL, help="rfe-data field slug (default: all records)")
+    parser.add_argument('--center', choices=CENTERS)
+    parser.add_argument('--outcome', choices=OUTCOMES)
+    parser.add_argument('--no-numpy', action='store_true', help="Count with the pure-Python path")
+    args = parser.parse_args()
+
+    _, _, stats = load_stats(args.data, use_numpy=False if args.no_numpy else None)
+    print(f"{stats.count(args.field, args.center, args.outcome)} records")
+    print(f"{'criterion':<12} {'claimed':>8} {'counted':>8} {'rate':>6}")
+    for row in sorted(stats.table(args.field, args.center, args.outcome), key=lambda r: -(r.rate or 0)):
+        print(f"{row.criterion:<12} {row.submitted:>8} {row.met:>8} {format_rate(row.rate):>6}")
+
+
+if __name__ == '__main__':
+    main()
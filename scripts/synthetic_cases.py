@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Synthetic corpus generator for benchmarking the cases pipeline.
+
+Produces Russian-language cases shaped like data/cases.json: visa, field,
+service_center (sometimes uncertain), tri-state premium/rfe/noid, prep,
+criteria and claimed_criteria, evidence_bullets, merged_from,
+consulate_city and a raw Telegram-style context with greetings, markdown,
+hashtags, placeholders and brand names that the cleaner has to deal with.
+The corpus carries the same top-level labels as data/cases.json.
+
+Generation is deterministic for a given seed. Output may be .json or
+.jsonl and is streamed (see case_store.py).
+
+Usage:
+  python3 scripts/synthetic_cases.py 50000 -o /tmp/cases-50k.json [--seed 42]
+"""
+
+import argparse
+import random
+from pathlib import Path
+from typing import Iterator
+
+from case_store import write_cases
+from clean_cases import BRAND_NAMES
+
+VISAS = ['EB-1A'] * 6 + ['EB-2 NIW'] * 3 + ['O-1', 'O-1A', 'O-1B']
+FIELDS = [None, None, 'IT', 'IT', 'Искусство', 'Бизнес', 'Наука', 'Спорт', 'Маркетинг',
+          'Архитектура', 'Музыка', 'Медицина', 'Дизайн', 'Мода']
+CENTERS = [None, None, None, 'NSC', 'NSC', 'TSC', 'VSC', 'CSC']
+PREPS = [None, 'attorney', 'mixed', 'self']
+CITIES = [None] * 8 + ['Warsaw', 'Almaty', 'Belgrade', 'Bangkok', 'Chisinau', 'Stockholm', 'Yerevan']
+CRITERIA = ['awards', 'membership', 'press', 'judging', 'contributions',
+            'critical_role', 'salary', 'authorship', 'exhibitions']
+COLLECTIONS = [None, 'talent_v_kazhdom', 'vip_talent', 'eb2niw_diy', 'rfe_chat']
+TRI_STATE = [True, False, None]
+
+GREETINGS = [
+    'Всем привет!', 'Привет, ребята!', 'Ура!!!', 'Здравствуйте.', 'Добрый день!',
+    'Наконец то появилось время все расписать.', 'Хочу поделиться своей историей.',
+    'Делюсь информацией по кейсу.', 'Моя очередь делиться!', '**Всем привет**',
+]
+APPROVALS = [
+    'Сегодня пришел аппрув по {visa}, кейс одобрили без RFE',
+    'Получила одобрение {visa} через {days} дней после подачи',
+    'Case approved, {visa} в {center_ru}',
+    'После RFE пришло одобрение, ответ подавали {days} дней',
+    'Пришло одобрение по премиуму за {days} дней',
+]
+TIMELINES = [
+    'Рассмотрение заняло {days} дней в {center_ru}',
+    'Ждал почти {months} месяца, потом пришел ответ',
+    'Через {weeks} недели получили уведомление',
+]
+DETAILS = [
+    'Подавала петицию сама, критерии: {criteria}',
+    'Интервью в консульстве {city} прошло спокойно',
+    'Подавал с адвокатом, заявляли {n} критериев',
+    'Виза выдана через неделю после интервью',
+    'Писем рекомендаций было {n}, плюс публикации и судейство',
+]
+FILLER = [
+    'Спасибо всем за поддержку в чате', 'Готовились почти год',
+    'Самое сложное было собрать письма', 'Работаю в сфере {field_ru} больше {n} лет',
+    'Если есть вопросы, пишите в личку [ссылка]', 'Спасибо [имя] за помощь с переводами',
+    'Делали через {brand}, остались довольны', 'Консультировались в {brand}',
+]
+TAGS = ['#eb1a', '#niw', '#o1', '#approval', '#rfe', '#кейс']
+CENTER_RU = {'NSC': 'Небраске', 'TSC': 'Техасе', 'VSC': 'Вермонте', 'CSC': 'Калифорнии', None: 'USCIS'}
+CENTER_NOTE_RU = {'NSC': 'Небраска', 'TSC': 'Техас', 'VSC': 'Вермонт', 'CSC': 'Калифорния'}
+EVIDENCE = [
+    'Рекомендательные письма', 'Публикации / цитирования', 'Судейство / peer review', 'Патенты',
+    'Гранты / проекты', 'Статьи в СМИ', 'Членство в ассоциациях', 'Награды на конкурсах',
+    'Высокая зарплата (сравнение с рынком)', 'Выступления на конференциях',
+]
+
+# Top-level fields of data/cases.json
+META = {
+    'schema_version': '1.1',
+    'criteria_labels': {
+        'contributions': 'Вклад', 'press': 'СМИ', 'judging': 'Судейство', 'critical_role': 'Критическая роль',
+        'awards': 'Награды', 'salary': 'Высокая ЗП', 'membership': 'Членство',
+        'authorship': 'Авторство/Публикации', 'exhibitions': 'Выставки',
+    },
+    'service_center_labels': {
+        'TSC': 'Texas Service Center', 'NSC': 'Nebraska Service Center',
+        'VSC': 'Vermont Service Center', 'CSC': 'California Service Center',
+    },
+    'prep_labels': {'self': 'Самоподача', 'attorney': 'С адвокатом', 'mixed': 'Смешанный'},
+}
+
+
+def _sentence(rng: random.Random, template: str, case: dict) -> str:
+    return template.format(
+        visa=case['visa'],
+        days=rng.randint(10, 400),
+        months=rng.randint(2, 14),
+        weeks=rng.randint(2, 6),
+        center_ru=CENTER_RU.get(case.get('service_center')),
+        criteria=', '.join(case.get('criteria') or ['награды']),
+        city=case.get('consulate_city') or 'Варшаве',
+        field_ru=(case.get('field') or 'IT').lower(),
+        n=rng.randint(3, 9),
+        brand=rng.choice(BRAND_NAMES),
+    )
+
+
+def make_context(rng: random.Random, case: dict, sentences: int) -> str:
+    parts = []
+    if rng.random() < 0.6:
+        parts.append(rng.choice(GREETINGS))
+    pools = [APPROVALS, TIMELINES, DETAILS, FILLER, FILLER]
+    for _ in range(sentences):
+        pool = rng.choice(pools)
+        sent = _sentence(rng, rng.choice(pool), case)
+        if rng.random() < 0.1:
+            sent = f'**{sent}**'
+        parts.append(sent + rng.choice(['.', '!', '.', '...']))
+    if rng.random() < 0.3:
+        parts.append(' '.join(rng.sample(TAGS, 2)))
+    sep = rng.choice([' ', ' ', '\n', '\n\n'])
+    return sep.join(parts)
+
+
+def make_case(rng: random.Random, i: int, mean_sentences: int = 6) -> dict:
+    visa = rng.choice(VISAS)
+    case = {
+        'id': f'synthetic-{i}',
+        'source_id': f'synthetic_{rng.randint(10000, 99999)}',
+        'title': rng.choice(['EB-1A кейс', 'Привет!', f'{visa} одобрение', 'Ура', f'Мой кейс {visa}', '']),
+        'visa': visa,
+        'field': rng.choice(FIELDS),
+        'service_center': rng.choice(CENTERS),
+        'premium': rng.choice(TRI_STATE),
+        'prep': rng.choice(PREPS),
+        'rfe': rng.choice(TRI_STATE),
+        'noid': rng.choice([None, None, False, True]),
+        'criteria': rng.sample(CRITERIA, rng.randint(0, 5)),
+        'consulate_city': rng.choice(CITIES),
+        'collection': rng.choice(COLLECTIONS),
+    }
+    if rng.random() < 0.2:
+        case['timeline_days'] = rng.randint(5, 500)
+    if rng.random() < 0.05:
+        case['officer_id'] = f'{rng.randint(1, 400):04d}'
+    if rng.random() < 0.25:
+        case['claimed_criteria'] = rng.sample(CRITERIA, rng.randint(1, 5))
+    if rng.random() < 0.5:
+        case['evidence_bullets'] = rng.sample(EVIDENCE, rng.randint(1, 4))
+    if case['service_center'] is None and rng.random() < 0.3:
+        center = rng.choice(sorted(CENTER_NOTE_RU))
+        case['service_center_uncertain'] = True
+        case['service_center_note'] = f'по словам автора: {CENTER_NOTE_RU[center]}'
+    if rng.random() < 0.03:
+        case['merged_from'] = f"{case['collection'] or 'tractor'}_{rng.randint(10000, 99999)}"
+    sentences = max(1, int(rng.expovariate(1 / mean_sentences)))
+    case['context'] = make_context(rng, case, sentences)
+    case['summary'] = ''
+    case['hide_context'] = False
+    return case
+
+
+def iter_synthetic_cases(n: int, seed: int = 42, mean_sentences: int = 6) -> Iterator[dict]:
+    """Yield n synthetic cases; same seed, same corpus."""
+    rng = random.Random(seed)
+    for i in range(n):
+        yield make_case(rng, i, mean_sentences)
+
+
+def generate_corpus(n: int, seed: int = 42, mean_sentences: int = 6) -> dict:
+    """A full cases.json-shaped document with n synthetic cases."""
+    return {**META, 'cases': list(iter_synthetic_cases(n, seed, mean_sentences))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic cases.json corpus.")
+    parser.add_argument('count', type=int, help="Number of cases")
+    parser.add_argument('-o', '--output', type=Path, required=True)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sentences', type=int, default=6, help="Mean sentences per context")
+    args = parser.parse_args()
+
+    write_cases(args.output, iter_synthetic_cases(args.count, args.seed, args.sentences), META)
+    print(f"Wrote {args.count} cases to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
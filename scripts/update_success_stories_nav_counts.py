@@ -18,48 +18,40 @@ Updates docs.json navigation:
   - "success-stories/by-center/vermont" -> label "Vermont (VSC) (X)"
   - "success-stories/by-center/nebraska" -> label "Nebraska (NSC) (X)"
 
-Idempotent: re-running correctly updates numbers.
+Idempotent: re-running correctly updates numbers. --check writes nothing
+and exits 1 when docs.json is out of date; running it after a generator
+checks that the generator's nav update (page_render.register_shards())
+kept these labels:
 
-Usage:
   python3 scripts/update_success_stories_nav_counts.py
+  python3 scripts/regenerate_all_success_stories.py
+  python3 scripts/update_success_stories_nav_counts.py --check
+
+Usage:
+  python3 scripts/update_success_stories_nav_counts.py [--check] [--timings-report [PATH]] [--profile [PATH]]
 """
 
+import argparse
 import json
 import re
+import sys
 from pathlib import Path
 
+from case_index import CaseIndex
+from case_store import atomic_open, iter_cases
+from instrumentation import add_arguments, count, instrumented, stage
 
-def load_cases(cases_path: Path) -> list[dict]:
-    """Load cases from JSON file."""
-    with open(cases_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data.get('cases', [])
 
-
-def count_cases(cases: list[dict]) -> dict[str, int]:
+def count_cases(index: CaseIndex) -> dict[str, int]:
     """Count cases by different criteria."""
-    counts = {
-        'premium': 0,
-        'self': 0,
-        'rfe': 0,
-        'vsc': 0,
-        'nsc': 0,
+    return {
+        'premium': index.count(index.query(premium=True)),
+        'self': index.count(index.query(prep='self')),
+        'rfe': index.count(index.query(rfe=True)),
+        'vsc': index.count(index.query(service_center='VSC')),
+        'nsc': index.count(index.query(service_center='NSC')),
     }
 
-    for case in cases:
-        if case.get('premium') is True:
-            counts['premium'] += 1
-        if case.get('prep') == 'self':
-            counts['self'] += 1
-        if case.get('rfe') is True:
-            counts['rfe'] += 1
-        if case.get('service_center') == 'VSC':
-            counts['vsc'] += 1
-        if case.get('service_center') == 'NSC':
-            counts['nsc'] += 1
-
-    return counts
-
 
 def strip_count_suffix(label: str) -> str:
     """Remove existing count suffix like ' (12)' from label."""
@@ -127,6 +119,16 @@ def update_navigation(docs: dict, counts: dict[str, int]) -> dict:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Update success-stories nav labels with case counts.")
+    parser.add_argument('--check', action='store_true',
+                        help="Write nothing; exit 1 if docs.json is out of date")
+    add_arguments(parser)
+    args = parser.parse_args()
+    with instrumented('update_success_stories_nav_counts', args):
+        return run(args.check)
+
+
+def run(check: bool = False) -> int:
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
 
@@ -134,24 +136,34 @@ def main():
     docs_path = project_root / 'docs.json'
 
     print("📊 Loading cases from data/cases.json...")
-    cases = load_cases(cases_path)
-    print(f"   Found {len(cases)} cases\n")
+    with stage('index'):
+        index = CaseIndex(iter_cases(cases_path))
+    print(f"   Found {index.size} cases\n")
+    count('cases.read', index.size)
 
     print("🔢 Counting cases...")
-    counts = count_cases(cases)
-    for key, count in counts.items():
-        print(f"   {key}: {count}")
+    with stage('count'):
+        counts = count_cases(index)
+    for key, value in counts.items():
+        print(f"   {key}: {value}")
     print()
 
     print("📝 Updating docs.json navigation...")
-    with open(docs_path, 'r', encoding='utf-8') as f:
-        docs = json.load(f)
-
-    docs = update_navigation(docs, counts)
-
-    with open(docs_path, 'w', encoding='utf-8') as f:
-        json.dump(docs, f, ensure_ascii=False, indent=2)
-        f.write('\n')
+    with stage('write'):
+        with open(docs_path, 'r', encoding='utf-8') as f:
+            before = f.read()
+
+        docs = update_navigation(json.loads(before), counts)
+        after = json.dumps(docs, ensure_ascii=False, indent=2) + '\n'
+
+        if check:
+            if after != before:
+                print("❌ docs.json nav counts are out of date")
+                return 1
+            print("✅ docs.json nav counts are up to date")
+            return 0
+        with atomic_open(docs_path) as f:
+            f.write(after)
 
     print("✅ Updated docs.json with nav counts:")
     print(f"   - Premium ({counts['premium']})")
@@ -159,7 +171,8 @@ def main():
     print(f"   - С RFE ({counts['rfe']})")
     print(f"   - Vermont (VSC) ({counts['vsc']})")
     print(f"   - Nebraska (NSC) ({counts['nsc']})")
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())